@@ -0,0 +1,72 @@
+import json
+import threading
+import time
+
+import wx
+
+# 창이 뜨는 데 필요 없는 무거운 단계는 창을 먼저 띄운 뒤 백그라운드에서
+STAGES = ("window", "graph", "audio")
+
+
+class StartupTimer:
+    """Seconds from `start` (taken at the top of the app module) to each startup stage."""
+
+    def __init__(self, start, stages=STAGES):
+        self.start = start
+        self.stages = tuple(stages)
+        self.marks = {}
+
+    def mark(self, stage):
+        if stage not in self.marks:
+            self.marks[stage] = time.perf_counter() - self.start
+        return self.marks[stage]
+
+    @property
+    def done(self):
+        return all(stage in self.marks for stage in self.stages)
+
+    def format(self):
+        return ", ".join(f"{stage} {self.marks[stage]:.2f} s" for stage in self.stages if stage in self.marks)
+
+    def to_dict(self):
+        return {"stages": dict(self.marks), "done": self.done}
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+
+class BackgroundTask:
+    """Runs `work` on a daemon thread and passes its result to `on_done` on the GUI thread.
+
+    If `work` raises, `on_error(exc)` is called instead. The handlers may run
+    after the frame has been destroyed, so they should start with
+    `if not self: return`.
+    """
+
+    def __init__(self, work, on_done, on_error):
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(target=self._run, args=(work, on_done, on_error), daemon=True)
+        self.thread.start()
+
+    def _run(self, work, on_done, on_error):
+        try:
+            self.result = work()
+        except Exception as e:
+            self.error = e
+            wx.CallAfter(on_error, e)
+            return
+        wx.CallAfter(on_done, self.result)
+
+    def join(self, timeout=None):
+        self.thread.join(timeout)
+
+
+def import_plotting():
+    # matplotlib import가 가장 오래 걸리는 부분: 스레드에서 미리 해 두고 캔버스는 GUI 스레드에서 만듦
+    import matplotlib
+    matplotlib.use("WXAgg")
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg
+    return Figure, FigureCanvasWxAgg
@@ -0,0 +1,190 @@
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from mapping_spec import load_spec
+from effect_params import EFFECT_MAPPING
+from weather_cache import file_digest
+
+# 렌더링 결과에 영향을 주는 코드가 바뀌면 올려서 기존 결과를 무효화
+RENDER_VERSION = 1
+
+# 작업별로 넘길 수 있는 offline_render.render 옵션
+RENDER_OPTIONS = ("seconds_per_hour", "ramp_ratio", "hours", "dry", "sr", "vol_scale", "cutoff_range", "interp",
+                  "samples_per_hour")
+
+_server = None
+
+
+def job_key(job):
+    h = hashlib.sha256()
+    h.update(str(RENDER_VERSION).encode())
+    h.update(file_digest(job["weather"]).encode())
+    h.update(file_digest(job["music"]).encode())
+    # 매핑 스펙(mappings/effects.json)을 고치면 다시 렌더링
+    for path in load_spec(EFFECT_MAPPING)[1]:
+        h.update(file_digest(path).encode())
+    options = {k: job[k] for k in RENDER_OPTIONS if k in job}
+    h.update(json.dumps(options, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def sidecar_path(job):
+    return job["output"] + ".json"
+
+
+def is_up_to_date(job, key):
+    if not os.path.exists(job["output"]):
+        return False
+    try:
+        with open(sidecar_path(job), "r", encoding="utf-8") as f:
+            return json.load(f).get("key") == key
+    except (OSError, ValueError):
+        return False
+
+
+def build_manifest(data_dir, tracks, out_dir, **options):
+    jobs = []
+    for weather in sorted(glob.glob(os.path.join(data_dir, "*.json"))):
+        region = os.path.splitext(os.path.basename(weather))[0]
+        for music in tracks:
+            track = os.path.splitext(os.path.basename(music))[0]
+            jobs.append({
+                "weather": weather,
+                "music": music,
+                "output": os.path.join(out_dir, f"{region}__{track}.wav"),
+                **options,
+            })
+    return {"jobs": jobs}
+
+
+def load_manifest(path):
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    defaults = manifest.get("defaults", {})
+    manifest["jobs"] = [{**defaults, **job} for job in manifest["jobs"]]
+    return manifest
+
+
+def _worker_server(sr):
+    # 워커 프로세스마다 offline pyo 서버를 하나씩 소유 (처음 필요할 때 부팅)
+    # 프로세스당 서버는 하나뿐이라 작업의 sr이 다르면 그 sr로 다시 부팅
+    global _server
+    from pyo import Server
+    if _server is None:
+        _server = Server(sr=sr, nchnls=2, duplex=0, audio="offline").boot()
+    elif int(_server.getSamplingRate()) != int(sr):
+        _server.shutdown()
+        _server.setSamplingRate(sr)
+        _server.boot()
+    return _server
+
+
+def _render_job(job, key):
+    from offline_render import render, DEFAULT_SR
+    options = {k: job[k] for k in RENDER_OPTIONS if k in job}
+    if options.get("cutoff_range") is not None:
+        options["cutoff_range"] = tuple(options["cutoff_range"])
+    os.makedirs(os.path.dirname(job["output"]) or ".", exist_ok=True)
+    server = _worker_server(options.get("sr", DEFAULT_SR))
+    # 이전 키가 남아 있지 않게 사이드카부터 지우고, 임시 파일에 렌더링한 뒤 바꿔치기
+    # (도중에 죽어도 반쯤 쓴 WAV가 최신으로 보이지 않음); 사이드카는 마지막에 씀
+    try:
+        os.remove(sidecar_path(job))
+    except FileNotFoundError:
+        pass
+    tmp = job["output"] + ".tmp"
+    result = render(job["weather"], job["music"], tmp, server=server, **options)
+    os.replace(tmp, job["output"])
+    result["output"] = job["output"]
+    result["key"] = key
+    result["worker"] = os.getpid()
+    with open(sidecar_path(job) + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    os.replace(sidecar_path(job) + ".tmp", sidecar_path(job))
+    return result
+
+
+def run_batch(jobs, workers=None, force=False):
+    workers = workers or os.cpu_count() or 1
+    summary = {"workers": workers, "rendered": [], "skipped": [], "failed": []}
+
+    pending = []
+    for job in jobs:
+        key = job_key(job)
+        if not force and is_up_to_date(job, key):
+            summary["skipped"].append(job["output"])
+        else:
+            pending.append((job, key))
+
+    start = time.perf_counter()
+    if pending:
+        # pyo 서버는 fork된 상태를 물려받지 않도록 spawn으로 띄움
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=ctx) as pool:
+            futures = {pool.submit(_render_job, job, key): job for job, key in pending}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    summary["failed"].append({"output": job["output"], "error": repr(e)})
+                    print(f"FAILED {job['output']}: {e}")
+                    continue
+                summary["rendered"].append(result)
+                print(f"{result['output']}: {result['audio_seconds']:.0f} s audio, "
+                      f"{result['x_realtime']:.1f}x realtime")
+    wall = time.perf_counter() - start
+
+    audio_seconds = sum(r["audio_seconds"] for r in summary["rendered"])
+    used = min(workers, len(pending)) or 1
+    summary["workers"] = used
+    summary["wall_seconds"] = wall
+    summary["audio_seconds"] = audio_seconds
+    summary["x_realtime"] = audio_seconds / wall if wall > 0 else 0.0
+    summary["x_realtime_per_core"] = summary["x_realtime"] / used
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render (dataset, track) pairs in parallel.")
+    parser.add_argument("--manifest", help="job manifest JSON ({'defaults': {...}, 'jobs': [...]})")
+    parser.add_argument("--data", default="data", help="weather directory when no manifest is given")
+    parser.add_argument("--tracks", nargs="*", default=[], help="music tracks when no manifest is given")
+    parser.add_argument("--out", default="renders", help="output directory when no manifest is given")
+    parser.add_argument("--seconds-per-hour", type=float, default=1.0)
+    parser.add_argument("--write-manifest", help="save the generated manifest and exit")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="re-render even if up to date")
+    parser.add_argument("--summary", help="write the batch summary JSON here")
+    args = parser.parse_args()
+
+    if args.manifest:
+        manifest = load_manifest(args.manifest)
+    else:
+        if not args.tracks:
+            parser.error("give --manifest or at least one track with --tracks")
+        manifest = build_manifest(args.data, args.tracks, args.out,
+                                  seconds_per_hour=args.seconds_per_hour)
+    if args.write_manifest:
+        with open(args.write_manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return
+
+    summary = run_batch(manifest["jobs"], workers=args.workers, force=args.force)
+    print(f"rendered {len(summary['rendered'])}, skipped {len(summary['skipped'])}, "
+          f"failed {len(summary['failed'])} | {summary['audio_seconds']:.0f} s audio in "
+          f"{summary['wall_seconds']:.1f} s on {summary['workers']} workers "
+          f"({summary['x_realtime']:.1f}x realtime, {summary['x_realtime_per_core']:.1f}x per core)")
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
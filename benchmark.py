@@ -0,0 +1,354 @@
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from weather_timeline import FIELDS, WeatherTimeline
+from weather_cache import load_cached, write_cache
+from effect_params import compute_effect_table
+from timeline_resample import resample_fields, CUBIC
+from osc_output import OscOutput, OscReceiver
+
+# 합성 데이터셋 크기 (시간 단위): 1개월, 1년, 10년
+SYNTHETIC_HOURS = (24 * 30, 24 * 365, 24 * 365 * 10)
+
+# 기준 결과보다 이 비율 이상 나빠지면 회귀로 표시
+DEFAULT_TOLERANCE = 0.25
+
+SEED = 1234
+
+
+def measure(fn, repeat=5, warmup=1):
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000.0)
+    return {"value": statistics.median(times), "min": min(times), "unit": "ms", "better": "lower"}
+
+
+def synthetic_columns(hours, seed=SEED):
+    # 모양만 실제 데이터와 같은 무작위 시간별 값 (값의 현실성은 필요 없음)
+    rng = np.random.default_rng(seed)
+    return {
+        "temp": rng.uniform(-10, 35, hours),
+        "humidity": rng.uniform(20, 100, hours),
+        "rain": rng.exponential(0.5, hours) * (rng.random(hours) < 0.2),
+        "snow": rng.exponential(0.5, hours) * (rng.random(hours) < 0.05),
+        "wind_speed": rng.uniform(0, 12, hours),
+        "wind_deg": rng.uniform(0, 360, hours),
+        "uvi": rng.uniform(0, 10, hours),
+    }
+
+
+def synthetic_timeline(hours, seed=SEED):
+    fields = {name: values.astype(np.float32) for name, values in synthetic_columns(hours, seed).items()}
+    return WeatherTimeline("Synthetic", np.arange(hours, dtype=np.int32), fields,
+                           np.zeros(hours, dtype=np.uint16), ["clear sky"])
+
+
+def write_synthetic_json(path, hours, seed=SEED):
+    columns = synthetic_columns(hours, seed)
+    descriptions = ("clear sky", "few clouds", "light rain", "snow")
+    desc = np.random.default_rng(seed + 1).integers(0, len(descriptions), hours)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"city": "Synthetic", "hourly": [')
+        for h in range(hours):
+            record = {name: round(float(columns[name][h]), 2) for name in FIELDS}
+            record["hour"] = h
+            record["weather"] = [{"description": descriptions[desc[h]]}]
+            f.write(("," if h else "") + json.dumps(record))
+        f.write("]}")
+
+
+def write_test_tone(path, seconds=10.0, sr=44100):
+    # 음원 파일 없이도 렌더링을 잴 수 있도록 쓰는 스테레오 톤
+    t = np.arange(int(seconds * sr)) / sr
+    left = 0.3 * np.sin(2 * np.pi * 220.0 * t)
+    right = 0.3 * np.sin(2 * np.pi * 330.0 * t)
+    pcm = (np.stack([left, right], axis=1) * 32767).astype("<i2")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(pcm.tobytes())
+
+
+def copy_inputs(paths, directory):
+    # 캐시(.cache/)는 입력 옆에 생기므로 작업 디렉터리의 복사본으로 측정 (data/에는 아무것도 쓰지 않음)
+    os.makedirs(directory, exist_ok=True)
+    copies = []
+    for path in paths:
+        copy = os.path.join(directory, os.path.basename(path))
+        shutil.copy2(path, copy)
+        copies.append(copy)
+    return copies
+
+
+def bench_load(results, paths, repeat):
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+
+        def raw():
+            with open(path, "r", encoding="utf-8") as f:
+                json.load(f)
+
+        results[f"load.json.{name}"] = measure(raw, repeat)
+        results[f"load.stream.{name}"] = measure(lambda: WeatherTimeline.load(path), repeat)
+        write_cache(path, WeatherTimeline.load(path))
+        results[f"load.cached.{name}"] = measure(lambda: load_cached(path), repeat)
+
+
+def bench_mapping(results, timeline, repeat):
+    hours = len(timeline)
+    results["mapping.table"] = measure(lambda: compute_effect_table(timeline.fields), repeat)
+    results["mapping.table_per_hour"] = {
+        "value": results["mapping.table"]["value"] * 1000.0 / hours, "unit": "us", "better": "lower",
+    }
+    table = compute_effect_table(timeline.fields)
+
+    def tick():
+        for hour in range(hours):
+            [float(v) for v in table[hour]]
+
+    per_tick = measure(tick, repeat)
+    results["mapping.tick"] = {"value": per_tick["value"] * 1000.0 / hours, "unit": "us", "better": "lower"}
+    results["mapping.resample_cubic"] = measure(lambda: resample_fields(timeline.fields, mode=CUBIC), repeat)
+
+
+def bench_osc(results, timeline, frames, repeat):
+    # 프레임 하나(바뀐 값만 인코딩 + 번들 전송)의 비용; 수신기는 로컬 UDP 소켓
+    table = compute_effect_table(timeline.fields)[:frames]
+    receiver = OscReceiver()
+    receiver.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+    out = OscOutput([f"p{i}" for i in range(table.shape[1])], receiver.address, refresh=float("inf"))
+
+    def send_all():
+        for row in table:
+            out.send(row)
+
+    per_frame = measure(send_all, repeat)
+    results["osc.frame"] = {"value": per_frame["value"] * 1000.0 / len(table), "unit": "us", "better": "lower"}
+    out.close()
+    receiver.close()
+
+
+def bench_graph(results, timeline, long_timeline, frames, repeat):
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from timeline_graph import TimelineGraph
+
+    figure = Figure(figsize=(6.8, 3.5))
+    canvas = FigureCanvasAgg(figure)
+    graph = TimelineGraph(figure, canvas)
+    results["graph.set_timeline"] = measure(lambda: graph.set_timeline(timeline), repeat)
+
+    graph.set_timeline(timeline)
+    n = min(frames, len(timeline))
+    for hour in range(n):
+        graph.update(hour)
+    stats = graph.frame_stats()
+    results["graph.update"] = {"value": stats["mean_ms"], "p95": stats["p95_ms"], "unit": "ms",
+                               "better": "lower"}
+    results["graph.full_redraw"] = measure(canvas.draw, repeat)
+
+    # 10년치: 솎아 낸 뒤의 점 수와 다시 그리기가 데이터 길이와 무관한지
+    graph.set_timeline(long_timeline)
+    results["graph.long_points"] = {"value": graph.points, "unit": "points", "better": "lower"}
+    results["graph.long_full_redraw"] = measure(canvas.draw, repeat)
+    graph.set_view(hours=24 * 7)
+    results["graph.long_zoom"] = measure(lambda: graph.zoom(1.0), repeat)
+
+
+def bench_chain(results, server, repeat):
+    from pyo import Sig
+    from effects_chain import EffectsChain
+    from effect_params import default_effect_row
+
+    row = default_effect_row()
+
+    def build():
+        chain = EffectsChain(Sig([0, 0]), row)
+        chain.stop()
+
+    results["chain.build_teardown"] = measure(build, repeat=repeat * 4)
+
+
+def bench_render(results, server, weather, music, hours, workdir):
+    from offline_render import render
+    out = os.path.join(workdir, "render.wav")
+    result = render(weather, music, out, seconds_per_hour=1.0, hours=hours, server=server)
+    results["render.x_realtime"] = {"value": result["x_realtime"], "unit": "x", "better": "higher"}
+    results["render.seconds"] = {"value": result["render_seconds"] * 1000.0, "unit": "ms", "better": "lower"}
+
+
+def bench_multi(results, server, weather, music, counts=(1, 4, 16)):
+    from multi_city import scaling_benchmark
+    for r in scaling_benchmark(server, music, [weather], counts=counts, seconds=2.0):
+        results[f"multi.cpu_percent.{r['chains']}"] = {"value": r["cpu_percent"], "unit": "%", "better": "lower"}
+
+
+def bench_startup(results, workdir, app="final_sonification.py", repeat=3):
+    # 창이 뜨는 시간과 그래프/오디오가 준비되는 시간 (앱을 띄웠다가 준비되면 바로 닫음)
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = os.path.join(workdir, "startup.json")
+    times = {}
+    for _ in range(repeat):
+        subprocess.run([sys.executable, app, "--exit-after-startup", "--startup-json", out], cwd=here,
+                       check=True, timeout=120, stdout=subprocess.DEVNULL)
+        with open(out, "r", encoding="utf-8") as f:
+            for stage, seconds in json.load(f)["stages"].items():
+                times.setdefault(stage, []).append(seconds * 1000.0)
+    for stage, values in times.items():
+        results[f"startup.{stage}"] = {"value": statistics.median(values), "min": min(values), "unit": "ms",
+                                       "better": "lower"}
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    # value끼리 비교: lower-is-better면 ratio > 1 + tolerance, higher-is-better면 ratio < 1 - tolerance
+    report = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("value"):
+            continue
+        ratio = result["value"] / base["value"]
+        if result.get("better") == "higher":
+            regressed = ratio < 1.0 - tolerance
+        else:
+            regressed = ratio > 1.0 + tolerance
+        report[name] = {"baseline": base["value"], "current": result["value"], "ratio": ratio,
+                        "regressed": regressed}
+    return report
+
+
+def run(data_dir="data", synthetic=SYNTHETIC_HOURS, music=None, repeat=5, frames=500,
+        render_hours=24, sections=("load", "mapping", "osc", "graph", "chain", "render", "multi")):
+    results = {}
+    skipped = {}
+    workdir = tempfile.mkdtemp(prefix="weather-bench-")
+    inputs = os.path.join(workdir, "data")
+
+    if "load" in sections:
+        bench_load(results, copy_inputs(sorted(glob.glob(os.path.join(data_dir, "*.json"))), inputs), repeat)
+        synthetic_paths = []
+        for hours in synthetic:
+            path = os.path.join(workdir, f"synthetic_{hours}h.json")
+            write_synthetic_json(path, hours)
+            synthetic_paths.append(path)
+        bench_load(results, synthetic_paths, max(1, repeat // 2))
+
+    if "mapping" in sections:
+        # 매핑은 항상 같은 크기(10년)의 합성 데이터로 측정해서 실행 간 비교가 가능하게 함
+        bench_mapping(results, synthetic_timeline(max(SYNTHETIC_HOURS)), repeat)
+    if "osc" in sections:
+        bench_osc(results, synthetic_timeline(frames), frames, repeat)
+    if "graph" in sections:
+        bench_graph(results, WeatherTimeline.load(os.path.join(data_dir, "KoreaSeasonalCycle.json")),
+                    synthetic_timeline(max(SYNTHETIC_HOURS)), frames, repeat)
+
+    server = None
+    audio_sections = [s for s in ("chain", "render", "multi") if s in sections]
+    if audio_sections:
+        try:
+            from pyo import Server
+        except ImportError as e:
+            for section in audio_sections:
+                if section in sections:
+                    skipped[section] = f"pyo unavailable: {e}"
+        else:
+            server = Server(nchnls=2, duplex=0, audio="offline").boot()
+
+    if server is not None:
+        if "chain" in sections:
+            bench_chain(results, server, repeat)
+        if music is None:
+            music = os.path.join(workdir, "tone.wav")
+            write_test_tone(music)
+        weather = copy_inputs([os.path.join(data_dir, "KoreaSeasonalCycle.json")], inputs)[0]
+        if "render" in sections:
+            bench_render(results, server, weather, music, render_hours, workdir)
+        if "multi" in sections:
+            bench_multi(results, server, weather, music)
+        server.shutdown()
+
+    if "startup" in sections:
+        # GUI 앱을 실제로 띄우므로 기본 구간에는 넣지 않음 (디스플레이와 wx가 필요)
+        try:
+            import wx
+        except ImportError as e:
+            skipped["startup"] = f"wx unavailable: {e}"
+        else:
+            bench_startup(results, workdir, repeat=max(1, repeat // 2))
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmarks for loading, mapping, graph redraw and rendering.")
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--music", help="track for the render benchmark (default: generated test tone)")
+    parser.add_argument("--sections", nargs="*", default=["load", "mapping", "osc", "graph", "chain", "render", "multi"],
+                        choices=["load", "mapping", "osc", "graph", "chain", "render", "multi", "startup"])
+    parser.add_argument("--synthetic", type=int, nargs="*", default=list(SYNTHETIC_HOURS),
+                        help="synthetic dataset sizes in hours")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=500, help="graph frames to time")
+    parser.add_argument("--render-hours", type=int, default=24)
+    parser.add_argument("--output", "-o", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    report = run(args.data, args.synthetic, args.music, args.repeat, args.frames, args.render_hours,
+                 args.sections)
+    for name, result in report["results"].items():
+        print(f"{name:<40} {result['value']:12.3f} {result['unit']}")
+    for section, reason in report["skipped"].items():
+        print(f"{section:<40} skipped ({reason})")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        report["comparison"] = compare(report["results"], baseline, args.tolerance)
+        regressions = [name for name, c in report["comparison"].items() if c["regressed"]]
+        for name in regressions:
+            c = report["comparison"][name]
+            print(f"REGRESSION {name}: {c['baseline']:.3f} -> {c['current']:.3f} ({c['ratio']:.2f}x)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import wx
+
+from data_catalog import filter_entries, search_key
+
+# 목록을 다시 받아오는 간격 (ms); 색인 version이 같으면 목록은 오가지 않음
+DATASET_REFRESH_MS = 5000
+
+COLUMNS = (("Dataset", 170), ("City", 140), ("Hours", 60), ("Temp (°C)", 110))
+
+
+def _temp_range(entry):
+    temp = entry["fields"].get("temp")
+    return f"{temp[0]:.1f} .. {temp[1]:.1f}" if temp else ""
+
+
+class CatalogList(wx.ListCtrl):
+    """Virtual list of catalog entries (see data_catalog.py) with a text filter.
+
+    Rows are only formatted when wx draws them, so the list stays instant
+    with thousands of datasets. `set_entries` replaces the listing while
+    keeping the selection; `set_filter` narrows it to entries whose name or
+    city contain every word.
+    """
+
+    def __init__(self, parent, size=(-1, 140)):
+        super().__init__(parent, size=size, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL)
+        for i, (label, width) in enumerate(COLUMNS):
+            self.InsertColumn(i, label, width=width)
+        self.entries = []
+        self.keys = []
+        self.shown = []
+        self.text = ""
+
+    def set_entries(self, entries):
+        selected = self.selected()
+        self.entries = entries
+        self.keys = [search_key(e) for e in entries]
+        self._apply(selected)
+
+    def set_filter(self, text):
+        self.text = text
+        self._apply(self.selected())
+
+    def _apply(self, selected):
+        # 가상 목록의 선택은 줄 번호라서 목록이 바뀌기 전에 지우고 같은 항목을 다시 고름
+        row = self.GetFirstSelected()
+        if row >= 0:
+            self.Select(row, 0)
+        self.shown = filter_entries(self.entries, self.text, self.keys)
+        self.SetItemCount(len(self.shown))
+        names = [e["name"] for e in self.shown]
+        if selected is not None and selected["name"] in names:
+            row = names.index(selected["name"])
+            self.Select(row)
+            self.EnsureVisible(row)
+        elif len(self.shown) == 1:
+            self.Select(0)
+        self.Refresh()
+
+    def OnGetItemText(self, item, column):
+        e = self.shown[item]
+        if column == 0:
+            return e["name"]
+        if column == 1:
+            return e["city"]
+        if column == 2:
+            return str(e["hours"])
+        return _temp_range(e)
+
+    def selected(self):
+        row = self.GetFirstSelected()
+        return self.shown[row] if 0 <= row < len(self.shown) else None
@@ -1,7 +1,23 @@
-# Define extended seasonal phases for 3-day representation of each season
-# Each sub-season (Early, Mid, Late) has slightly different characteristics
-import json
-import random
+# Synthetic hourly weather for N cities x M years, seeded and vectorized with numpy.
+# The 12 seasonal phases below (Early/Mid/Late of each season) are anchors: values are
+# interpolated smoothly between them over the year and shaped by a diurnal curve.
+#
+#   python data/data_generate.py                         # data/samplecity.json (12-day year, like before)
+#   python data/data_generate.py --cities 50 --years 10 --days-per-year 365 --format ndjson --out fixtures
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# data/ 밖의 weather_timeline, weather_cache를 쓰기 위해 저장소 루트를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weather_timeline import FIELDS, NO_DESCRIPTION, WeatherTimeline  # noqa: E402
+from weather_cache import write_columnar  # noqa: E402
 
 seasonal_phases = [
     ("Early Spring", {"base_temp_day": 10, "base_temp_night": 3, "humidity": (55, 70), "rain": (0, 1), "snow": (0, 0), "wind_speed": (1, 3), "uvi": (2, 4), "desc": "scattered clouds"}),
@@ -21,43 +37,244 @@ seasonal_phases = [
     ("Late Winter", {"base_temp_day": 3, "base_temp_night": -3, "humidity": (40, 60), "rain": (0, 0), "snow": (0.5, 2), "wind_speed": (2, 4), "uvi": (1, 2), "desc": "overcast clouds"})
 ]
 
-# Initialize JSON structure
-extended_weather_json = {
-    "city": "samplecity",
-    "hourly": []
-}
-
-# Generate data
-hour_index = 0
-for season_name, props in seasonal_phases:
-    for h in range(24):
-        is_daytime = 7 <= h <= 18
-        temp_base = props["base_temp_day"] if is_daytime else props["base_temp_night"]
-        temp = round(temp_base + random.uniform(-1.5, 1.5), 1)
-        humidity = random.randint(*props["humidity"])
-        rain = round(random.uniform(*props["rain"]), 1)
-        snow = round(random.uniform(*props["snow"]), 1)
-        wind_speed = round(random.uniform(*props["wind_speed"]), 1)
-        wind_deg = random.randint(0, 359)
-        uvi = round(random.uniform(*props["uvi"]), 1) if is_daytime else 0
-        desc = props["desc"]
-
-        extended_weather_json["hourly"].append({
-            "hour": hour_index,
-            "temp": temp,
-            "humidity": humidity,
-            "rain": rain,
-            "snow": snow,
-            "wind_speed": wind_speed,
-            "wind_deg": wind_deg,
-            "uvi": uvi,
-            "weather": [{"description": desc}]
-        })
-        hour_index += 1
-
-# Save JSON file
-output_path = "data/samplecity.json"
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(extended_weather_json, f, ensure_ascii=False, indent=2)
-
-output_path
+# 날씨 상태에서 정해지는 설명 (코드 0은 weather_timeline과 같이 NO_DESCRIPTION)
+DESCRIPTIONS = (NO_DESCRIPTION, "clear sky", "sunny", "scattered clouds", "overcast clouds",
+                "light rain", "moderate rain", "thunderstorm", "light snow", "snow")
+
+FORMATS = ("json", "ndjson", "columnar")
+
+# 파일로 쓸 때 한 번에 포맷하는 시간 수
+WRITE_CHUNK = 1 << 16
+
+_RECORD = ('{"hour":%d,"temp":%.1f,"humidity":%d,"rain":%.1f,"snow":%.1f,"wind_speed":%.1f,'
+           '"wind_deg":%d,"uvi":%.1f,"weather":[{"description":"%s"}]}')
+
+
+def _phase_table():
+    # 단계별 특성을 (12,) 배열들로
+    cols = {k: [] for k in ("day", "night", "hum_lo", "hum_hi", "rain", "snow", "wind_lo", "wind_hi",
+                            "uvi_lo", "uvi_hi")}
+    for _, p in seasonal_phases:
+        cols["day"].append(p["base_temp_day"])
+        cols["night"].append(p["base_temp_night"])
+        cols["hum_lo"].append(p["humidity"][0])
+        cols["hum_hi"].append(p["humidity"][1])
+        cols["rain"].append(p["rain"][1])
+        cols["snow"].append(p["snow"][1])
+        cols["wind_lo"].append(p["wind_speed"][0])
+        cols["wind_hi"].append(p["wind_speed"][1])
+        cols["uvi_lo"].append(p["uvi"][0])
+        cols["uvi_hi"].append(p["uvi"][1])
+    return {k: np.asarray(v, dtype=np.float64) for k, v in cols.items()}
+
+
+PHASES = _phase_table()
+
+
+def _smooth_noise(rng, n, width):
+    # 폭 width(시간)의 Hann 창으로 평균낸 표준정규 잡음: 며칠 단위로 천천히 변하는 이상치
+    kernel = np.hanning(width + 2)[1:-1]
+    kernel /= np.sqrt(np.sum(kernel ** 2))
+    return np.convolve(rng.standard_normal(n + width - 1), kernel, mode="valid")
+
+
+def _normal_cdf(x):
+    # 로지스틱 근사 (scipy 없이)
+    return 1.0 / (1.0 + np.exp(-1.702 * x))
+
+
+def random_climate(rng):
+    """Per-city offsets applied on top of the seasonal phases."""
+    return {
+        "temp_offset": rng.uniform(-6.0, 6.0),
+        "humidity_offset": rng.uniform(-10.0, 10.0),
+        "wind_scale": rng.uniform(0.7, 1.5),
+        "season_shift": rng.uniform(-0.03, 0.03),  # 1년 대비 비율
+        "wind_deg": rng.uniform(0.0, 360.0),
+    }
+
+
+def generate_city(hours, rng, city="samplecity", days_per_year=365, start_day=0.0, climate=None):
+    """Return a WeatherTimeline of `hours` hourly records drawn from `rng`."""
+    climate = climate or {"temp_offset": 0.0, "humidity_offset": 0.0, "wind_scale": 1.0,
+                          "season_shift": 0.0, "wind_deg": 0.0}
+    t = np.arange(hours, dtype=np.float64)
+    hour_of_day = t % 24
+
+    # 1년 안의 위치 -> 12단계 사이를 주기적으로 선형 보간 (단계 중심은 k + 0.5)
+    year_pos = ((start_day + t / 24.0) / days_per_year + climate["season_shift"]) % 1.0
+    phase_pos = year_pos * len(seasonal_phases)
+    centers = np.arange(len(seasonal_phases)) + 0.5
+    p = {k: np.interp(phase_pos, centers, v, period=len(seasonal_phases)) for k, v in PHASES.items()}
+
+    # 하루 곡선: 새벽 3시 최저, 오후 3시 최고
+    diurnal = 0.5 - 0.5 * np.cos(2 * np.pi * (hour_of_day - 3.0) / 24.0)
+    sun = np.clip(np.sin(np.pi * (hour_of_day - 6.0) / 12.0), 0.0, None)
+
+    temp_anomaly = 2.0 * _smooth_noise(rng, hours, 72)
+    wet = _smooth_noise(rng, hours, 36)
+    gust = _smooth_noise(rng, hours, 12)
+
+    temp = (p["night"] + (p["day"] - p["night"]) * diurnal + temp_anomaly
+            + 0.3 * rng.standard_normal(hours) + climate["temp_offset"])
+
+    hum_mid = 0.5 * (p["hum_lo"] + p["hum_hi"])
+    hum_span = p["hum_hi"] - p["hum_lo"]
+    humidity = (hum_mid + 0.6 * hum_span * wet - 0.4 * hum_span * (diurnal - 0.5)
+                + climate["humidity_offset"] + 2.0 * rng.standard_normal(hours))
+    humidity = np.clip(humidity, 5.0, 100.0)
+
+    # 강수: 습한 이상치가 단계별 확률을 넘으면 내림, 기온이 낮으면 눈
+    scale = np.maximum(p["rain"], p["snow"])
+    chance = np.clip(0.1 + 0.08 * scale, 0.0, 0.6) * (scale > 0)
+    u = 1.0 - _normal_cdf(wet)
+    intensity = np.where(u < chance, (chance - u) / np.maximum(chance, 1e-9), 0.0)
+    amount = scale * intensity * (0.5 + rng.random(hours))
+    cold = temp < 0.5
+    rain = np.where(cold, 0.0, amount)
+    snow = np.where(cold, amount, 0.0)
+
+    wind_speed = (p["wind_lo"] + (p["wind_hi"] - p["wind_lo"]) * _normal_cdf(gust) + 0.5 * diurnal)
+    wind_speed = np.clip(wind_speed * climate["wind_scale"], 0.0, None)
+    wind_deg = (climate["wind_deg"] + np.cumsum(rng.normal(0.0, 8.0, hours))) % 360.0
+
+    cloud = np.clip((humidity - 50.0) / 50.0, 0.0, 1.0)
+    uvi_peak = p["uvi_lo"] + (p["uvi_hi"] - p["uvi_lo"]) * _normal_cdf(-wet)
+    uvi = uvi_peak * sun * (1.0 - 0.5 * cloud)
+
+    fields = {
+        "temp": np.round(temp, 1),
+        "humidity": np.round(humidity),
+        "rain": np.round(rain, 1),
+        "snow": np.round(snow, 1),
+        "wind_speed": np.round(wind_speed, 1),
+        "wind_deg": np.floor(wind_deg),
+        "uvi": np.round(uvi, 1),
+    }
+    f = fields
+    codes = np.select(
+        [f["snow"] >= 1.0, f["snow"] > 0, (f["rain"] > 4) & (f["temp"] > 24), f["rain"] >= 2, f["rain"] > 0,
+         f["humidity"] >= 80, f["humidity"] >= 65, f["uvi"] >= 6],
+        [DESCRIPTIONS.index(d) for d in ("snow", "light snow", "thunderstorm", "moderate rain", "light rain",
+                                         "overcast clouds", "scattered clouds", "sunny")],
+        default=DESCRIPTIONS.index("clear sky"),
+    ).astype(np.uint16)
+
+    fields = {name: fields[name].astype(np.float32) for name in FIELDS}
+    return WeatherTimeline(city, np.arange(hours, dtype=np.int32), fields, codes, list(DESCRIPTIONS))
+
+
+def city_names(cities):
+    if cities == 1:
+        return ["samplecity"]
+    return [f"city{i:03d}" for i in range(cities)]
+
+
+def generate(cities=1, years=1, seed=0, days_per_year=365):
+    """Yield one WeatherTimeline per city; the same seed always gives the same data."""
+    hours = int(round(years * days_per_year * 24))
+    streams = np.random.SeedSequence(seed).spawn(cities)
+    for name, stream in zip(city_names(cities), streams):
+        yield _generate_one(name, stream, hours, days_per_year, cities > 1)
+
+
+def _generate_one(name, stream, hours, days_per_year, vary_climate):
+    rng = np.random.default_rng(stream)
+    climate = random_climate(rng) if vary_climate else None
+    return generate_city(hours, rng, city=name, days_per_year=days_per_year, climate=climate)
+
+
+def _lines(timeline):
+    # 레코드를 WRITE_CHUNK 시간씩 묶어서 문자열로
+    descriptions = timeline.descriptions
+    columns = [timeline.hours] + [timeline.fields[name] for name in FIELDS]
+    for start in range(0, len(timeline), WRITE_CHUNK):
+        end = start + WRITE_CHUNK
+        rows = zip(*(c[start:end].tolist() for c in columns), timeline.desc_codes[start:end].tolist())
+        yield [_RECORD % (*row[:-1], descriptions[row[-1]]) for row in rows]
+
+
+def write_json(path, timeline):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"city": "%s", "hourly": [\n' % timeline.city)
+        first = True
+        for lines in _lines(timeline):
+            if not first:
+                f.write(",\n")
+            f.write(",\n".join(lines))
+            first = False
+        f.write("\n]}\n")
+
+
+def write_ndjson(path, timeline):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"city": "%s"}\n' % timeline.city)
+        for lines in _lines(timeline):
+            f.write("\n".join(lines))
+            f.write("\n")
+
+
+def output_path(out_dir, city, fmt):
+    if fmt == "columnar":
+        return os.path.join(out_dir, city)
+    return os.path.join(out_dir, f"{city}.{fmt}")
+
+
+def write(timeline, out_dir, fmt="json"):
+    path = output_path(out_dir, timeline.city, fmt)
+    if fmt == "json":
+        write_json(path, timeline)
+    elif fmt == "ndjson":
+        write_ndjson(path, timeline)
+    elif fmt == "columnar":
+        write_columnar(path, timeline)
+    else:
+        raise ValueError(f"unknown format {fmt!r} (expected one of {FORMATS})")
+    return path
+
+
+def _generate_and_write(name, stream, hours, days_per_year, vary_climate, out_dir, fmt):
+    timeline = _generate_one(name, stream, hours, days_per_year, vary_climate)
+    return write(timeline, out_dir, fmt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate seeded synthetic hourly weather.")
+    parser.add_argument("--cities", type=int, default=1)
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--days-per-year", type=float, default=12,
+                        help="length of one seasonal cycle in days (12 = one day per phase, 365 = real year)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=FORMATS, default="json")
+    parser.add_argument("--out", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--workers", type=int, default=1, help="write cities in parallel processes")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    hours = int(round(args.years * args.days_per_year * 24))
+    names = city_names(args.cities)
+    streams = np.random.SeedSequence(args.seed).spawn(args.cities)
+    jobs = [(name, stream, hours, args.days_per_year, args.cities > 1, args.out, args.format)
+            for name, stream in zip(names, streams)]
+
+    start = time.perf_counter()
+    if args.workers > 1:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=ctx) as pool:
+            paths = list(pool.map(_generate_and_write, *zip(*jobs)))
+    else:
+        paths = [_generate_and_write(*job) for job in jobs]
+    elapsed = time.perf_counter() - start
+
+    total = 0
+    for path in paths:
+        if os.path.isdir(path):
+            total += sum(os.path.getsize(os.path.join(path, n)) for n in os.listdir(path))
+        else:
+            total += os.path.getsize(path)
+    print(f"{len(paths)} cities x {hours} hours -> {args.out} ({args.format}, "
+          f"{total / 1024 / 1024:.1f} MiB in {elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from weather_timeline import FIELDS, NDJSON_SUFFIXES, WeatherTimeline
+from weather_cache import load_cached
+
+CATALOG_NAME = ".catalog.json"
+
+# 색인 형식이 바뀌면 올려서 모든 파일을 다시 읽음
+CATALOG_VERSION = 1
+
+DATA_SUFFIXES = (".json",) + NDJSON_SUFFIXES
+
+
+def file_sha1(path, read_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(read_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def index_file(path, st=None):
+    """Catalog entry for one weather file: city, hour count, per-field [min, max] and hash."""
+    st = st if st is not None else os.stat(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    entry = {"name": name, "file": os.path.basename(path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    try:
+        # 메모리 맵 캐시가 있으면 파싱하지 않음 (색인만 만들 때는 캐시를 새로 쓰지 않음)
+        timeline = load_cached(path, default_city=name) or WeatherTimeline.load(path, default_city=name)
+        entry["sha1"] = file_sha1(path)
+    except (OSError, ValueError) as e:
+        # 읽을 수 없는 파일도 기록해 두어 바뀌기 전까지는 다시 읽지 않음
+        entry["error"] = str(e)
+        return entry
+    entry["city"] = timeline.city or name
+    entry["hours"] = len(timeline)
+    entry["fields"] = {f: [float(timeline.fields[f].min()), float(timeline.fields[f].max())] if len(timeline) else None
+                       for f in FIELDS}
+    return entry
+
+
+def search_key(entry):
+    return f"{entry['name']} {entry.get('city', '')}".lower()
+
+
+def filter_entries(entries, text, keys=None):
+    # 공백으로 나눈 단어가 모두 이름이나 도시에 들어 있는 항목만 (대소문자 무시)
+    words = text.lower().split()
+    if not words:
+        return list(entries)
+    keys = keys if keys is not None else [search_key(e) for e in entries]
+    return [e for e, key in zip(entries, keys) if all(w in key for w in words)]
+
+
+class Catalog:
+    """Index of the weather files in a data directory, stored in <data_dir>/.catalog.json.
+
+    `refresh` stats every file and re-reads only the ones whose size or
+    mtime changed (or that are new), and drops the ones that went away, so
+    listing and searching thousands of datasets never opens them. `entries`
+    holds the readable datasets sorted by name and `version` changes
+    whenever the listing does. `find` looks a dataset up by file stem or
+    city, ignoring case.
+    """
+
+    def __init__(self, data_dir="data"):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, CATALOG_NAME)
+        self.entries = []
+        self.keys = []
+        self.version = None
+        self._index = {}
+        self._lookup = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CATALOG_VERSION:
+            self._index = data.get("files", {})
+            self._publish()
+
+    def _save(self):
+        # 임시 파일에 쓰고 바꿔치기 (읽는 쪽이 반쯤 쓴 색인을 보지 않게)
+        try:
+            fd, tmp = tempfile.mkstemp(prefix=".catalog-", suffix=".tmp", dir=self.data_dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                # json.dump는 파이썬 인코더로 조금씩 씀; dumps는 C 인코더로 한 번에 만듦
+                f.write(json.dumps({"version": CATALOG_VERSION, "files": self._index}))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not write data catalog {self.path}: {e}")
+
+    def _publish(self):
+        entries = sorted((e for e in self._index.values() if "error" not in e), key=lambda e: e["name"].lower())
+        lookup = {}
+        for e in entries:
+            lookup.setdefault(e.get("city", "").lower(), e)
+        for e in entries:
+            lookup[e["name"].lower()] = e
+        digest = hashlib.sha1()
+        for e in entries:
+            digest.update(f"{e['file']}:{e['mtime_ns']}:{e['size']};".encode("utf-8"))
+        self.entries = entries
+        self.keys = [search_key(e) for e in entries]
+        self._lookup = lookup
+        self.version = digest.hexdigest()[:16]
+
+    def refresh(self):
+        """Bring the index up to date with the directory; returns True if the listing changed."""
+        with self._lock:
+            try:
+                scan = [d for d in os.scandir(self.data_dir)
+                        if d.is_file() and not d.name.startswith(".") and d.name.endswith(DATA_SUFFIXES)]
+            except OSError:
+                scan = []
+            changed = False
+            seen = set()
+            for d in scan:
+                seen.add(d.name)
+                st = d.stat()
+                old = self._index.get(d.name)
+                if old is not None and old["mtime_ns"] == st.st_mtime_ns and old["size"] == st.st_size:
+                    continue
+                self._index[d.name] = index_file(d.path, st)
+                changed = True
+            for name in [name for name in self._index if name not in seen]:
+                del self._index[name]
+                changed = True
+            if changed:
+                self._publish()
+                self._save()
+            return changed
+
+    def find(self, name):
+        return self._lookup.get(name.lower())
+
+    def entry_path(self, entry):
+        return os.path.join(self.data_dir, entry["file"])
+
+    def filter(self, text):
+        return filter_entries(self.entries, text, self.keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index the weather files in a data directory.")
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--filter", default="", help="only list datasets whose name or city contains these words")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = Catalog(args.data)
+    loaded = time.perf_counter()
+    changed = catalog.refresh()
+    done = time.perf_counter()
+    for e in catalog.filter(args.filter):
+        temp = e["fields"]["temp"]
+        temp = f"{temp[0]:6.1f} .. {temp[1]:5.1f} °C" if temp else ""
+        print(f"{e['name']:<24} {e['city']:<16} {e['hours']:8d} h  {temp}")
+    print(f"{len(catalog.entries)} datasets; index read in {(loaded - start) * 1000:.1f} ms, "
+          f"refresh {'updated' if changed else 'unchanged'} in {(done - loaded) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import functools
+import sys
+
+from weather_timeline import WeatherTimeline
+from mapping_spec import Mapping, MappingProfile, load_spec, merge_spec
+
+# 효과 파라미터 테이블의 열 순서 (hours x params)
+EFFECT_PARAMS = (
+    "pitch_ratio",
+    "vol",
+    "rev_bal",
+    "rev_size",
+    "cutoff_freq",
+    "trem_rate",
+    "eq_gain",
+    "azimuth",
+    "elevation",
+    "pan_pos",
+)
+PARAM_INDEX = {name: i for i, name in enumerate(EFFECT_PARAMS)}
+
+# 날씨 데이터가 없을 때 체인을 만드는 기본 날씨
+DEFAULT_HOUR = {
+    "temp": 10, "humidity": 50, "rain": 0, "snow": 0,
+    "wind_speed": 1, "wind_deg": 0, "uvi": 0,
+}
+
+
+# 앱들이 공유하는 기본 매핑 (mappings/effects.json)
+EFFECT_MAPPING = "effects"
+
+
+@functools.lru_cache(maxsize=None)
+def _effect_mapping(cutoff_range, vol_scale):
+    overrides = {}
+    if cutoff_range is not None:
+        overrides["cutoff_freq"] = {"clamp": list(cutoff_range)}
+    if vol_scale != 1.0:
+        overrides["vol"] = {"gain": vol_scale}
+    spec = merge_spec(load_spec(EFFECT_MAPPING)[0], {"params": overrides})
+    return Mapping(spec, EFFECT_PARAMS, EFFECT_MAPPING)
+
+
+def effect_mapping(cutoff_range=None, vol_scale=1.0):
+    return _effect_mapping(tuple(cutoff_range) if cutoff_range is not None else None, float(vol_scale))
+
+
+def effect_profile(name):
+    # 앱별 매핑 파일 (실행 중에 다시 읽을 수 있음); 열은 항상 EFFECT_PARAMS 순서
+    return MappingProfile(name, EFFECT_PARAMS)
+
+
+def compute_effect_table(fields, cutoff_range=None, vol_scale=1.0):
+    return effect_mapping(cutoff_range, vol_scale).table(fields)
+
+
+def default_effect_row(cutoff_range=None, vol_scale=1.0, mapping=None):
+    mapping = mapping if mapping is not None else effect_mapping(cutoff_range, vol_scale)
+    return mapping.row(DEFAULT_HOUR)
+
+
+if __name__ == "__main__":
+    # 사용법: python effect_params.py data/seoul.json > seoul_effects.csv
+    timeline = WeatherTimeline.load(sys.argv[1])
+    table = compute_effect_table(timeline.fields)
+    print("hour," + ",".join(EFFECT_PARAMS))
+    for hour, row in zip(timeline.hours, table):
+        print(f"{hour}," + ",".join(f"{v:g}" for v in row))
@@ -0,0 +1,218 @@
+import numpy as np
+from pyo import (ButLP, Freeverb, Sine, EQ, Pan, HRTF, SigTo, Sig, InputFader, CallAfter, DataTable, Phasor, Pointer2,
+                 Wrap)
+
+from effect_params import PARAM_INDEX, effect_mapping
+from timeline_resample import resample_fields, shortest_arc, DEFAULT_SAMPLES_PER_HOUR, LINEAR
+
+# 매 시간 부드럽게 바뀌는 파라미터 (pan_pos, elevation은 데이터셋을 바꿀 때만 설정)
+RAMPED_PARAMS = (
+    "pitch_ratio",
+    "vol",
+    "rev_bal",
+    "rev_size",
+    "cutoff_freq",
+    "trem_rate",
+    "eq_gain",
+    "azimuth",
+)
+
+# 램프 시간 = 재생 속도(초/시간) x 비율
+DEFAULT_RAMP_RATIO = 0.5
+
+# 음원을 바꿀 때 크로스페이드 시간 (초)
+DEFAULT_FADE_TIME = 0.5
+
+# 테이블 샘플 사이를 보간하지 않는 파라미터: 359° -> 0° 사이를 보간하면 한 바퀴를 돌게 됨
+# (HRTF가 360/0 경계를 스스로 처리하므로 제어값 단위의 계단이면 충분)
+STEPPED_PARAMS = ("azimuth",)
+
+# 각도 파라미터: SigTo 램프도 0/360 경계를 넘어 짧은 쪽으로 돌게 함
+CIRCULAR_PARAMS = ("azimuth",)
+
+
+def ramp_controls(row, ramp_time):
+    controls = {}
+    for name in RAMPED_PARAMS:
+        value = float(row[PARAM_INDEX[name]])
+        controls[name] = SigTo(value=value, time=ramp_time, init=value)
+    return controls
+
+
+class ControlTables:
+    """RAMPED_PARAMS read from pre-interpolated pyo tables instead of SigTo ramps.
+
+    `load` upsamples the hourly fields once (see timeline_resample.py),
+    maps them to effect parameters (a mapping_spec.Mapping, or the default
+    effect mapping with `table_options`) and writes one DataTable per parameter.
+    A single Phasor sweeps all tables once per loop of the timeline, so the
+    audio thread follows the weather between hours without any per-tick
+    work; `seek` and `set_seconds_per_hour` keep it in step with the app.
+    """
+
+    def __init__(self, row, samples_per_hour=DEFAULT_SAMPLES_PER_HOUR, mode=LINEAR, seconds_per_hour=1.0):
+        self.samples_per_hour = samples_per_hour
+        self.mode = mode
+        self.seconds_per_hour = seconds_per_hour
+        self.hours = 1
+        self.table = None  # 보간된 제어 프레임 (frames x EFFECT_PARAMS), OSC 출력도 같은 값을 씀
+        self.phasor = Phasor(freq=1.0 / seconds_per_hour, mul=0.5)
+        self.tables = {}
+        self.controls = {}
+        for name in RAMPED_PARAMS:
+            value = float(row[PARAM_INDEX[name]])
+            self.tables[name] = DataTable(size=2, init=[value, value])
+            self.controls[name] = Pointer2(self.tables[name], self.phasor, interp=1 if name in STEPPED_PARAMS else 2,
+                                           autosmooth=False)
+
+    def load(self, fields, hour=0, mapping=None, **table_options):
+        mapping = mapping if mapping is not None else effect_mapping(**table_options)
+        table = mapping.table(resample_fields(fields, self.samples_per_hour, self.mode))
+        n = len(table)
+        if not n:
+            return
+        self.table = table
+        for name in RAMPED_PARAMS:
+            # 마지막 칸은 첫 값의 복사본: 끝에서 처음으로 보간하며 이어짐
+            new = DataTable(size=n + 1)
+            buf = np.asarray(new.getBuffer())
+            buf[:n] = table[:, PARAM_INDEX[name]]
+            buf[n] = buf[0]
+            self.controls[name].setTable(new)
+            self.tables[name] = new
+        self.hours = n // self.samples_per_hour
+        self.phasor.mul = n / (n + 1)
+        self.phasor.freq = 1.0 / (self.hours * self.seconds_per_hour)
+        self.seek(hour)
+
+    def seek(self, hour):
+        self.phasor.phase = (hour % self.hours) / self.hours
+        self.phasor.reset()
+
+    def set_seconds_per_hour(self, seconds_per_hour):
+        self.seconds_per_hour = seconds_per_hour
+        self.phasor.freq = 1.0 / (self.hours * seconds_per_hour)
+
+    def hold(self, hour):
+        # 시간 고정: 그 시간의 값에서 멈춤 (release로 다시 진행)
+        self.seek(hour)
+        self.phasor.freq = 0
+
+    def release(self):
+        self.set_seconds_per_hour(self.seconds_per_hour)
+
+    def stop(self):
+        for ctl in self.controls.values():
+            ctl.stop()
+        self.phasor.stop()
+
+
+def _set_target(ctl, value, circular=False):
+    if circular:
+        # 지금 목표값에서 짧은 쪽으로 가는 값으로 (359 -> 1이면 361)
+        value = ctl.value + shortest_arc(value - ctl.value)
+    ctl.value = value
+
+
+class EffectsChain:
+    """InputFader -> ButLP -> Freeverb -> tremolo -> EQ -> Pan -> HRTF.
+
+    The chain is meant to be built once and kept alive: `set_source`
+    crossfades a new music player in, and `retarget` points the controls at
+    a new dataset. `controls` maps every name in RAMPED_PARAMS to a pyo
+    object. By default these are SigTo ramps that `set_row` retargets from
+    any thread.
+    """
+
+    def __init__(self, source, row, controls=None, ramp_time=0.5, channels=2):
+        if controls is None:
+            controls = ramp_controls(row, ramp_time)
+        self.controls = controls
+        self.source = None
+        self._retired = []
+        c = controls
+
+        # 음원이 없을 때는 무음; 채널 수는 여기서 고정됨
+        self._silence = Sig([0] * channels)
+        self.input = InputFader(self._silence)
+
+        self.filter_lp = ButLP(self.input, freq=c["cutoff_freq"])
+        self.rev = Freeverb(self.filter_lp, size=c["rev_size"], bal=c["rev_bal"])
+        self.lfo = Sine(freq=c["trem_rate"], mul=0.5, add=0.5)
+        self.tremolo = self.rev * self.lfo
+        self.high_shelf = EQ(self.tremolo, freq=5000, boost=c["eq_gain"])
+        self.pan = Pan(self.high_shelf, outs=2, pan=float(row[PARAM_INDEX["pan_pos"]]))
+        # SigTo 방위각은 펼친 값(예: 350 -> 370)으로 램프하고 HRTF에는 0~360으로 접어서 넘김
+        # (ControlTables는 이미 0~360 값을 읽음)
+        self.azimuth = Wrap(c["azimuth"], 0, 360) if isinstance(c["azimuth"], SigTo) else c["azimuth"]
+        self.hrtf = HRTF(self.pan, azimuth=self.azimuth,
+                         elevation=float(row[PARAM_INDEX["elevation"]]))
+
+        self._targets = [(c[name], PARAM_INDEX[name], name in CIRCULAR_PARAMS) for name in RAMPED_PARAMS
+                         if isinstance(c[name], SigTo)]
+
+        if source is not None:
+            self.set_source(source, fadetime=0)
+
+    @property
+    def stages(self):
+        stages = [self.input, self.filter_lp, self.rev, self.lfo, self.tremolo, self.high_shelf,
+                  self.pan, self.hrtf]
+        if isinstance(self.azimuth, Wrap):
+            stages.append(self.azimuth)
+        return stages
+
+    def set_source(self, source, fadetime=DEFAULT_FADE_TIME, rate=None):
+        # 재생 속도와 볼륨은 음원에 직접 연결
+        # rate가 있으면 TableRead 같은 테이블 재생기: 원래 속도의 freq에 pitch를 곱함
+        if source is not None:
+            if rate is None:
+                source.speed = self.controls["pitch_ratio"]
+            else:
+                source.freq = self.controls["pitch_ratio"] * rate
+            source.mul = self.controls["vol"]
+        self.input.setInput(source if source is not None else self._silence, max(fadetime, 0.001))
+
+        # 이전 음원은 페이드아웃이 끝난 뒤 정지 (끝난 예약은 정리)
+        self._retired = [(old, timer) for old, timer in self._retired if timer.isPlaying()]
+        old = self.source
+        if old is not None and old is not source:
+            self._retired.append((old, CallAfter(old.stop, time=fadetime + 0.05)))
+        self.source = source
+
+    def retarget(self, row):
+        # 새 데이터셋: 체인은 그대로 두고 파라미터만 바꿈
+        self.set_row(row)
+        self.pan.pan = float(row[PARAM_INDEX["pan_pos"]])
+        self.hrtf.elevation = float(row[PARAM_INDEX["elevation"]])
+
+    def set_row(self, row):
+        for ctl, idx, circular in self._targets:
+            _set_target(ctl, float(row[idx]), circular)
+
+    def set_values(self, values):
+        for name, value in values.items():
+            ctl = self.controls.get(name)
+            if isinstance(ctl, SigTo):
+                _set_target(ctl, value, name in CIRCULAR_PARAMS)
+
+    def set_ramp_time(self, ramp_time):
+        for ctl, _, _ in self._targets:
+            ctl.time = ramp_time
+
+    def out(self):
+        self.hrtf.out()
+        return self
+
+    def dry_out(self):
+        # 효과를 거치지 않은 음원도 함께 출력 (크로스페이드 적용됨)
+        self.input.out()
+        return self
+
+    def stop(self):
+        if self.source is not None:
+            self.source.stop()
+        for stage in self.stages:
+            stage.stop()
+        for ctl in self.controls.values():
+            ctl.stop()
@@ -0,0 +1,261 @@
+import argparse
+import itertools
+import json
+import socket
+import threading
+
+from data_catalog import filter_entries
+from sonification_engine import DEFAULT_ADDRESS, EngineError, parse_address, timeline_from_dict
+from state_channel import LatestValue, HourState
+from weather_provider import ProviderError
+
+DEFAULT_TIMEOUT = 30.0
+
+
+class EngineConnectionError(EngineError, ConnectionError):
+    """The engine daemon could not be reached or the connection to it was lost."""
+
+
+# 엔진에서 난 오류를 같은 종류의 예외로 다시 던짐 (GUI가 로컬 엔진과 같은 except를 씀)
+# 연결이 끊긴 것은 EngineError로 (GUI의 except EngineError가 받도록)
+ERRORS = {
+    "FileNotFoundError": FileNotFoundError,
+    "ProviderError": ProviderError,
+    "TimeoutError": TimeoutError,
+    "ValueError": ValueError,
+    "ConnectionError": EngineConnectionError,
+}
+
+
+class EngineClient:
+    """Controls a sonification_engine.py daemon through the same methods as SonificationEngine.
+
+    Requests block until their reply arrives (at most `timeout` seconds). A
+    reader thread matches replies to requests by id, publishes hour events
+    to `hour_state` and passes every event to the callbacks added with
+    `subscribe`. When the connection drops, pending requests fail with
+    EngineConnectionError and the next request connects again (and
+    subscribes again if there are callbacks). `close` only disconnects;
+    the engine keeps playing.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=DEFAULT_TIMEOUT):
+        self.address = parse_address(address)
+        self.timeout = timeout
+        self.hour_state = LatestValue()
+        self.sock = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._listeners = []
+        self._subscribed = False
+        self._reader = None
+
+    def connect(self):
+        if self.sock is not None:
+            return
+        try:
+            if isinstance(self.address, tuple):
+                sock = socket.create_connection(self.address, timeout=self.timeout)
+            else:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    sock.settimeout(self.timeout)
+                    sock.connect(self.address)
+                except OSError:
+                    sock.close()
+                    raise
+        except OSError as e:
+            raise EngineConnectionError(f"could not connect to the engine at {self.address}: {e}") from e
+        sock.settimeout(None)
+        self.sock = sock
+        self._subscribed = False
+        self._reader = threading.Thread(target=self._read, args=(sock,), daemon=True)
+        self._reader.start()
+        if self._listeners:
+            # 다시 연결한 경우: 이벤트를 계속 받음
+            self.request("subscribe")
+            self._subscribed = True
+
+    def boot(self):
+        # 엔진은 이미 부팅되어 있음: 연결만 하고 상태를 돌려줌 (SonificationEngine.boot와 같은 자리)
+        self.connect()
+        return self.status()
+
+    def request(self, cmd, **args):
+        self.connect()
+        done = threading.Event()
+        slot = [done, None]
+        with self._lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = slot
+            try:
+                if self.sock is None:
+                    raise ConnectionResetError("the connection was closed")
+                self.sock.sendall((json.dumps({"id": request_id, "cmd": cmd, **args}) + "\n").encode("utf-8"))
+            except OSError as e:
+                self._pending.pop(request_id, None)
+                raise EngineConnectionError(f"lost the connection to the engine: {e}") from e
+        if not done.wait(self.timeout):
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise TimeoutError(f"the engine did not answer {cmd!r} within {self.timeout:g} s")
+        reply = slot[1]
+        if reply.get("ok"):
+            return reply.get("result")
+        raise ERRORS.get(reply.get("type"), EngineError)(reply.get("error", "engine error"))
+
+    def _read(self, sock):
+        try:
+            for line in sock.makefile("rb"):
+                message = json.loads(line)
+                if "event" in message:
+                    self._on_event(message)
+                    continue
+                with self._lock:
+                    slot = self._pending.pop(message.get("id"), None)
+                if slot is not None:
+                    slot[1] = message
+                    slot[0].set()
+        except (OSError, ValueError):
+            pass
+        finally:
+            # 기다리던 요청은 모두 실패로 끝내고, 다음 요청은 새로 연결함
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                if self.sock is sock:
+                    self.sock = None
+                    self._subscribed = False
+            sock.close()
+            for slot in pending.values():
+                slot[1] = {"ok": False, "error": "lost the connection to the engine", "type": "ConnectionError"}
+                slot[0].set()
+            self._on_event({"event": "closed"})
+
+    def _on_event(self, event):
+        if event["event"] == "hour":
+            self.hour_state.publish(HourState(event["generation"], event["hour"]))
+        for callback in list(self._listeners):
+            callback(event)
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+        self.connect()
+        if not self._subscribed:
+            self.request("subscribe")
+            self._subscribed = True
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def status(self):
+        return self.request("status")
+
+    def load(self, region):
+        return self.request("load", region=region)
+
+    def play(self, path):
+        return self.request("play", path=path)
+
+    def seek(self, hour):
+        return self.request("seek", hour=hour)
+
+    def fix(self, hour=None):
+        return self.request("fix", hour=hour)
+
+    def unfix(self):
+        return self.request("unfix")
+
+    def set_auto_update(self, enabled):
+        return self.request("set_auto_update", enabled=enabled)
+
+    def set_effects(self, values):
+        return self.request("set_effects", values=values)
+
+    def set_speed(self, seconds_per_hour):
+        return self.request("set_speed", seconds_per_hour=seconds_per_hour)
+
+    def metrics(self, samples=False):
+        return self.request("metrics", samples=samples)
+
+    def datasets(self, since=None):
+        return self.request("datasets", since=since)
+
+    def timeline_data(self, hour=None):
+        return self.request("timeline_data", hour=hour)
+
+    def get_timeline(self):
+        data = self.timeline_data()
+        return timeline_from_dict(data) if data is not None else None
+
+    def shutdown(self):
+        return self.request("shutdown")
+
+    def close(self):
+        with self._lock:
+            sock, self.sock = self.sock, None
+            self._subscribed = False
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+        self._reader.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send one command to a running sonification_engine.py.")
+    parser.add_argument("--socket", default=DEFAULT_ADDRESS, help="unix socket path, or host:port for TCP")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status")
+    commands.add_parser("load").add_argument("region")
+    commands.add_parser("play").add_argument("path")
+    commands.add_parser("seek").add_argument("hour", type=int)
+    commands.add_parser("fix").add_argument("hour", type=int, nargs="?")
+    commands.add_parser("unfix")
+    commands.add_parser("auto").add_argument("enabled", choices=["on", "off"])
+    commands.add_parser("speed").add_argument("seconds_per_hour", type=float)
+    commands.add_parser("metrics").add_argument("--samples", action="store_true")
+    commands.add_parser("datasets").add_argument("--filter", default="")
+    commands.add_parser("watch", help="print engine events until interrupted")
+    commands.add_parser("shutdown")
+    args = parser.parse_args()
+
+    client = EngineClient(args.socket)
+    try:
+        if args.command == "watch":
+            closed = threading.Event()
+
+            def show(event):
+                print(json.dumps(event), flush=True)
+                if event["event"] == "closed":
+                    closed.set()
+
+            client.subscribe(show)
+            closed.wait()
+            return
+        calls = {
+            "status": client.status,
+            "load": lambda: client.load(args.region),
+            "play": lambda: client.play(args.path),
+            "seek": lambda: client.seek(args.hour),
+            "fix": lambda: client.fix(args.hour),
+            "unfix": client.unfix,
+            "auto": lambda: client.set_auto_update(args.enabled == "on"),
+            "speed": lambda: client.set_speed(args.seconds_per_hour),
+            "metrics": lambda: client.metrics(args.samples),
+            "datasets": lambda: filter_entries(client.datasets()["entries"], args.filter),
+            "shutdown": client.shutdown,
+        }
+        print(json.dumps(calls[args.command](), indent=1))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
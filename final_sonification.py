@@ -1,21 +1,59 @@
-import wx
-import json
-import threading
 import time
-from pyo import *
-import os
-from pyo import Pan, EQ
+APP_START = time.perf_counter()  # 시작 시간 측정 기준 (다른 import보다 먼저)
+
+import argparse
+import wx
+from timeline_graph import TimelineGraph
+from timeline_window import TimelineRange
+from timeline_resample import MODES, DEFAULT_SAMPLES_PER_HOUR
+from tick_metrics import TickMetrics, FRAME_STAGES, dump_all, format_summary
+from tick_scheduler import POLICIES, SKIP
+from app_startup import StartupTimer, BackgroundTask, import_plotting
+from state_channel import DEFAULT_FRAME_RATE
+from weather_provider import ProviderError
+from sonification_engine import SonificationEngine, EngineError
+from osc_output import DEFAULT_RATE as DEFAULT_OSC_RATE
+from engine_client import EngineClient
+from catalog_view import CatalogList, DATASET_REFRESH_MS
 
 class WeatherSonificationApp(wx.Frame):
-    def __init__(self):
+    def __init__(self, metrics=None, metrics_json=None, tick_policy=SKIP, pyo_clock=False, live_url=None,
+                 smooth=None, samples_per_hour=DEFAULT_SAMPLES_PER_HOUR, mapping="final_sonification",
+                 startup_json=None, exit_after_startup=False, engine_address=None,
+                 osc=None, osc_rate=DEFAULT_OSC_RATE, window=None):
         super().__init__(None, title="Weather Data Sonification(Sound Design&Programming/20251144_MInkyoungChun)", size=(700, 650))
         
+        self.startup = StartupTimer(APP_START)
+        self.startup_json = startup_json
+        self.exit_after_startup = exit_after_startup
+        
+        # metrics가 None이면 틱 계측을 전혀 하지 않음 (틱은 엔진이, 프레임은 이 창이 잼)
+        self.metrics = metrics
+        self.frame_metrics = TickMetrics(FRAME_STAGES) if metrics is not None else None
+        self.metrics_json = metrics_json
+        # 로딩, 매핑, 시간 스케줄, pyo 체인은 엔진이 맡고 이 창은 그리기만 함
+        # engine_address가 있으면 실행 중인 sonification_engine.py에 연결 (매핑/live/smooth는 엔진 쪽 설정)
+        if engine_address:
+            self.engine = EngineClient(engine_address)
+        else:
+            self.engine = SonificationEngine(mapping=mapping, live_url=live_url, smooth=smooth,
+                                             samples_per_hour=samples_per_hour, tick_policy=tick_policy,
+                                             pyo_clock=pyo_clock, metrics=metrics, osc=osc, osc_rate=osc_rate,
+                                             window=window)
+        self.engine_ready = False
+        
         panel = wx.Panel(self)
         vbox = wx.BoxSizer(wx.VERTICAL)
         
         # --- 지역 선택 및 로드 버튼 ---
         vbox.Add(wx.StaticText(panel, label="Select Region:"), flag=wx.LEFT|wx.TOP, border=10)
-        self.region_list = wx.ListBox(panel, choices=["Seoul", "Gwangju", "LosAngeles", "Vancouver","Dynamic","Winter_Sample",'SmoothSeasonalKorea','KoreaSeasonalCycle'])
+        hbox_filter = wx.BoxSizer(wx.HORIZONTAL)
+        hbox_filter.Add(wx.StaticText(panel, label="Filter:"), flag=wx.ALIGN_CENTER_VERTICAL|wx.RIGHT, border=8)
+        self.region_filter = wx.TextCtrl(panel)
+        hbox_filter.Add(self.region_filter, proportion=1)
+        vbox.Add(hbox_filter, flag=wx.EXPAND|wx.LEFT|wx.RIGHT|wx.BOTTOM, border=10)
+        # data/의 데이터셋 목록은 엔진의 색인에서 받아옴 (파일을 열지 않음)
+        self.region_list = CatalogList(panel)
         vbox.Add(self.region_list, flag=wx.EXPAND|wx.LEFT|wx.RIGHT, border=10)
         self.load_btn = wx.Button(panel, label="Load Weather Data")
         vbox.Add(self.load_btn, flag=wx.ALL, border=10)
@@ -44,122 +82,259 @@ class WeatherSonificationApp(wx.Frame):
         desc_sizer.Add(wx.StaticText(panel, label="• 습도 (Humidity): Reverb 크기 및 양 (울림 정도)"), flag=wx.LEFT, border=10)
         desc_sizer.Add(wx.StaticText(panel, label="• 자외선 지수 (UV Index): High_Self EQ 볼륨"), flag=wx.LEFT, border=10)
 
-        # --- 그래프 영역 ---
-        import matplotlib
-        matplotlib.use('WXAgg')
-        from matplotlib.figure import Figure
-        from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
-        self.figure = Figure(figsize=(5,2))
-        self.canvas = FigureCanvas(panel, -1, self.figure)
-        vbox.Add(self.canvas, proportion=1, flag=wx.EXPAND|wx.ALL, border=10)
+        # --- 그래프 영역 (matplotlib은 창이 뜬 뒤에 불러와서 이 자리를 캔버스로 바꿈) ---
+        self.graph = None
+        self.graph_placeholder = wx.StaticText(panel, label="Loading graph...")
+        vbox.Add(self.graph_placeholder, proportion=1, flag=wx.EXPAND|wx.ALL, border=10)
         
         # --- 날씨 요약 표시 텍스트박스 ---
         vbox.Add(wx.StaticText(panel, label="Weather Summary:"), flag=wx.LEFT|wx.TOP, border=10)
         self.weather_summary = wx.TextCtrl(panel, style=wx.TE_MULTILINE|wx.TE_READONLY, size=(-1,90))
         vbox.Add(self.weather_summary, flag=wx.EXPAND|wx.LEFT|wx.RIGHT|wx.BOTTOM, border=10)
         
+        # --- 틱 계측 표시 (--metrics 일 때만) ---
+        if self.metrics is not None:
+            vbox.Add(wx.StaticText(panel, label="Tick Stats:"), flag=wx.LEFT|wx.TOP, border=10)
+            self.stats_text = wx.StaticText(panel, label="")
+            self.stats_text.SetFont(wx.Font(8, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL))
+            vbox.Add(self.stats_text, flag=wx.EXPAND|wx.LEFT|wx.RIGHT|wx.BOTTOM, border=10)
+            self.stats_timer = wx.Timer(self)
+            self.Bind(wx.EVT_TIMER, self.update_stats_panel, self.stats_timer)
+            self.stats_timer.Start(1000)
+        
         vbox.Add(desc_sizer, flag=wx.EXPAND|wx.ALL, border=10)
         
         panel.SetSizer(vbox)
-        #음악 재생
-        self.server = Server().boot()
-        self.server.start()
+        self.panel = panel
+        self.vbox = vbox
         
-        #변수 초기화
-        self.music_player = None
-        self.rev = None
-        self.pan = None
-        self.high_shelf = None
+        # 오디오 상태 / 시작 시간 표시
+        self.CreateStatusBar(2)
+        self.SetStatusText("Audio: booting...", 0)
         
-        self.weather_data = None
+        #변수 초기화
+        self.timeline = None
+        self.generation = None  # 화면에 보이는 데이터셋 (엔진의 load_generation)
+        self.timeline_request = None  # 마지막으로 요청한 (generation, complete)
+        self.timeline_fetch = None
+        self.range_fetch = None
         self.current_hour = 0
-        self.running = False
         self.playback_speed = 1.0
         
-        self.current_pan_pos = 0.5
-        self.pan_speed = 0.01
-        
-        self.filter_lp = None
-        self.tremolo = None
-        self.hrtf = None
-
+        # 엔진은 시간 상태만 올리고, 그리기는 GUI 스레드가 프레임 단위로 최신 상태만
+        self.frame_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_frame, self.frame_timer)
+        self.frame_timer.Start(int(1000 / DEFAULT_FRAME_RATE))
         
         # 이벤트 연결
         self.load_btn.Bind(wx.EVT_BUTTON, self.on_load_weather)
         self.play_music_btn.Bind(wx.EVT_BUTTON, self.on_play_music)
         self.speed_slider.Bind(wx.EVT_SLIDER, self.on_speed_change)
+        self.region_filter.Bind(wx.EVT_TEXT, self.on_filter_change)
+        self.region_list.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.on_load_weather)
         
+        # 데이터셋 목록: 오디오가 준비되면 받아오고 그 뒤로는 바뀐 경우에만 다시 받음
+        self.dataset_version = None
+        self.dataset_fetch = None
+        self.dataset_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.refresh_datasets, self.dataset_timer)
+        
+        # 오디오가 준비될 때까지는 불러오기/재생을 막아 둠
+        self.load_btn.Disable()
+        self.play_music_btn.Disable()
         self.Show()
+        
+        # 창을 먼저 띄우고 pyo 부팅과 matplotlib import는 백그라운드에서 동시에
+        wx.CallAfter(self.on_startup_stage, "window")
+        self.audio_boot = BackgroundTask(self.engine.boot, self.on_audio_ready, self.on_audio_failed)
+        self.plotting_import = BackgroundTask(import_plotting, self.on_plotting_ready, self.on_plotting_failed)
     
+    def on_audio_ready(self, status):
+        if not self:
+            return
+        self.engine_ready = True
+        self.engine.subscribe(self.on_engine_event)
+        if isinstance(self.engine, EngineClient):
+            # 이미 돌고 있는 엔진의 재생 속도를 따름
+            self.playback_speed = status["seconds_per_hour"]
+            self.speed_slider.SetValue(int(self.playback_speed * 1000))
+        else:
+            self.engine.set_speed(self.playback_speed)
+        self.load_btn.Enable()
+        self.play_music_btn.Enable()
+        self.SetStatusText(f"Audio: ready ({status['sr']:g} Hz)", 0)
+        self.refresh_datasets()
+        self.dataset_timer.Start(DATASET_REFRESH_MS)
+        if status["hours"]:
+            # 이미 재생 중인 엔진에 붙은 경우
+            self.show_timeline(status["generation"], status["complete"])
+        self.on_startup_stage("audio")
     
-
-    def init_effects_chain(self):
-        if not self.music_player:
+    def on_audio_failed(self, error):
+        if not self:
             return
+        self.SetStatusText(f"Audio: failed ({error})", 0)
+        if self.exit_after_startup:
+            self.Close()
+            return
+        wx.MessageBox(f"Could not start the audio server: {error}", "Error", wx.OK | wx.ICON_ERROR)
+    
+    def on_plotting_ready(self, plotting):
+        if not self:
+            return
+        Figure, FigureCanvas = plotting
+        self.figure = Figure(figsize=(5,2))
+        self.canvas = FigureCanvas(self.panel, -1, self.figure)
+        self.graph = TimelineGraph(self.figure, self.canvas)
+        self.vbox.Replace(self.graph_placeholder, self.canvas)
+        self.graph_placeholder.Destroy()
+        self.panel.Layout()
+        if self.timeline is not None:
+            self.graph.set_timeline(self.timeline)
+            self.update_graph(self.current_hour)
+        self.on_startup_stage("graph")
+    
+    def on_plotting_failed(self, error):
+        if not self:
+            return
+        self.graph_placeholder.SetLabel(f"Graph unavailable: {error}")
+    
+    def on_startup_stage(self, stage):
+        if not self:
+            return
+        self.startup.mark(stage)
+        self.SetStatusText(f"Startup: {self.startup.format()}", 1)
+        if self.startup.done:
+            print(f"startup: {self.startup.format()}")
+            if self.startup_json:
+                self.startup.dump(self.startup_json)
+            if self.exit_after_startup:
+                self.Close()
+    
+    
 
-        # 중복 인스턴스 종료
-        for eff in [self.rev, self.filter_lp, self.tremolo, self.hrtf, self.pan, self.high_shelf]:
-            if eff:
-                eff.stop()
-
-        hour_data = self.weather_data["hourly"][0] if self.weather_data else {
-            "temp": 10, "humidity": 50, "rain": 0, "snow": 0, 
-            "wind_speed": 1, "wind_deg": 0, "uvi": 0
-        }
-
-        # 기본 파라미터 설정
-        rev_bal = min(max(hour_data["humidity"] / 100, 0.0), 1.0)
-        rev_size = min(max(hour_data["humidity"] / 100, 0.3), 0.9)
-        cutoff_freq = max(300, min(1200, 300 + (hour_data['temp'] - 10) * 40)) 
-        trem_rate = 0.1 + (hour_data["wind_speed"]/10) * 5 #0.1~5.1Hz
-        #trem_rate = 0.1 + (wind_speed / 10) * 5  # 풍속이 0~10에서 0.1~5.1Hz
-        azimuth = hour_data["wind_deg"] % 360
-        elevation = 20 if hour_data["wind_speed"] > 5 else 0
-        pan_pos = (hour_data["wind_deg"] % 360) / 360 * 2 - 1
-        eq_gain = min(hour_data.get("uvi", 0) / 10, 1.0)
-
-        # 이펙트 체인 구성
-        self.filter_lp = ButLP(self.music_player, freq=cutoff_freq)
-        self.rev = Freeverb(self.filter_lp, size=rev_size, bal=rev_bal)
-        self.lfo = Sine(freq=trem_rate, mul=0.5, add=0.5)
-        self.tremolo = self.rev * self.lfo
-        self.high_shelf = EQ(self.tremolo, freq=5000, boost=eq_gain)
-        self.pan = Pan(self.high_shelf, outs=2, pan=pan_pos)
-        self.hrtf = HRTF(self.pan, azimuth=azimuth, elevation=elevation)
-
-        self.rev.out()
-        self.filter_lp.out()
-        self.pan.out()
-        self.high_shelf.out()
-        self.tremolo.out()
-        self.hrtf.out()
-
-        
+    def refresh_datasets(self, event=None):
+        # 이전 요청이 아직 끝나지 않았으면 건너뜀
+        if self.dataset_fetch is not None and self.dataset_fetch.thread.is_alive():
+            return
+        version = self.dataset_version
+        self.dataset_fetch = BackgroundTask(lambda: self.engine.datasets(since=version),
+                                            self.on_datasets, self.on_datasets_failed)
+    
+    def on_datasets(self, result):
+        if not self:
+            return
+        self.dataset_version = result["version"]
+        if result["entries"] is not None:
+            self.region_list.set_entries(result["entries"])
+    
+    def on_datasets_failed(self, error):
+        if not self:
+            return
+        print(f"Could not list the datasets: {error}")
+    
+    def on_filter_change(self, event):
+        self.region_list.set_filter(self.region_filter.GetValue())
+    
     def on_load_weather(self, event):
-        region = self.region_list.GetStringSelection()
-        if not region:
+        entry = self.region_list.selected()
+        if entry is None:
             wx.MessageBox("Please select a region.", "Error", wx.OK | wx.ICON_ERROR)
             return
+        region = entry["name"]
         
-        filename = f"{region.lower()}.json"
         try:
-            with open(os.path.join('data',filename), "r", encoding="utf-8") as f:
-                self.weather_data = json.load(f)
-            wx.MessageBox(f"Loaded weather data for {self.weather_data.get('city', region)}", "Info", wx.OK | wx.ICON_INFORMATION)
+            # 엔진이 이전 재생을 멈추고 새 데이터셋으로 바꿈 (실패하면 이전 데이터셋을 계속 재생)
+            loaded = self.engine.load(region)
         except FileNotFoundError:
-            wx.MessageBox(f"Weather data file '{filename}' not found.", "Error", wx.OK | wx.ICON_ERROR)
+            wx.MessageBox(f"Weather data file '{entry['file']}' not found.", "Error", wx.OK | wx.ICON_ERROR)
+            return
+        except (ProviderError, TimeoutError) as e:
+            wx.MessageBox(f"Could not fetch live weather: {e}", "Error", wx.OK | wx.ICON_ERROR)
+            return
+        except EngineError as e:
+            wx.MessageBox(f"Could not load weather data: {e}", "Error", wx.OK | wx.ICON_ERROR)
             return
         
         self.current_hour = 0
-        self.init_effects_chain()
-        self.update_graph()
-        self.update_weather_summary(0)
-        
-        if self.running:
-            self.running = False
-            time.sleep(0.2)
-        self.running = True
-        threading.Thread(target=self.run_sonification_loop, daemon=True).start()
+        self.show_timeline(loaded["generation"], loaded["complete"])
+        wx.MessageBox(f"Loaded weather data for {loaded['city']}", "Info", wx.OK | wx.ICON_INFORMATION)
+    
+    def show_timeline(self, generation, complete=True):
+        # 데이터는 백그라운드에서 받아옴 (데몬이면 소켓으로 오는 동안 창이 멈추지 않게)
+        if (generation, complete) == self.timeline_request:
+            return
+        self.timeline_request = (generation, complete)
+        self.timeline_fetch = BackgroundTask(self.engine.get_timeline,
+                                             lambda timeline: self.on_timeline(generation, complete, timeline),
+                                             self.on_timeline_failed)
+    
+    def on_timeline(self, generation, complete, timeline):
+        # 그 사이에 더 새로운 데이터를 요청했으면 버림
+        if not self or (generation, complete) != self.timeline_request or timeline is None:
+            return
+        self.generation = generation
+        self.timeline = timeline
+        if self.current_hour >= len(self.timeline):
+            self.current_hour = 0
+        if self.graph is not None:
+            self.graph.set_timeline(self.timeline)
+        self.update_graph(self.current_hour)
+        self.update_weather_summary(self.current_hour)
+    
+    def on_timeline_failed(self, error):
+        if not self:
+            return
+        self.timeline_request = None
+        print(f"Could not fetch the weather timeline: {error}")
+    
+    def fetch_range(self, hour):
+        # 창으로 재생 중인 데몬에서는 재생 위치 주변만 받아 옴 (받는 중이면 기다림)
+        if self.range_fetch is not None and self.range_fetch.thread.is_alive():
+            return
+        generation = self.generation
+        self.range_fetch = BackgroundTask(lambda: self.engine.timeline_data(hour=hour),
+                                          lambda data: self.on_range(generation, data), self.on_range_failed)
+    
+    def on_range(self, generation, data):
+        if not self or generation != self.generation or not isinstance(self.timeline, TimelineRange):
+            return
+        if data is None or "offset" not in data:
+            return
+        self.timeline.update(data)
+        if self.graph is not None:
+            self.graph.set_view()
+    
+    def on_range_failed(self, error):
+        if not self:
+            return
+        print(f"Could not fetch the weather around the playhead: {error}")
+    
+    def on_engine_event(self, event):
+        # 엔진 스레드(또는 소켓 읽기 스레드)에서 불림; 시간 상태는 on_frame이 hour_state에서 가져감
+        if event["event"] != "hour":
+            wx.CallAfter(self.on_engine_message, event)
+    
+    def on_engine_message(self, event):
+        if not self:
+            return
+        kind = event["event"]
+        if kind == "timeline":
+            # 다른 클라이언트가 새 데이터셋을 불러왔거나 스트리밍 로딩이 끝남
+            # (스트리밍 중간의 청크마다 전체 데이터를 다시 받지는 않음)
+            request = self.timeline_request
+            if request is not None and event["generation"] < request[0]:
+                return
+            if request is None or event["generation"] != request[0] or event["complete"]:
+                self.show_timeline(event["generation"], event["complete"])
+        elif kind == "error":
+            wx.MessageBox(event["message"], "Error", wx.OK | wx.ICON_ERROR)
+        elif kind == "closed":
+            self.engine_ready = False
+            self.dataset_timer.Stop()
+            self.load_btn.Disable()
+            self.play_music_btn.Disable()
+            self.SetStatusText("Audio: engine disconnected", 0)
     
     def on_play_music(self, event):
         music_path = self.music_path_input.GetValue().strip()
@@ -167,134 +342,119 @@ class WeatherSonificationApp(wx.Frame):
             wx.MessageBox("Please enter a music file path.", "Error", wx.OK | wx.ICON_ERROR)
             return
         
-        if self.music_player:
-            self.music_player.stop()
-            self.music_player = None
-        
         try:
-            self.music_player = SfPlayer(music_path, loop=True, mul=0.5)
+            # 새 음원은 엔진의 기존 체인에 크로스페이드로 연결됨
+            self.engine.play(music_path)
         except Exception as e:
             wx.MessageBox(f"Error loading music file: {e}", "Error", wx.OK | wx.ICON_ERROR)
-            return
-        
-        self.init_effects_chain()
-        self.music_player.out()
     
-
-        
-    def run_sonification_loop(self):
-        total_hours = len(self.weather_data['hourly'])
-        
-        
-        while self.running:
-            if not self.weather_data or not self.music_player:
-                time.sleep(0.5)
-                continue
-            
-            hour_data = self.weather_data["hourly"][self.current_hour]
-            
-            temp = hour_data["temp"]
-            pitch_ratio = max(0.7, min(1.3, 0.7 + (temp - 10) * 0.02)) 
-            #기준점 10도, 0.02: 온도 1도당 pitch_ratio 변화량
-
-            
-            rain = hour_data.get("rain", 0)
-            snow = hour_data.get("snow", 0)
-            vol = max((rain + snow) / 10, 0.2)
-            
-            humidity = hour_data["humidity"]
-            rev_bal = min(max(humidity / 100, 0.0), 1.0)
-            rev_size = min(max(humidity / 100, 0.3), 0.9)
-
-            
-            wind_speed = hour_data["wind_speed"]
-            wind_deg = hour_data["wind_deg"] % 360
-            
-            uvi = hour_data.get("uvi", 0)
-            eq_gain = min(uvi / 10, 1.0)
-            
-            cutoff_freq = max(300, min(1200, 300 + (temp - 10) * 40)) 
-            self.filter_lp.freq = cutoff_freq
-
-            
-            trem_rate = 0.1 + (wind_speed / 10) * 5
-            
-            # 부드럽게게 파라미터 변화
-            wx.CallAfter(setattr, self.music_player, "speed", pitch_ratio)
-            wx.CallAfter(setattr, self.music_player, "mul", vol)
-            wx.CallAfter(setattr, self.rev, "bal", rev_bal)
-            wx.CallAfter(setattr, self.rev, "size", rev_size)
-            wx.CallAfter(setattr, self.filter_lp, "freq", cutoff_freq)
-            wx.CallAfter(setattr, self.tremolo, "freq", trem_rate)
-
-            #pan_pos = (wind_deg % 360) / 360 * 2 - 1
-            #wx.CallAfter(setattr, self.pan, "pan", pan_pos)
-
-            eq_gain = min(uvi / 10, 1.0)
-            wx.CallAfter(setattr, self.high_shelf, "boost", eq_gain)
-
-            wx.CallAfter(setattr, self.hrtf, "azimuth", wind_deg)
-
-            
-            self.update_graph(self.current_hour)
-            self.update_weather_summary(self.current_hour)
-            self.current_hour = (self.current_hour + 1) % total_hours
-            
-            time.sleep(self.playback_speed)
-
+    def on_frame(self, event):
+        # 마지막으로 올라온 시간 상태만 그림 (그 사이의 상태와 이전 데이터셋의 상태는 버림)
+        fm = self.frame_metrics
+        state = self.engine.hour_state.take()
+        if state is None or state.generation != self.generation or state.hour >= len(self.timeline):
+            if fm is not None:
+                fm.resync()
+            return
+        if fm is not None:
+            fm.begin()
+        self.current_hour = state.hour
+        if isinstance(self.timeline, TimelineRange) and self.timeline.needs(state.hour):
+            self.fetch_range(state.hour)
+        self.update_graph(state.hour)
+        if fm is not None:
+            fm.mark("graph")
+        self.update_weather_summary(state.hour)
+        if fm is not None:
+            fm.mark("summary")
+            fm.end(1.0 / DEFAULT_FRAME_RATE)
     
     def update_graph(self, current_hour=0):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        hours = [h["hour"] for h in self.weather_data["hourly"]]
-        temps = [h["temp"] for h in self.weather_data["hourly"]]
-        humid = [h["humidity"] for h in self.weather_data["hourly"]]
-        rains = [h.get("rain", 0) for h in self.weather_data["hourly"]]
-        snows = [h.get("snow", 0) for h in self.weather_data["hourly"]]
-        wind_speeds = [h.get("wind_speed", 0) for h in self.weather_data["hourly"]]
-        wind_degs = [h.get("wind_deg", 0) for h in self.weather_data["hourly"]]
-        uvis = [h.get("uvi", 0) for h in self.weather_data["hourly"]]
-        
-        ax.plot(hours, temps, label="Temperature (°C)", color="red")
-        #ax.plot(hours, humid, label="Humidity (%)", color="blue")
-        ax.plot(hours, rains, label="Rain (mm)", color="green")
-        ax.plot(hours, snows, label="Snow (mm)", color="cyan")
-        ax.plot(hours, wind_speeds, label="Wind Speed (m/s)", color="orange")
-        #ax.plot(hours, wind_degs, label="Wind Direction (°)", color="purple")
-        ax.plot(hours, uvis, label="UV Index", color="magenta")
-        
-        ax.axvline(x=current_hour, color='gray', linestyle='--')
-        ax.legend(loc='upper right')
-        ax.set_xlabel("Hour")
-        ax.set_title(f"Weather Data for Hour {current_hour}")
-        self.canvas.draw()
-
+        if self.graph is not None:
+            self.graph.update(current_hour)
     
     def update_weather_summary(self, current_hour=0):
-        hour_data = self.weather_data["hourly"][current_hour]
-        desc = hour_data.get("weather", [{}])[0].get("description", "No data")
+        tl = self.timeline
+        desc = tl.description(current_hour)
         summary = f"{current_hour} Hour: {desc.capitalize()}\n" \
-                  f"Temp: {hour_data['temp']} °C            " \
-                  f"Humidity: {hour_data['humidity']} %\n" \
-                  f"Wind Speed: {hour_data['wind_speed']} m/s       " \
-                  f"Wind Direction: {hour_data['wind_deg']}°\n" \
-                  f"Rain: {hour_data.get('rain',0)} mm          " \
-                  f"Snow: {hour_data.get('snow',0)} mm\n" \
-                  f"UV Index: {hour_data.get('uvi',0)}"
+                  f"Temp: {tl.temp[current_hour]:g} °C            " \
+                  f"Humidity: {tl.humidity[current_hour]:g} %\n" \
+                  f"Wind Speed: {tl.wind_speed[current_hour]:g} m/s       " \
+                  f"Wind Direction: {tl.wind_deg[current_hour]:g}°\n" \
+                  f"Rain: {tl.rain[current_hour]:g} mm          " \
+                  f"Snow: {tl.snow[current_hour]:g} mm\n" \
+                  f"UV Index: {tl.uvi[current_hour]:g}"
         self.weather_summary.SetValue(summary)
     
     def on_speed_change(self, event):
         self.playback_speed = self.speed_slider.GetValue() / 1000.0
+        if self.engine_ready:
+            self.engine.set_speed(self.playback_speed)
+
+    def update_stats_panel(self, event):
+        if not self.engine_ready:
+            return
+        tick = self.engine.metrics()
+        tick = format_summary(tick["summary"]) if tick is not None else "(tick metrics are off in the engine)"
+        self.stats_text.SetLabel(f"{tick}\n\n[frames] dropped states: {self.engine.hour_state.dropped}\n"
+                                 f"{self.frame_metrics.format()}")
+        self.Layout()
 
     def OnClose(self, event):
-        self.running = False
-        time.sleep(0.3)
-        self.server.stop()
-        self.server.shutdown()
+        self.frame_timer.Stop()
+        self.dataset_timer.Stop()
+        # 부팅 중에 닫으면 부팅이 끝난 뒤에 엔진을 정리
+        self.audio_boot.join()
+        if self.metrics is not None:
+            self.stats_timer.Stop()
+            if self.metrics_json:
+                tick = self.engine.metrics(samples=True) if self.engine_ready else None
+                if tick is not None:
+                    dump_all(self.metrics_json, tick=TickMetrics.from_dict(tick), frame=self.frame_metrics)
+                else:
+                    dump_all(self.metrics_json, frame=self.frame_metrics)
+        # 로컬 엔진은 오디오까지 내리고, 데몬에 연결한 경우에는 연결만 끊음 (데몬은 계속 재생)
+        self.engine.close()
         self.Destroy()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--metrics", action="store_true", help="time each sonification tick and show a stats panel")
+    parser.add_argument("--metrics-json", help="write the tick metrics here on exit (implies --metrics)")
+    parser.add_argument("--tick-policy", choices=POLICIES, default=SKIP,
+                        help="what to do when an hour tick misses its deadline")
+    parser.add_argument("--pyo-clock", action="store_true", help="schedule hour ticks on the audio clock")
+    parser.add_argument("--live", metavar="URL",
+                        help="fetch forecasts from this endpoint, e.g. http://127.0.0.1:8765/forecast")
+    parser.add_argument("--smooth", choices=MODES,
+                        help="interpolate the effect parameters between hours instead of ramping at each tick")
+    parser.add_argument("--samples-per-hour", type=int, default=DEFAULT_SAMPLES_PER_HOUR,
+                        help="control values per hour with --smooth")
+    parser.add_argument("--mapping", default="final_sonification",
+                        help="mapping spec name in mappings/ or a path to a JSON spec")
+    parser.add_argument("--startup-json", help="write the startup stage times here once the app is ready")
+    parser.add_argument("--exit-after-startup", action="store_true",
+                        help="close as soon as startup finishes (for timing startup)")
+    parser.add_argument("--engine", metavar="ADDRESS",
+                        help="control a running sonification_engine.py at this socket instead of playing "
+                             "in-process (its own --mapping/--live/--smooth apply)")
+    parser.add_argument("--osc", metavar="HOST:PORT", help="also send the mapped parameters as OSC bundles here")
+    parser.add_argument("--osc-rate", type=float, default=DEFAULT_OSC_RATE,
+                        help="OSC frames per second (only changed values are sent)")
+    parser.add_argument("--window", type=int, metavar="HOURS",
+                        help="keep only this many hours around the playhead in memory (for multi-year datasets)")
+    args = parser.parse_args()
+    if args.window and args.smooth:
+        parser.error("--window and --smooth cannot be combined")
+    metrics = TickMetrics() if args.metrics or args.metrics_json else None
+
     app = wx.App()
-    frame = WeatherSonificationApp()
+    frame = WeatherSonificationApp(metrics=metrics, metrics_json=args.metrics_json,
+                                   tick_policy=args.tick_policy, pyo_clock=args.pyo_clock,
+                                   live_url=args.live, smooth=args.smooth,
+                                   samples_per_hour=args.samples_per_hour, mapping=args.mapping,
+                                   startup_json=args.startup_json, exit_after_startup=args.exit_after_startup,
+                                   engine_address=args.engine, osc=args.osc, osc_rate=args.osc_rate,
+                                   window=args.window)
     frame.Bind(wx.EVT_CLOSE, frame.OnClose)
     app.MainLoop()
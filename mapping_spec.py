@@ -0,0 +1,185 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+from weather_timeline import FIELDS, WeatherTimeline
+
+# 이름만 주면 여기서 <이름>.json을 찾음
+MAPPINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mappings")
+
+# 파라미터 하나의 스펙에 올 수 있는 키
+SPEC_KEYS = ("field", "wrap", "in", "out", "above", "clamp", "gain")
+
+
+def spec_path(name, base_dir=MAPPINGS_DIR):
+    if name.endswith(".json") or os.sep in name:
+        return os.path.join(base_dir, name) if not os.path.isabs(name) else name
+    return os.path.join(base_dir, f"{name}.json")
+
+
+def merge_spec(base, child):
+    # 파라미터별로 얕게 덮어씀: {"cutoff_freq": {"clamp": [...]}}는 clamp만 바꿈
+    params = {name: dict(spec) for name, spec in base.get("params", {}).items()}
+    for name, spec in child.get("params", {}).items():
+        params[name] = {**params.get(name, {}), **spec}
+    merged = {k: v for k, v in base.items() if k != "params"}
+    merged.update({k: v for k, v in child.items() if k not in ("params", "extends")})
+    merged["params"] = params
+    return merged
+
+
+def load_spec(name, base_dir=MAPPINGS_DIR):
+    """Read a mapping spec, following "extends". Returns (spec, list of files read)."""
+    path = spec_path(name, base_dir)
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            spec = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from e
+    sources = [path]
+    parent = spec.get("extends")
+    if parent:
+        base, parent_sources = load_spec(parent, os.path.dirname(path))
+        spec = merge_spec(base, spec)
+        sources += parent_sources
+    return spec, sources
+
+
+class Mapping:
+    """A weather -> sound mapping compiled into vectorized column evaluators.
+
+    Each parameter in spec["params"] reads one field (or the sum of
+    several), optionally wraps it (`wrap`: 360 for angles), maps it linearly
+    from `in` to `out` (or, with `above`, to out[1] where the field exceeds
+    the threshold and out[0] elsewhere), clamps it to `clamp` ([lo, hi],
+    either may be null) and multiplies by `gain`. `params` fixes the column
+    order and the set of parameters the caller needs.
+    """
+
+    def __init__(self, spec, params=None, name=""):
+        self.name = name
+        specs = spec.get("params", {})
+        self.params = tuple(params) if params is not None else tuple(specs)
+        missing = [p for p in self.params if p not in specs]
+        if missing:
+            raise ValueError(f"mapping {name!r} has no spec for {', '.join(missing)}")
+        self.index = {p: i for i, p in enumerate(self.params)}
+        self._evaluators = [_compile_param(p, specs[p], name) for p in self.params]
+
+    def table(self, fields):
+        fields = {name: np.asarray(fields[name], dtype=np.float32) for name in FIELDS}
+        n = len(fields[FIELDS[0]])
+        table = np.empty((n, len(self.params)), dtype=np.float32)
+        for i, evaluate in enumerate(self._evaluators):
+            evaluate(fields, table[:, i])
+        return table
+
+    def row(self, values):
+        return self.table({name: [values.get(name, 0.0)] for name in FIELDS})[0]
+
+
+def _pair(value, key, where):
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ValueError(f"{where}: {key!r} must be a [lo, hi] pair")
+    return value
+
+
+def _compile_param(param, spec, name):
+    where = f"mapping {name!r}, {param}"
+    unknown = [k for k in spec if k not in SPEC_KEYS]
+    if unknown:
+        raise ValueError(f"{where}: unknown keys {', '.join(unknown)}")
+    names = spec.get("field")
+    names = [names] if isinstance(names, str) else list(names or [])
+    bad = [f for f in names if f not in FIELDS]
+    if not names or bad:
+        raise ValueError(f"{where}: 'field' must name one or more of {FIELDS}")
+    wrap = spec.get("wrap")
+    gain = float(spec.get("gain", 1.0))
+    lo, hi = _pair(spec.get("clamp", [None, None]), "clamp", where)
+
+    threshold = spec.get("above")
+    if threshold is not None:
+        below, over = (float(v) for v in _pair(spec.get("out", [0, 1]), "out", where))
+    else:
+        # y = a * x + b (in/out가 없으면 그대로)
+        (i0, i1), (o0, o1) = _pair(spec.get("in", [0, 1]), "in", where), _pair(spec.get("out", [0, 1]), "out", where)
+        if i0 == i1:
+            raise ValueError(f"{where}: 'in' range is empty")
+        a = (o1 - o0) / (i1 - i0)
+        b = o0 - a * i0
+
+    def evaluate(fields, out):
+        x = fields[names[0]]
+        for other in names[1:]:
+            x = x + fields[other]
+        if wrap:
+            x = np.mod(x, wrap)
+        if threshold is not None:
+            out[:] = np.where(x > threshold, over, below)
+        else:
+            np.multiply(x, a, out=out)
+            out += b
+        if lo is not None:
+            np.maximum(out, lo, out=out)
+        if hi is not None:
+            np.minimum(out, hi, out=out)
+        if gain != 1.0:
+            out *= gain
+
+    return evaluate
+
+
+class MappingProfile:
+    """A named mapping spec that can be re-read while the app is running.
+
+    `reload_if_changed` stats the spec file (and the files it extends) and
+    recompiles only when one of them changed; the app then recomputes its
+    parameter table and retargets the existing chain. If the new spec is
+    invalid the error is raised and the previous mapping stays in place.
+    """
+
+    def __init__(self, name, params=None):
+        self.name = name
+        self.params = params
+        spec, self.sources = load_spec(name)
+        self.mapping = Mapping(spec, params, name)
+        self._mtimes = self._stat()
+
+    def _stat(self):
+        mtimes = []
+        for path in self.sources:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return mtimes
+
+    def reload_if_changed(self):
+        mtimes = self._stat()
+        if mtimes == self._mtimes:
+            return False
+        self._mtimes = mtimes
+        spec, sources = load_spec(self.name)
+        self.mapping = Mapping(spec, self.params, self.name)
+        self.sources = sources
+        self._mtimes = self._stat()
+        return True
+
+    def table(self, fields):
+        return self.mapping.table(fields)
+
+    def row(self, values):
+        return self.mapping.row(values)
+
+
+if __name__ == "__main__":
+    # 사용법: python mapping_spec.py soni_only data/seoul.json > seoul_soni_only.csv
+    mapping = MappingProfile(sys.argv[1]).mapping
+    timeline = WeatherTimeline.load(sys.argv[2])
+    table = mapping.table(timeline.fields)
+    print("hour," + ",".join(mapping.params))
+    for hour, row in zip(timeline.hours, table):
+        print(f"{hour}," + ",".join(f"{v:g}" for v in row))
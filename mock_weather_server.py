@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from data_catalog import Catalog
+
+DEFAULT_PORT = 8765
+
+
+class MockWeatherServer:
+    """Local stand-in for a weather API that replays data/{city}.json.
+
+    GET /forecast?city=seoul&start=0&hours=48 answers with an
+    OpenWeatherMap-like {"city", "hourly": [...]} window (rain/snow as
+    {"1h": x}, wrapping around the file). Without `start` the window begins
+    at the replay hour, which advances every `seconds_per_hour`. Each
+    request waits `latency` +- `jitter` seconds, and with probability
+    `failure_rate` it gets a 503 or the connection is dropped.
+    """
+
+    def __init__(self, data_dir="data", latency=0.0, jitter=0.0, failure_rate=0.0, seconds_per_hour=1.0,
+                 seed=None):
+        self.data_dir = data_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.seconds_per_hour = seconds_per_hour
+        self.random = random.Random(seed)
+        self.started = time.monotonic()
+        self.requests = 0
+        self._files = {}
+        self.catalog = Catalog(data_dir)
+        self._server = None
+        self._handlers = set()
+
+    def _hourly(self, city):
+        data = self._files.get(city)
+        if data is None:
+            # 도시 이름은 대소문자를 가리지 않음 (KoreaSeasonalCycle.json 같은 파일도 찾도록)
+            entry = self.catalog.find(city)
+            if entry is None and self.catalog.refresh():
+                entry = self.catalog.find(city)
+            path = self.catalog.entry_path(entry) if entry is not None else os.path.join(self.data_dir, f"{city}.json")
+            with open(path, "r", encoding="utf-8") as f:
+                data = self._files[city] = json.load(f)
+        return data
+
+    def forecast(self, city, start, hours):
+        data = self._hourly(city)
+        hourly = data.get("hourly", [])
+        window = []
+        for i in range(hours if hourly else 0):
+            record = dict(hourly[(start + i) % len(hourly)])
+            for name in ("rain", "snow"):
+                if name in record:
+                    record[name] = {"1h": record[name]}
+            record["hour"] = start + i
+            window.append(record)
+        return {"city": data.get("city", city), "hourly": window}
+
+    async def handle(self, reader, writer):
+        self._handlers.add(asyncio.current_task())
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.requests += 1
+                await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+                if self.random.random() < self.failure_rate:
+                    if self.random.random() < 0.5:
+                        break  # 응답 없이 연결 끊기
+                    self._respond(writer, 503, {"error": "injected failure"})
+                else:
+                    self._respond(writer, *self._route(request_line.decode("latin-1").split()[1]))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # stop()이 열린 연결을 정리하는 중
+        finally:
+            writer.close()
+            self._handlers.discard(asyncio.current_task())
+
+    def _route(self, target):
+        url = urlsplit(target)
+        if url.path != "/forecast":
+            return 404, {"error": f"unknown path {url.path}"}
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        city = query.get("city", "").lower()
+        replay_hour = int((time.monotonic() - self.started) / self.seconds_per_hour)
+        try:
+            start = int(query.get("start", replay_hour))
+            hours = int(query.get("hours", 48))
+            return 200, self.forecast(city, start, hours)
+        except FileNotFoundError:
+            return 404, {"error": f"unknown city {city!r}"}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+    def _respond(self, writer, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 503: "Service Unavailable"}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode("latin-1") + body)
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self._server = await asyncio.start_server(self.handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        tasks = list(self._handlers)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+
+async def _serve(args):
+    server = MockWeatherServer(args.data, args.latency, args.jitter, args.failure_rate, args.seconds_per_hour)
+    port = await server.start(args.host, args.port)
+    print(f"serving {args.data}/ on http://{args.host}:{port}/forecast?city=seoul")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay data/*.json as a local weather API.")
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+- random seconds on top of --latency")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--seconds-per-hour", type=float, default=1.0, help="replay speed")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
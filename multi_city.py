@@ -0,0 +1,282 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+from pyo import Server, ButLP, Freeverb, Sine, Pan, Mix, SigTo, InputFader, Sig
+
+from weather_cache import load_timeline
+from effect_params import compute_effect_table, PARAM_INDEX
+from effects_chain import EffectsChain, DEFAULT_RAMP_RATIO
+from track_cache import TrackCache
+from tick_scheduler import DeadlineScheduler
+
+# 가벼운 체인에서 시간마다 바뀌는 파라미터 (EQ, HRTF, 리버브 크기는 생략/공유)
+LIGHT_PARAMS = ("pitch_ratio", "vol", "rev_bal", "cutoff_freq", "trem_rate", "pan_pos")
+
+MIX = "mix"            # 모든 도시를 스테레오로 팬 + 도시별 게인
+CHANNELS = "channels"  # 도시마다 출력 채널 하나 (리버브 없음)
+ROUTINGS = (MIX, CHANNELS)
+
+DEFAULT_MAX_CHAINS = 16
+
+
+class LightChain:
+    """Per-city mono chain: source -> ButLP -> tremolo -> Pan (or one output channel).
+
+    Reverb is not built per city: `send` is fed into the reverb shared by
+    all cities, scaled by rev_bal.
+    """
+
+    def __init__(self, source, row, rate, gain=1.0, channel=None, ramp_time=0.5):
+        self.controls = {name: SigTo(value=float(row[PARAM_INDEX[name]]), time=ramp_time,
+                                     init=float(row[PARAM_INDEX[name]])) for name in LIGHT_PARAMS}
+        c = self.controls
+        self.source = source
+        source.freq = c["pitch_ratio"] * rate
+        source.mul = c["vol"] * gain
+        self.mono = Mix(source, voices=1)
+        self.filter_lp = ButLP(self.mono, freq=c["cutoff_freq"])
+        self.lfo = Sine(freq=c["trem_rate"], mul=0.5, add=0.5)
+        self.tremolo = self.filter_lp * self.lfo
+        self.send = self.tremolo * c["rev_bal"]
+        if channel is None:
+            self.output = Pan(self.tremolo * (1 - c["rev_bal"]), outs=2, pan=(c["pan_pos"] + 1) * 0.5)
+            self.output.out()
+        else:
+            self.output = self.tremolo
+            self.output.out(channel)
+        self._targets = [(c[name], PARAM_INDEX[name]) for name in LIGHT_PARAMS]
+
+    @property
+    def stages(self):
+        return [self.source, self.mono, self.filter_lp, self.lfo, self.tremolo, self.send, self.output]
+
+    def set_row(self, row):
+        for ctl, idx in self._targets:
+            ctl.value = float(row[idx])
+
+    def set_ramp_time(self, ramp_time):
+        for ctl, _ in self._targets:
+            ctl.time = ramp_time
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
+        for ctl in self.controls.values():
+            ctl.stop()
+
+
+class FullChain:
+    """A full EffectsChain per city, with gain applied after HRTF."""
+
+    def __init__(self, source, row, rate, gain=1.0, channel=None, ramp_time=0.5):
+        self.chain = EffectsChain(None, row, ramp_time=ramp_time)
+        self.chain.set_source(source, fadetime=0, rate=rate)
+        self.chain.hrtf.mul = gain
+        self.chain.hrtf.out(0 if channel is None else channel)
+        self.send = None
+
+    def set_row(self, row):
+        self.chain.set_row(row)
+
+    def set_ramp_time(self, ramp_time):
+        self.chain.set_ramp_time(ramp_time)
+
+    def stop(self):
+        self.chain.stop()
+
+
+class City:
+    def __init__(self, name, timeline, table, track_path, gain, channel):
+        self.name = name
+        self.timeline = timeline
+        self.table = table
+        self.track_path = track_path
+        self.gain = gain
+        self.channel = channel
+        self.chain = None  # None이면 대기 중 (max_chains를 넘은 도시)
+
+
+class MultiCity:
+    """K regions on one pyo server, each with its own chain and track.
+
+    Decoded tracks are shared through TrackCache, so cities on the same
+    track share one in-memory table and only own a TableRead. In MIX
+    routing all cities feed a single shared Freeverb. At most `max_chains`
+    cities are active; the rest stay loaded but silent until `activate`
+    swaps them in (oldest active city goes dormant).
+    """
+
+    def __init__(self, tracks=None, max_chains=DEFAULT_MAX_CHAINS, lightweight=True, routing=MIX,
+                 ramp_time=0.5, **table_options):
+        if routing not in ROUTINGS:
+            raise ValueError(f"unknown routing {routing!r} (expected one of {ROUTINGS})")
+        self.tracks = tracks if tracks is not None else TrackCache()
+        self.max_chains = max_chains
+        self.lightweight = lightweight
+        self.routing = routing
+        self.ramp_time = ramp_time
+        self.table_options = table_options
+        self.cities = OrderedDict()
+        self.active = OrderedDict()  # 활성화된 순서
+
+        self.reverb = None
+        if routing == MIX and lightweight:
+            self.reverb_size = SigTo(value=0.7, time=ramp_time, init=0.7)
+            self.reverb_input = InputFader(Sig([0, 0]))
+            self.reverb = Freeverb(self.reverb_input, size=self.reverb_size, bal=1.0).out()
+
+    def __len__(self):
+        return len(self.cities)
+
+    def add_city(self, weather_path, track_path, gain=1.0, channel=None, name=None):
+        timeline = load_timeline(weather_path)
+        name = name or timeline.city or os.path.splitext(os.path.basename(weather_path))[0]
+        if name in self.cities:
+            raise ValueError(f"city {name!r} is already loaded")
+        if channel is None and self.routing == CHANNELS:
+            channel = len(self.cities)
+        table = compute_effect_table(timeline.fields, **self.table_options)
+        city = self.cities[name] = City(name, timeline, table, track_path, gain, channel)
+        if len(self.active) < self.max_chains:
+            self.activate(name)
+        return city
+
+    def activate(self, name):
+        city = self.cities[name]
+        if city.chain is not None:
+            return
+        if len(self.active) >= self.max_chains:
+            self.deactivate(next(iter(self.active)))
+        track = self.tracks.get(city.track_path)
+        cls = LightChain if self.lightweight else FullChain
+        city.chain = cls(track.player(), city.table[0], track.rate, gain=city.gain,
+                         channel=city.channel, ramp_time=self.ramp_time)
+        self.active[name] = city
+        self._rebuild_reverb_bus()
+
+    def deactivate(self, name):
+        city = self.active.pop(name, None)
+        if city is None:
+            return
+        city.chain.stop()
+        city.chain = None
+        self._rebuild_reverb_bus()
+
+    def remove_city(self, name):
+        self.deactivate(name)
+        del self.cities[name]
+
+    def _rebuild_reverb_bus(self):
+        # 도시별 send를 하나로 섞어서 공유 리버브 하나만 돌림
+        if self.reverb is None:
+            return
+        sends = [city.chain.send for city in self.active.values()]
+        self.reverb_input.setInput(Mix(sends, voices=2) if sends else Sig([0, 0]), 0.05)
+
+    def set_hour(self, hour):
+        rev_size = 0.0
+        for city in self.active.values():
+            row = city.table[hour % len(city.table)]
+            city.chain.set_row(row)
+            rev_size += float(row[PARAM_INDEX["rev_size"]])
+        if self.reverb is not None and self.active:
+            self.reverb_size.value = rev_size / len(self.active)
+
+    def set_ramp_time(self, ramp_time):
+        self.ramp_time = ramp_time
+        for city in self.active.values():
+            city.chain.set_ramp_time(ramp_time)
+
+    def stop(self):
+        for name in list(self.active):
+            self.deactivate(name)
+        if self.reverb is not None:
+            self.reverb.stop()
+
+
+def scaling_benchmark(server, track_path, weather_paths, counts=(1, 2, 4, 8, 16, 32), seconds=5.0,
+                      lightweight=True):
+    """Render `seconds` of audio offline with K chains and report CPU % of one core."""
+    results = []
+    tracks = TrackCache()
+    for k in counts:
+        server.recordOptions(dur=seconds, filename=os.path.join(tempfile.gettempdir(), "multi_city_bench.wav"),
+                             fileformat=0, sampletype=0)
+        multi = MultiCity(tracks, max_chains=k, lightweight=lightweight)
+        for i in range(k):
+            multi.add_city(weather_paths[i % len(weather_paths)], track_path, gain=1.0 / k, name=f"city{i}")
+        multi.set_hour(0)
+        start = time.perf_counter()
+        server.start()
+        elapsed = time.perf_counter() - start
+        multi.stop()
+        results.append({"chains": k, "render_seconds": elapsed, "audio_seconds": seconds,
+                        "cpu_percent": elapsed / seconds * 100.0})
+    return results
+
+
+def run_live(multi, seconds_per_hour, hours=None, policy="skip"):
+    scheduler = DeadlineScheduler(seconds_per_hour, policy=policy)
+    scheduler.start()
+    hour = 0
+    longest = max(len(city.table) for city in multi.cities.values())
+    while hours is None or hour < hours:
+        multi.set_hour(hour)
+        print(f"hour {hour % longest}: " + ", ".join(
+            f"{city.name} {city.timeline.temp[hour % len(city.timeline)]:g}°C" for city in multi.active.values()))
+        hour += scheduler.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play several weather files at once on one pyo server.")
+    parser.add_argument("weather", nargs="+", help="weather files, one per city")
+    parser.add_argument("--tracks", nargs="+", default=["7rings.mp3"],
+                        help="music tracks, assigned to cities round-robin")
+    parser.add_argument("--gains", type=float, nargs="*", help="per-city gain (default 1/K)")
+    parser.add_argument("--routing", choices=ROUTINGS, default=MIX)
+    parser.add_argument("--full", action="store_true", help="full EffectsChain per city instead of the light chain")
+    parser.add_argument("--max-chains", type=int, default=DEFAULT_MAX_CHAINS)
+    parser.add_argument("--seconds-per-hour", type=float, default=1.0)
+    parser.add_argument("--hours", type=int, default=None)
+    parser.add_argument("--bench", action="store_true", help="measure CPU %% against the number of chains (offline)")
+    parser.add_argument("--bench-counts", type=int, nargs="*", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--bench-seconds", type=float, default=5.0)
+    parser.add_argument("--bench-json", help="write the scaling results here")
+    args = parser.parse_args()
+
+    if args.bench:
+        server = Server(nchnls=2, duplex=0, audio="offline").boot()
+        results = scaling_benchmark(server, args.tracks[0], args.weather, args.bench_counts, args.bench_seconds,
+                                    lightweight=not args.full)
+        server.shutdown()
+        for r in results:
+            print(f"{r['chains']:3d} chains: {r['cpu_percent']:6.1f}% of one core")
+        if args.bench_json:
+            with open(args.bench_json, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        return
+
+    k = len(args.weather)
+    nchnls = k if args.routing == CHANNELS else 2
+    server = Server(nchnls=nchnls, duplex=0).boot()
+    server.start()
+    multi = MultiCity(max_chains=args.max_chains, lightweight=not args.full, routing=args.routing,
+                      ramp_time=args.seconds_per_hour * DEFAULT_RAMP_RATIO)
+    for i, path in enumerate(args.weather):
+        gain = args.gains[i] if args.gains and i < len(args.gains) else 1.0 / k
+        multi.add_city(path, args.tracks[i % len(args.tracks)], gain=gain)
+    try:
+        run_live(multi, args.seconds_per_hour, args.hours)
+    except KeyboardInterrupt:
+        pass
+    multi.stop()
+    server.stop()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import time
+
+from pyo import Server, SfPlayer, Linseg
+
+from weather_cache import load_timeline
+from effect_params import compute_effect_table, PARAM_INDEX
+from effects_chain import EffectsChain, ControlTables, RAMPED_PARAMS, DEFAULT_RAMP_RATIO
+from timeline_resample import MODES, DEFAULT_SAMPLES_PER_HOUR
+
+DEFAULT_SR = 44100
+
+
+def automation_points(values, seconds_per_hour, ramp_time):
+    # 실시간 SigTo와 같은 모양: 시간 경계마다 ramp_time 동안 새 값으로 선형 이동
+    ramp_time = min(max(ramp_time, 0.001), seconds_per_hour)
+    points = [(0.0, float(values[0]))]
+    for hour in range(1, len(values)):
+        t = hour * seconds_per_hour
+        points.append((t, float(values[hour - 1])))
+        points.append((t + ramp_time, float(values[hour])))
+    return points
+
+
+def automation_controls(table, seconds_per_hour, ramp_time):
+    controls = {}
+    for name in RAMPED_PARAMS:
+        points = automation_points(table[:, PARAM_INDEX[name]], seconds_per_hour, ramp_time)
+        controls[name] = Linseg(points).play()
+    return controls
+
+
+def render(weather_path, music_path, out_path, seconds_per_hour=1.0,
+           ramp_ratio=DEFAULT_RAMP_RATIO, hours=None, dry=False, sr=DEFAULT_SR,
+           server=None, interp=None, samples_per_hour=DEFAULT_SAMPLES_PER_HOUR, **table_options):
+    timeline = load_timeline(weather_path)
+    table = compute_effect_table(timeline.fields, **table_options)
+    if hours:
+        table = table[:hours]
+    duration = len(table) * seconds_per_hour
+
+    own_server = server is None
+    if not own_server and int(server.getSamplingRate()) != int(sr):
+        # 넘겨받은 서버의 sr로 렌더링하면서 다른 sr로 기록되지 않게
+        raise ValueError(f"server runs at {server.getSamplingRate():g} Hz but sr={sr} was requested")
+    if own_server:
+        server = Server(sr=sr, nchnls=2, duplex=0, audio="offline").boot()
+    server.recordOptions(dur=duration, filename=out_path, fileformat=0, sampletype=0)
+
+    if interp:
+        # 시간 사이를 보간한 제어 테이블 (실시간 앱의 --smooth와 같은 소리)
+        fields = {name: values[:len(table)] for name, values in timeline.fields.items()}
+        tables = ControlTables(table[0], samples_per_hour, interp, seconds_per_hour)
+        tables.load(fields, **table_options)
+        controls = tables.controls
+    else:
+        # 시간별 자동화를 샘플 단위 Linseg로 미리 만들어 체인에 연결
+        controls = automation_controls(table, seconds_per_hour, seconds_per_hour * ramp_ratio)
+    player = SfPlayer(music_path, loop=True)
+    chain = EffectsChain(player, table[0], controls=controls).out()
+    if dry:
+        player.out()
+
+    start = time.perf_counter()
+    server.start()  # offline 모드에서는 dur 만큼 렌더링이 끝날 때까지 블록
+    elapsed = time.perf_counter() - start
+
+    chain.stop()
+    if interp:
+        tables.stop()
+    player.stop()
+    if own_server:
+        server.shutdown()
+
+    return {
+        "weather": weather_path,
+        "music": music_path,
+        "output": out_path,
+        "hours": len(table),
+        "audio_seconds": duration,
+        "render_seconds": elapsed,
+        "x_realtime": duration / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a weather file + music track to WAV without a GUI or sound card.")
+    parser.add_argument("weather", help="weather JSON, e.g. data/KoreaSeasonalCycle.json")
+    parser.add_argument("music", help="music file, e.g. 7rings.mp3")
+    parser.add_argument("output", help="output WAV path")
+    parser.add_argument("--seconds-per-hour", type=float, default=1.0)
+    parser.add_argument("--ramp-ratio", type=float, default=DEFAULT_RAMP_RATIO)
+    parser.add_argument("--hours", type=int, default=None, help="render only the first N hours")
+    parser.add_argument("--sr", type=int, default=DEFAULT_SR)
+    parser.add_argument("--vol-scale", type=float, default=0.8)
+    parser.add_argument("--clamp-cutoff", action="store_true", help="clamp the low-pass cutoff to 300~1200 Hz")
+    parser.add_argument("--dry", action="store_true", help="also mix the unprocessed track, like the wx apps")
+    parser.add_argument("--interp", choices=MODES, help="interpolate between hours instead of hourly ramps")
+    parser.add_argument("--samples-per-hour", type=int, default=DEFAULT_SAMPLES_PER_HOUR,
+                        help="control values per hour with --interp")
+    args = parser.parse_args()
+
+    result = render(args.weather, args.music, args.output,
+                    seconds_per_hour=args.seconds_per_hour, ramp_ratio=args.ramp_ratio,
+                    hours=args.hours, dry=args.dry, sr=args.sr, interp=args.interp,
+                    samples_per_hour=args.samples_per_hour, vol_scale=args.vol_scale,
+                    cutoff_range=(300, 1200) if args.clamp_cutoff else None)
+    print(f"{result['output']}: {result['hours']} hours, {result['audio_seconds']:.1f} s of audio "
+          f"in {result['render_seconds']:.2f} s ({result['x_realtime']:.1f}x realtime)")
+
+
+if __name__ == "__main__":
+    main()
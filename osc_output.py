@@ -0,0 +1,303 @@
+import argparse
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+from tick_scheduler import DeadlineScheduler
+
+DEFAULT_PORT = 9000
+DEFAULT_PREFIX = "/weather"
+
+# 초당 보내는 프레임 수 (바뀐 값이 없는 프레임은 보내지 않음)
+DEFAULT_RATE = 60.0
+
+# 바뀐 값이 없어도 이 간격마다 전체 값을 한 번 보냄 (나중에 켠 수신기도 상태를 받도록)
+DEFAULT_REFRESH = 1.0
+
+# 번들 시간 태그 1 = "즉시"
+IMMEDIATE = struct.pack(">Q", 1)
+BUNDLE_HEADER = b"#bundle\x00" + IMMEDIATE
+
+
+def _padded(data):
+    # OSC 문자열: NUL로 끝나고 4바이트 단위로 채움
+    return data + b"\x00" * (4 - len(data) % 4)
+
+
+class OscOutput:
+    """Sends mapped parameter rows to an OSC receiver over UDP, one bundle per frame.
+
+    Every parameter is a float message `<prefix>/<name>`. The messages are
+    encoded once into a preallocated buffer; a frame copies the row into a
+    scratch array, finds the changed values with preallocated masks,
+    rewrites only their float slots and copies those messages into a
+    preallocated bundle, so no arrays or buffers are allocated per frame.
+    Frames with no changes are not sent, except for a full bundle every
+    `refresh` seconds.
+
+    `send(row)` sends one frame right away. With `source` (a callable that
+    returns the current row, or None while idle) `start` runs a thread that
+    sends `rate` frames per second on absolute deadlines.
+    """
+
+    def __init__(self, params, address=("127.0.0.1", DEFAULT_PORT), prefix=DEFAULT_PREFIX, source=None,
+                 rate=DEFAULT_RATE, refresh=DEFAULT_REFRESH):
+        self.params = tuple(params)
+        self.address = address
+        self.source = source
+        self.rate = rate
+        self.refresh = refresh
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+        # 메시지 i = [크기 int32][주소][",f"][float32]; 값 자리만 프레임마다 바꿈
+        elements = []
+        for name in self.params:
+            message = _padded(f"{prefix}/{name}".encode("ascii")) + _padded(b",f") + b"\x00" * 4
+            elements.append(struct.pack(">i", len(message)) + message)
+        self._messages = bytearray(b"".join(elements))
+        self._spans = []
+        self._value_offsets = []
+        start = 0
+        for element in elements:
+            self._spans.append((start, start + len(element)))
+            self._value_offsets.append(start + len(element) - 4)
+            start += len(element)
+        self._bundle = bytearray(BUNDLE_HEADER) + bytearray(len(self._messages))
+        self._view = memoryview(self._bundle)
+        self._messages_view = memoryview(self._messages)
+
+        n = len(self.params)
+        self._last = np.full(n, np.nan, dtype=np.float32)
+        self._row = np.empty(n, dtype=np.float32)
+        self._changed = np.empty(n, dtype=bool)
+        self._nan = np.empty(n, dtype=bool)
+        self._nan_last = np.empty(n, dtype=bool)
+        self._last_full = None
+        self.frames = 0       # 보낸 번들 수
+        self.messages = 0     # 보낸 메시지 수
+        self.skipped = 0      # 바뀐 값이 없어서 보내지 않은 프레임 수
+        self.errors = 0       # 보내지 못한 번들 수 (수신기가 없거나 버퍼가 가득 참)
+        self.scheduler = None
+        self._thread = None
+        self._stop = None
+
+    def send(self, row, now=None):
+        # 미리 만든 배열에만 씀 (프레임마다 배열을 만들지 않음)
+        np.copyto(self._row, row, casting="unsafe")
+        row, changed = self._row, self._changed
+        now = time.monotonic() if now is None else now
+        if self._last_full is None or now - self._last_full >= self.refresh:
+            changed.fill(True)
+            self._last_full = now
+        else:
+            # NaN끼리 비교하면 항상 바뀐 것으로 보이므로 둘 다 NaN인 자리는 빼냄
+            np.not_equal(row, self._last, out=changed)
+            np.isnan(row, out=self._nan)
+            np.isnan(self._last, out=self._nan_last)
+            np.logical_and(self._nan, self._nan_last, out=self._nan)
+            np.logical_not(self._nan, out=self._nan)
+            np.logical_and(changed, self._nan, out=changed)
+            if not changed.any():
+                self.skipped += 1
+                return 0
+        messages, bundle, source = self._messages, self._bundle, self._messages_view
+        end = len(BUNDLE_HEADER)
+        count = 0
+        for i in range(len(self.params)):
+            if not changed[i]:
+                continue
+            struct.pack_into(">f", messages, self._value_offsets[i], row[i])
+            a, b = self._spans[i]
+            bundle[end:end + b - a] = source[a:b]
+            end += b - a
+            count += 1
+        self._last[:] = row
+        try:
+            self.sock.sendto(self._view[:end], self.address)
+        except OSError:
+            # UDP라 수신기가 없어도 재생에는 영향이 없게 그냥 셈
+            self.errors += 1
+            return 0
+        self.frames += 1
+        self.messages += count
+        return end
+
+    def start(self):
+        if self.source is None:
+            raise ValueError("start() needs a source that returns the current row")
+        self.stop()
+        self._stop = threading.Event()
+        self.scheduler = DeadlineScheduler(1.0 / self.rate, sleep=self._stop.wait)
+        self._thread = threading.Thread(target=self._run, args=(self._stop, self.scheduler), daemon=True)
+        self._thread.start()
+
+    def _run(self, stop, scheduler):
+        scheduler.start()
+        while not stop.is_set():
+            row = self.source()
+            if row is not None:
+                self.send(row)
+            if not scheduler.wait():
+                break
+
+    def set_rate(self, rate):
+        self.rate = rate
+        if self.scheduler is not None:
+            self.scheduler.set_period(1.0 / rate)
+
+    def stats(self):
+        return {"frames": self.frames, "messages": self.messages, "skipped": self.skipped, "errors": self.errors,
+                "missed": self.scheduler.missed if self.scheduler is not None else 0, "rate": self.rate}
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def close(self):
+        self.stop()
+        self.sock.close()
+
+
+def _read_string(data, pos):
+    end = data.index(b"\x00", pos)
+    return data[pos:end].decode("ascii"), (end // 4 + 1) * 4
+
+
+def decode_packet(data, pos=0, end=None):
+    """Decode an OSC message or bundle into a list of (address, args) messages."""
+    end = len(data) if end is None else end
+    if data[pos:pos + 8] == b"#bundle\x00":
+        messages = []
+        pos += 16
+        while pos < end:
+            size = struct.unpack_from(">i", data, pos)[0]
+            messages += decode_packet(data, pos + 4, pos + 4 + size)
+            pos += 4 + size
+        return messages
+    address, pos = _read_string(data, pos)
+    tags, pos = _read_string(data, pos)
+    args = []
+    for tag in tags[1:]:
+        if tag == "f":
+            args.append(struct.unpack_from(">f", data, pos)[0])
+            pos += 4
+        elif tag == "i":
+            args.append(struct.unpack_from(">i", data, pos)[0])
+            pos += 4
+        elif tag == "s":
+            value, pos = _read_string(data, pos)
+            args.append(value)
+        else:
+            raise ValueError(f"unsupported OSC type tag {tag!r}")
+    return [(address, args)]
+
+
+class OscReceiver:
+    """Local UDP receiver for checking what OscOutput sends (and for the `listen` command)."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.address = self.sock.getsockname()
+        self.values = {}
+        self.packets = 0
+
+    def receive(self, timeout=1.0):
+        # 패킷 하나를 받아 메시지 목록으로 (시간이 지나면 None)
+        self.sock.settimeout(timeout)
+        try:
+            data = self.sock.recv(65536)
+        except socket.timeout:
+            return None
+        self.packets += 1
+        messages = decode_packet(data)
+        for address, args in messages:
+            self.values[address] = args[0] if len(args) == 1 else args
+        return messages
+
+    def close(self):
+        self.sock.close()
+
+
+def parse_host_port(text, default_port=DEFAULT_PORT):
+    host, _, port = text.rpartition(":")
+    return (host or "127.0.0.1", int(port)) if port.isdigit() else (text, default_port)
+
+
+def throughput(rate, seconds=2.0, params=10, change_every=1):
+    # 로컬 수신기로 rate 프레임/초를 보내고 실제로 받은 양과 프레임당 비용을 잼
+    receiver = OscReceiver()
+    rng = np.random.default_rng(0)
+    rows = rng.random((64, params), dtype=np.float32)
+    tick = [0]
+
+    def source():
+        tick[0] += 1
+        return rows[(tick[0] // change_every) % len(rows)]
+
+    received = [0]
+    done = threading.Event()
+
+    def drain():
+        while not done.is_set():
+            if receiver.receive(timeout=0.1) is not None:
+                received[0] += 1
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    out = OscOutput([f"p{i}" for i in range(params)], receiver.address, source=source, rate=rate)
+    cpu = time.process_time()
+    out.start()
+    time.sleep(seconds)
+    out.stop()
+    cpu = time.process_time() - cpu
+    time.sleep(0.1)
+    done.set()
+    reader.join()
+    out.close()
+    receiver.close()
+    stats = out.stats()
+    stats.update(received=received[0], seconds=seconds, cpu_percent=cpu / seconds * 100.0,
+                 sent_per_second=stats["frames"] / seconds)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OSC output of the mapped parameters: listen for it locally, "
+                                                 "or measure how many bundles per second it sustains.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    listen = commands.add_parser("listen", help="print the OSC messages arriving on a UDP port")
+    listen.add_argument("--host", default="127.0.0.1")
+    listen.add_argument("--port", type=int, default=DEFAULT_PORT)
+    bench = commands.add_parser("bench", help="send to a local receiver at increasing rates")
+    bench.add_argument("--rates", type=float, nargs="*", default=[60, 250, 500, 1000])
+    bench.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.command == "listen":
+        receiver = OscReceiver(args.host, args.port)
+        print(f"listening on {receiver.address[0]}:{receiver.address[1]}")
+        try:
+            while True:
+                messages = receiver.receive(timeout=None)
+                print("  ".join(f"{address} {' '.join(f'{v:g}' for v in values)}" for address, values in messages))
+        except KeyboardInterrupt:
+            pass
+        receiver.close()
+        return
+
+    for rate in args.rates:
+        s = throughput(rate, args.seconds)
+        print(f"{rate:7.0f}/s: sent {s['sent_per_second']:7.1f}/s, received {s['received']}/{s['frames']}, "
+              f"missed deadlines {s['missed']}, cpu {s['cpu_percent']:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
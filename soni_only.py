@@ -1,63 +1,46 @@
-import json
 import time
-from pyo import *
+from pyo import Server, Sine, Noise, Mix, Freeverb, Pan
 
-# JSON 파일에서 24시간 날씨 데이터 불러오기
-def load_weather_data(filename):
-    with open(filename, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data['hourly']
+from weather_cache import load_timeline
+from mapping_spec import MappingProfile
 
-# 날씨 변수 맵핑 함수
-def temp_to_pitch(temp):
-    return 200 + (temp - 15) * (800 - 200) / (35 - 15)
+# 날씨 변수 맵핑은 mappings/soni_only.json (재생 중에 고치면 다음 시간부터 반영)
+MAPPING = "soni_only"
+PARAMS = ("freq", "vol", "noise", "rev_bal", "pan")
 
-def humidity_to_volume(humidity):
-    return 0.05 + (humidity - 30) * (0.5 - 0.05) / (100 - 30)
-
-def rain_to_noise(rain):
-    return min(rain / 10, 1) * 0.3
-
-def wind_to_reverb(wind_speed):
-    return min(wind_speed / 10, 1) * 0.8
-
-def wind_deg_to_pan(wind_deg):
-    return (wind_deg % 360) / 360
-
-def sonify_weather(hourly_data):
+def sonify_weather(timeline, mapping):
     s = Server().boot()
     s.start()
 
-    # 초기 데이터
-    hour_data = hourly_data[0]
-    freq = temp_to_pitch(hour_data['temp'])
-    vol = humidity_to_volume(hour_data['humidity'])
-    noise_level = rain_to_noise(hour_data['rain'])
-    rev_mix = wind_to_reverb(hour_data['wind_speed'])
-    pan_pos = wind_deg_to_pan(hour_data['wind_deg'])
+    # 시간별 파라미터를 한 번에 계산 (hours x params)
+    params = mapping.table(timeline.fields)
+    idx = mapping.mapping.index
 
-    osc = Sine(freq=freq, mul=vol)
-    noise = Noise(mul=noise_level)
+    # 초기 데이터
+    row = params[0]
+    osc = Sine(freq=float(row[idx["freq"]]), mul=float(row[idx["vol"]]))
+    noise = Noise(mul=float(row[idx["noise"]]))
     mix = Mix([osc, noise], voices=2)
-    rev = Freeverb(mix, size=0.8, bal=rev_mix)
-    pan = Pan(rev, outs=2, pan=pan_pos).out()
+    rev = Freeverb(mix, size=0.8, bal=float(row[idx["rev_bal"]]))
+    pan = Pan(rev, outs=2, pan=float(row[idx["pan"]])).out()
 
     try:
-        for i in range(len(hourly_data)):
-            hour_data = hourly_data[i]
-            freq = temp_to_pitch(hour_data['temp'])
-            vol = humidity_to_volume(hour_data['humidity'])
-            noise_level = rain_to_noise(hour_data['rain'])
-            rev_mix = wind_to_reverb(hour_data['wind_speed'])
-            pan_pos = wind_deg_to_pan(hour_data['wind_deg'])
-
-            osc.freq = freq
-            osc.mul = vol
-            noise.mul = noise_level
-            rev.bal = rev_mix
-            pan.pan = pan_pos
-
-            print(f"Hour {i}: Temp={hour_data['temp']}°C, Humidity={hour_data['humidity']}%, Rain={hour_data['rain']}mm, Wind={hour_data['wind_speed']}m/s")
+        for i in range(len(timeline)):
+            try:
+                if mapping.reload_if_changed():
+                    params = mapping.table(timeline.fields)
+                    idx = mapping.mapping.index
+            except (OSError, ValueError) as e:
+                print(f"Could not reload mapping {mapping.name}: {e}")
+            row = params[i]
+
+            osc.freq = float(row[idx["freq"]])
+            osc.mul = float(row[idx["vol"]])
+            noise.mul = float(row[idx["noise"]])
+            rev.bal = float(row[idx["rev_bal"]])
+            pan.pan = float(row[idx["pan"]])
+
+            print(f"Hour {i}: Temp={timeline.temp[i]:g}°C, Humidity={timeline.humidity[i]:g}%, Rain={timeline.rain[i]:g}mm, Wind={timeline.wind_speed[i]:g}m/s")
             time.sleep(1)  # 1초마다 1시간 데이터 재생
     except KeyboardInterrupt:
         print("Sonification stopped by user.")
@@ -67,5 +50,5 @@ def sonify_weather(hourly_data):
 
 if __name__ == "__main__":
     filename = "data/seoul.json"  # JSON 파일 경로 입력
-    hourly_data = load_weather_data(filename)
-    sonify_weather(hourly_data)
+    timeline = load_timeline(filename)
+    sonify_weather(timeline, MappingProfile(MAPPING, PARAMS))
@@ -0,0 +1,799 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from weather_timeline import FIELDS, WeatherTimeline, stream_timeline
+from weather_cache import cache_dir, is_fresh, load_cached, load_timeline, source_key, write_cache
+from timeline_window import TimelineWindow, TimelineRange, BEHIND_RATIO, DEFAULT_MAX_BYTES as DEFAULT_WINDOW_BYTES
+from effect_params import EFFECT_PARAMS, default_effect_row, effect_profile
+from timeline_resample import MODES, DEFAULT_SAMPLES_PER_HOUR
+from tick_metrics import TickMetrics, dump_all
+from tick_scheduler import DeadlineScheduler, PyoClock, POLICIES, SKIP
+from state_channel import LatestValue, HourState
+from weather_provider import HttpProvider, LiveWeather, ProviderError
+from data_catalog import Catalog
+from osc_output import OscOutput, parse_host_port, DEFAULT_RATE as DEFAULT_OSC_RATE, DEFAULT_PREFIX as DEFAULT_OSC_PREFIX
+
+# 유닉스 소켓이 없는 플랫폼에서는 로컬 TCP 포트
+DEFAULT_ADDRESS = (os.path.join(tempfile.gettempdir(), "weather-sonification.sock")
+                   if hasattr(socket, "AF_UNIX") else "127.0.0.1:8766")
+
+# 소켓으로 부를 수 있는 엔진 메서드 (subscribe, shutdown은 EngineServer가 처리)
+COMMANDS = ("status", "load", "play", "seek", "fix", "unfix", "set_auto_update", "set_effects", "set_speed",
+            "metrics", "timeline_data", "datasets")
+
+# 재생 중에 매핑 파일이 바뀌었는지 확인하는 간격 (초)
+MAPPING_CHECK_INTERVAL = 1.0
+
+# 라이브: 예보 구간의 끝이 이만큼(시간) 남으면 다음 구간을 요청함
+LIVE_PREFETCH_HOURS = 6
+
+# 구독자의 송신 버퍼가 이만큼 밀려 있으면 hour 이벤트는 건너뜀 (느린 클라이언트가 엔진을 막지 않게)
+MAX_PENDING_EVENT_BYTES = 1 << 16
+
+
+class EngineError(Exception):
+    pass
+
+
+def parse_address(address):
+    # "host:port"면 TCP (host, port), 아니면 유닉스 소켓 경로
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in host:
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+def timeline_to_dict(timeline):
+    return {
+        "city": timeline.city,
+        "hours": np.asarray(timeline.hours).tolist(),
+        "fields": {name: np.asarray(timeline.fields[name]).tolist() for name in FIELDS},
+        "desc_codes": np.asarray(timeline.desc_codes).tolist(),
+        "descriptions": list(timeline.descriptions),
+    }
+
+
+def window_to_dict(window, hour=None):
+    # 저장소 전체 대신 hour(기본은 재생 위치) 주변 span 시간과 필드별 거친 min/max 단계만
+    hour = window.playhead if hour is None else int(hour) % len(window)
+    start = max(0, hour - int(window.span * BEHIND_RATIO))
+    stop = min(len(window), start + window.span)
+    start = max(0, stop - window.span)
+    return {
+        "city": window.city,
+        "length": len(window),
+        "offset": start,
+        "fields": {name: window.store.read(name, start, stop).tolist() for name in FIELDS},
+        "desc_codes": window.store.read("desc_codes", start, stop).tolist(),
+        "descriptions": list(window.descriptions),
+        "lod": {name: pyramid.to_dict() for name, pyramid in window.lod().items()},
+    }
+
+
+def timeline_from_dict(data):
+    if "offset" in data:
+        return TimelineRange(data)
+    fields = {name: np.asarray(data["fields"][name], dtype=np.float32) for name in FIELDS}
+    return WeatherTimeline(data["city"], np.asarray(data["hours"], dtype=np.int32), fields,
+                           np.asarray(data["desc_codes"], dtype=np.uint16), data["descriptions"])
+
+
+class SonificationEngine:
+    """Loading, mapping, hour scheduling and the pyo chain of the final apps, without wx.
+
+    The wx apps drive it in-process, or through engine_client.EngineClient
+    when it runs as a daemon (`python sonification_engine.py`); the methods
+    in COMMANDS return JSON-serializable results so the two are
+    interchangeable. The hour loop publishes HourState to `hour_state` and
+    passes {"event": "hour" | "timeline" | "error", ...} dicts to the
+    callbacks added with `subscribe` (called on engine threads). Timeline
+    events carry `complete`, False while a dataset is still streaming in.
+    """
+
+    def __init__(self, mapping="final_sonification", live_url=None, smooth=None,
+                 samples_per_hour=DEFAULT_SAMPLES_PER_HOUR, tick_policy=SKIP, pyo_clock=False, metrics=None,
+                 metrics_json=None, data_dir="data", audio="portaudio", seconds_per_hour=1.0, osc=None,
+                 osc_rate=DEFAULT_OSC_RATE, osc_prefix=DEFAULT_OSC_PREFIX, window=None,
+                 window_bytes=DEFAULT_WINDOW_BYTES):
+        # 날씨 -> 효과 파라미터 매핑 (mappings/<이름>.json, 실행 중에 고치면 다시 읽음)
+        self.mapping = effect_profile(mapping)
+        # live_url이 있으면 data/ 대신 날씨 API(또는 mock_weather_server.py)에서 받음
+        self.live = LiveWeather(HttpProvider(live_url)) if live_url else None
+        self.live_city = None
+        self.live_start = 0  # 지금 예보 구간의 시작 (예보 기준 시간)
+        self._live_next = None  # (load_generation, 다음 구간을 받는 Future)
+        self.data_dir = data_dir
+        # data/의 데이터셋 색인 (목록과 이름 찾기에 파일을 열지 않음)
+        self.catalog = Catalog(data_dir)
+        self.audio = audio
+        # metrics가 None이면 틱 계측을 전혀 하지 않음
+        self.tick_metrics = metrics
+        self.metrics_json = metrics_json
+        self.started = time.monotonic()
+
+        # 오디오 서버, 효과 체인, 트랙 캐시는 boot에서 만듦
+        self.server = None
+        self.chain = None
+        self.control_tables = None
+        self.tracks = None
+        self.ramp_ratio = None
+        self.smooth = smooth
+        # window가 있으면 (시간 수) 캐시에서 재생 위치 주변만 메모리에 올림 (아주 긴 데이터셋용)
+        # smooth는 데이터셋 전체를 미리 보간하므로 함께 쓸 수 없음
+        if window and smooth:
+            raise ValueError("--window and --smooth cannot be combined (smooth resamples the whole timeline)")
+        self.window = window
+        self.window_bytes = window_bytes
+        self.samples_per_hour = samples_per_hour
+        self.music_path = None
+        self.music_player = None
+        # osc가 있으면 ("host:port") 오디오와 같은 매핑 값을 OSC 번들로도 보냄 (boot에서 시작)
+        self.osc = OscOutput(EFFECT_PARAMS, parse_host_port(osc), osc_prefix, source=self.osc_row,
+                             rate=osc_rate) if osc else None
+        self._tick_time = time.monotonic()
+
+        self.timeline = None
+        self.effect_table = None
+        self.load_generation = 0  # 새 지역을 불러올 때마다 증가 (이전 로더와 이전 시간 상태 무시용)
+        self.load_error = None
+        self.load_complete = True  # 스트리밍 로딩이 끝났는지 (클라이언트는 이때 데이터를 받아감)
+        self.current_hour = 0
+        self.fixed_hour = None  # 고정된 시간 (None이면 고정 안됨)
+        self.auto_update = True
+        self.playback_speed = seconds_per_hour
+        # 시간 틱은 작업 시간과 관계없이 절대 마감 기준 (pyo_clock이면 오디오 시간에 맞춤)
+        self.tick_policy = tick_policy
+        self.pyo_clock = pyo_clock
+        self.tick_clock = time.monotonic
+        self.scheduler = None
+
+        # 명령(GUI 스레드나 소켓 작업 스레드), 스트리밍 로더, 매핑 재로드가 상태를 바꿀 때
+        self.lock = threading.RLock()
+        self.loop_thread = None
+        self.stop_event = None
+        self.hour_state = LatestValue()
+        self._listeners = []
+        self._mapping_checked = 0.0
+
+    def boot(self):
+        # pyo와 pyo를 쓰는 모듈은 여기서 처음 import (GUI는 창을 띄운 뒤 백그라운드에서 부름)
+        from pyo import Server
+        from effects_chain import EffectsChain, ControlTables, DEFAULT_RAMP_RATIO
+        from track_cache import TrackCache
+        self.server = Server(audio=self.audio).boot()
+        self.server.start()
+        if self.pyo_clock:
+            self.tick_clock = PyoClock(self.server)
+        self.ramp_ratio = DEFAULT_RAMP_RATIO
+
+        # 효과 체인은 시작할 때 한 번만 만들고 음원/데이터셋이 바뀌면 재사용
+        # smooth면 시간 사이를 미리 보간해 둔 테이블을 오디오 스레드가 직접 읽음 (틱마다 하는 일 없음)
+        row = default_effect_row(mapping=self.mapping.mapping)
+        self.control_tables = ControlTables(row, self.samples_per_hour, self.smooth, self.playback_speed) if self.smooth else None
+        controls = self.control_tables.controls if self.control_tables is not None else None
+        self.chain = EffectsChain(None, row, controls=controls, ramp_time=self.playback_speed * self.ramp_ratio)
+        self.chain.out()
+        self.chain.dry_out()
+
+        # 디코딩한 곡을 메모리에 보관해서 다시 재생하거나 곡을 바꿀 때 바로 시작
+        self.tracks = TrackCache()
+        if self.osc is not None:
+            self.osc.start()
+        return self.status()
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _emit(self, event):
+        for callback in list(self._listeners):
+            callback(event)
+
+    def _require_audio(self):
+        if self.chain is None:
+            raise EngineError("the audio server is not running")
+
+    def _require_timeline(self):
+        if self.timeline is None:
+            raise EngineError("no weather data loaded")
+
+    # --- 명령 (COMMANDS) ---
+
+    def status(self):
+        tl = self.timeline
+        status = {
+            "pid": os.getpid(),
+            "uptime": time.monotonic() - self.started,
+            "sr": self.server.getSamplingRate() if self.server is not None else None,
+            "mapping": self.mapping.name,
+            "smooth": self.smooth,
+            "city": tl.city if tl is not None else None,
+            "hours": len(tl) if tl is not None else 0,
+            "generation": self.load_generation,
+            "complete": self.load_complete,
+            "hour": self.current_hour,
+            "fixed_hour": self.fixed_hour,
+            "auto_update": self.auto_update,
+            "seconds_per_hour": self.playback_speed,
+            "music": self.music_path,
+            "load_error": self.load_error,
+        }
+        if self.tick_metrics is not None:
+            status["metrics"] = self.tick_metrics.summary()
+        if self.osc is not None:
+            status["osc"] = self.osc.stats()
+        if isinstance(tl, TimelineWindow):
+            status["window"] = tl.stats()
+        return status
+
+    def dataset_path(self, region):
+        # 파일 이름이나 도시 이름으로 (대소문자 무시); 색인에 없으면 한 번 다시 훑어봄
+        entry = self.catalog.find(region)
+        if entry is None and self.catalog.refresh():
+            entry = self.catalog.find(region)
+        if entry is None:
+            # 읽을 수 없는 파일이면 여기서 실제 오류가 나도록 경로를 그대로 돌려줌
+            return os.path.join(self.data_dir, f"{region}.json")
+        return self.catalog.entry_path(entry)
+
+    def load(self, region):
+        self._require_audio()
+        path = self.dataset_path(region) if self.live is None else None
+        with self.lock:
+            # 새 데이터셋으로 바꾸기 전에 이전 재생 스레드를 멈춤
+            self.stop_loop()
+            self.check_mapping()
+            chunks = None
+            try:
+                if self.live is not None:
+                    # 예보 구간을 받아옴 (요청이 실패하면 마지막으로 받은 응답을 씀)
+                    timeline = self.live.timeline(region.lower())
+                elif self.window:
+                    # 처음 한 번은 파일 전체를 읽어 캐시를 만들고, 재생은 캐시에서 블록 단위로
+                    timeline = load_timeline(path, default_city=region)
+                    if is_fresh(path):
+                        timeline = TimelineWindow(cache_dir(path), span=self.window, max_bytes=self.window_bytes,
+                                                  default_city=region)
+                else:
+                    # 캐시가 있으면 파싱 없이 메모리 맵으로 바로 사용
+                    timeline = load_cached(path, default_city=region)
+                    if timeline is None:
+                        # 첫 청크만 파싱하고 바로 재생 시작, 나머지는 백그라운드에서 읽고 캐시에 저장
+                        key = source_key(path)
+                        chunks = stream_timeline(path, default_city=region)
+                        timeline = next(chunks)
+                if not len(timeline):
+                    # 빈 데이터셋은 재생할 시간이 없음 (이전 데이터셋을 계속 재생)
+                    if chunks is not None:
+                        chunks.close()
+                    if isinstance(timeline, TimelineWindow):
+                        timeline.close()
+                    raise EngineError(f"{region}: the weather data has no hours")
+            except Exception:
+                if self.timeline is not None:
+                    self.start_loop()
+                raise
+            self.load_generation += 1
+            self.load_error = None
+            self.load_complete = chunks is None
+            if self.live is not None:
+                self.live_city = region.lower()
+                self.live_start = 0
+                self._live_next = None
+            if chunks is not None:
+                threading.Thread(target=self._load_remaining_chunks,
+                                 args=(path, key, chunks, timeline, self.load_generation), daemon=True).start()
+            self.current_hour = 0
+            self.fixed_hour = None
+            self._set_timeline(timeline)
+            self.chain.retarget(self.effect_table[0])
+            if self.control_tables is not None:
+                self.control_tables.release()
+                self.control_tables.seek(0)
+            self.start_loop()
+            result = {"city": timeline.city, "hours": len(timeline), "generation": self.load_generation,
+                      "complete": self.load_complete}
+        self._emit({"event": "timeline", **result})
+        return result
+
+    def play(self, path):
+        self._require_audio()
+        track = self.tracks.get(path)
+        player = track.player()
+        with self.lock:
+            # 새 음원을 기존 체인에 크로스페이드로 연결 (이전 음원은 페이드아웃 후 정지)
+            self.music_player = player
+            self.music_path = path
+            self.chain.set_source(player, rate=track.rate)
+            if self.control_tables is not None:
+                self.control_tables.seek(self.current_hour)
+        return {"music": path, "duration": track.duration}
+
+    def seek(self, hour):
+        with self.lock:
+            self._require_timeline()
+            table = self.effect_table
+            self.current_hour = int(hour) % len(table)
+            if self.fixed_hour is not None:
+                self.fixed_hour = self.current_hour
+            if self.auto_update or self.fixed_hour is not None:
+                self.chain.set_row(table[self.current_hour])
+            if self.control_tables is not None:
+                if self.fixed_hour is not None:
+                    self.control_tables.hold(self.current_hour)
+                else:
+                    self.control_tables.seek(self.current_hour)
+            self._publish(self.current_hour)
+        return {"hour": self.current_hour}
+
+    def fix(self, hour=None):
+        # 효과와 날씨를 한 시간에 고정 (hour가 없으면 지금 시간)
+        with self.lock:
+            self._require_timeline()
+            table = self.effect_table
+            self.fixed_hour = self.current_hour = (self.current_hour if hour is None else int(hour)) % len(table)
+            self.chain.set_row(table[self.fixed_hour])
+            if self.control_tables is not None:
+                self.control_tables.hold(self.fixed_hour)
+        return {"fixed_hour": self.fixed_hour}
+
+    def unfix(self):
+        with self.lock:
+            self.fixed_hour = None
+            if self.control_tables is not None:
+                self.control_tables.release()
+        return {"fixed_hour": None}
+
+    def set_auto_update(self, enabled):
+        self.auto_update = bool(enabled)
+        return {"auto_update": self.auto_update}
+
+    def set_effects(self, values):
+        # 최적화 창에서 고른 값을 바로 적용 (다음 틱에서 자동 갱신이 켜져 있으면 덮어씀)
+        self._require_audio()
+        self.chain.set_values({name: float(value) for name, value in values.items()})
+        return {"effects": values}
+
+    def set_speed(self, seconds_per_hour):
+        seconds_per_hour = float(seconds_per_hour)
+        if seconds_per_hour <= 0:
+            raise ValueError("seconds_per_hour must be positive")
+        self.playback_speed = seconds_per_hour
+        if self.scheduler is not None:
+            self.scheduler.set_period(seconds_per_hour)
+        if self.chain is not None:
+            self.chain.set_ramp_time(seconds_per_hour * self.ramp_ratio)
+            if self.control_tables is not None and self.fixed_hour is None:
+                self.control_tables.set_seconds_per_hour(seconds_per_hour)
+        return {"seconds_per_hour": seconds_per_hour}
+
+    def metrics(self, samples=False):
+        m = self.tick_metrics
+        if m is None:
+            return None
+        return m.to_dict() if samples else {"columns": list(m.columns), "summary": m.summary()}
+
+    def timeline_data(self, hour=None):
+        # 창으로 재생 중이면 hour 주변만 (timeline_window.TimelineRange로 받음)
+        tl = self.timeline
+        if tl is None:
+            return None
+        return window_to_dict(tl, hour) if isinstance(tl, TimelineWindow) else timeline_to_dict(tl)
+
+    def datasets(self, since=None):
+        # 색인을 갱신하고 목록을 돌려줌 (since가 지금 version과 같으면 목록은 None)
+        self.catalog.refresh()
+        version = self.catalog.version
+        return {"version": version, "entries": None if since == version else self.catalog.entries}
+
+    # --- GUI가 직접 쓰는 부분 (EngineClient에도 같은 이름이 있음) ---
+
+    def get_timeline(self):
+        return self.timeline
+
+    def close(self):
+        self.stop_loop()
+        if isinstance(self.timeline, TimelineWindow):
+            self.timeline.close()
+        if self.osc is not None:
+            self.osc.close()
+        if self.live is not None:
+            self.live.close()
+            self.live = None
+        if self.tick_metrics is not None and self.metrics_json:
+            dump_all(self.metrics_json, tick=self.tick_metrics)
+        if self.server is not None:
+            self.server.stop()
+            self.server.shutdown()
+            self.server = None
+
+    # --- 데이터와 재생 루프 ---
+
+    def _set_timeline(self, timeline):
+        old, self.timeline = self.timeline, timeline
+        if old is not timeline and isinstance(old, TimelineWindow):
+            old.close()
+        if isinstance(timeline, TimelineWindow):
+            # 효과 파라미터는 메모리에 올라온 블록마다 계산
+            timeline.set_table(self.mapping.table)
+            self.effect_table = timeline.effect_rows
+            return
+        # 시간별 효과 파라미터를 한 번에 계산 (hours x params)
+        self.effect_table = self.mapping.table(timeline.fields)
+        if self.control_tables is not None:
+            # 보간은 데이터를 불러올 때 한 번만; 스트리밍 중에는 현재 시간 위치를 유지
+            self.control_tables.load(timeline.fields, self.current_hour, self.mapping.mapping)
+            if self.fixed_hour is not None:
+                self.control_tables.hold(self.fixed_hour)
+
+    def _load_remaining_chunks(self, path, key, chunks, timeline, generation):
+        try:
+            # 하나 앞서 읽어서 마지막 스냅숏(전체 데이터)에만 complete를 붙임
+            pending = next(chunks, None)
+            while pending is not None:
+                timeline, pending = pending, next(chunks, None)
+                with self.lock:
+                    if generation != self.load_generation:
+                        return
+                    self._set_timeline(timeline)
+                    self.load_complete = pending is None
+                self._emit({"event": "timeline", "city": timeline.city, "hours": len(timeline),
+                            "generation": generation, "complete": pending is None})
+        except (OSError, ValueError) as e:
+            # 스트리밍 중에 파일이 지워지거나 읽기에 실패해도 오류 이벤트로 알림
+            self.load_error = f"Error reading weather data: {e}"
+            self._emit({"event": "error", "message": self.load_error, "generation": generation})
+            return
+        try:
+            write_cache(path, timeline, key)
+        except OSError as e:
+            print(f"Could not write weather cache for {path}: {e}")
+
+    def check_mapping(self):
+        # 매핑 파일이 바뀌었으면 파라미터 테이블만 다시 계산 (체인은 그대로)
+        try:
+            changed = self.mapping.reload_if_changed()
+        except (OSError, ValueError) as e:
+            print(f"Could not reload mapping {self.mapping.name}: {e}")
+            return False
+        with self.lock:
+            if changed and self.timeline is not None:
+                self._set_timeline(self.timeline)
+                if self.chain is not None and (self.auto_update or self.fixed_hour is not None):
+                    hour = self.fixed_hour if self.fixed_hour is not None else self.current_hour
+                    self.chain.retarget(self.effect_table[hour % len(self.effect_table)])
+        return changed
+
+    def osc_row(self):
+        # OSC 스레드에서 불림: smooth면 지금 위치의 보간된 제어 프레임, 아니면 이번 시간의 행
+        table = self.effect_table
+        if table is None or not (self.auto_update or self.fixed_hour is not None):
+            return None
+        if self.fixed_hour is not None:
+            return table[self.fixed_hour % len(table)]
+        frames = self.control_tables.table if self.control_tables is not None else None
+        if frames is None:
+            return table[self.current_hour % len(table)]
+        progress = min((time.monotonic() - self._tick_time) / self.playback_speed, 1.0) if self.music_player else 0.0
+        return frames[int((self.current_hour + progress) * self.samples_per_hour) % len(frames)]
+
+    def _publish(self, hour):
+        self._tick_time = time.monotonic()
+        if isinstance(self.timeline, TimelineWindow):
+            # 다음 블록들을 미리 읽고 지나간 블록은 버림
+            self.timeline.set_playhead(hour)
+        self.hour_state.publish(HourState(self.load_generation, hour))
+        if self._listeners:
+            self._emit({"event": "hour", "generation": self.load_generation, "hour": hour})
+
+    def start_loop(self):
+        self.stop_loop()
+        self.stop_event = threading.Event()
+        self.scheduler = DeadlineScheduler(self.playback_speed, policy=self.tick_policy,
+                                           clock=self.tick_clock, sleep=self.stop_event.wait)
+        self.loop_thread = threading.Thread(target=self.run_sonification_loop,
+                                            args=(self.stop_event, self.scheduler), daemon=True)
+        self.loop_thread.start()
+
+    def stop_loop(self):
+        # 대기 중인 스레드를 깨우고 끝날 때까지 기다림
+        if self.loop_thread is None:
+            return
+        self.stop_event.set()
+        self.loop_thread.join()
+        self.loop_thread = None
+
+    def run_sonification_loop(self, stop, scheduler):
+        m = self.tick_metrics
+        if m is not None:
+            m.resync()
+        scheduler.start()
+        while not stop.is_set():
+            # 명령이 잠금을 잡고 이 스레드를 멈추려는 중이면 이번에는 건너뜀
+            now = time.monotonic()
+            if now - self._mapping_checked >= MAPPING_CHECK_INTERVAL and self.lock.acquire(blocking=False):
+                try:
+                    self.check_mapping()
+                finally:
+                    self.lock.release()
+                self._mapping_checked = now
+
+            if not self.timeline or not self.music_player:
+                if m is not None:
+                    m.resync()
+                stop.wait(0.5)
+                scheduler.start()
+                continue
+            if m is not None:
+                m.begin()
+
+            # 스트리밍 로딩 중에는 테이블이 점점 길어짐
+            table = self.effect_table
+            total_hours = len(table)
+            fixed_hour = self.fixed_hour
+            hour_to_use = fixed_hour if fixed_hour is not None else self.current_hour
+
+            if self.auto_update or fixed_hour is not None:
+                # 작업 스레드에서 바로 램프 목표값 설정 (GUI 이벤트 큐를 거치지 않음)
+                self.chain.set_row(table[hour_to_use % total_hours])
+            if m is not None:
+                m.mark("params")
+
+            # 그래프와 요약은 클라이언트가 자기 프레임 단위로 그림
+            self._publish(self.current_hour)
+            if m is not None:
+                m.mark("publish")
+
+            # 다음 마감까지 대기; 마감을 놓쳤으면 정책에 따라 여러 시간을 건너뛸 수 있음
+            steps = scheduler.wait()
+            if m is not None:
+                m.mark("sleep")
+                m.end(scheduler.period)
+            if not steps:
+                break
+            if self.fixed_hour is None:
+                hour = self.current_hour + steps
+                if self.live is not None and self._live_rollover(hour, total_hours):
+                    continue
+                self.current_hour = hour % total_hours
+
+    def _live_rollover(self, hour, total_hours):
+        # 라이브: 예보 구간의 끝이 가까우면 다음 구간을 미리 요청하고, 끝을 지나면 그 구간으로 바꿈
+        # True면 current_hour를 여기서 정함
+        if self._live_next is None and hour >= total_hours - LIVE_PREFETCH_HOURS:
+            self._live_next = (self.load_generation,
+                               self.live.submit(self.live_city, self.live_start + total_hours))
+        if hour < total_hours or self._live_next is None:
+            return False
+        generation, future = self._live_next
+        if generation != self.load_generation:
+            self._live_next = None
+            return False
+        if not future.done():
+            # 다음 구간이 아직 안 왔으면 마지막 시간에서 기다림 (처음부터 다시 재생하지 않음)
+            self.current_hour = total_hours - 1
+            return True
+        self._live_next = None
+        try:
+            timeline = WeatherTimeline.from_dict(future.result(), default_city=self.live_city)
+        except (ProviderError, OSError, TimeoutError, ValueError) as e:
+            # 다음 바퀴의 끝에서 다시 시도 (그동안은 지금 구간을 반복)
+            print(f"Could not fetch live weather from hour {self.live_start + total_hours}: {e}")
+            return False
+        if not len(timeline):
+            return False
+        if not self.lock.acquire(blocking=False):
+            # 명령이 잠금을 잡고 있으면 다음 틱에 바꿈
+            self._live_next = (generation, future)
+            self.current_hour = total_hours - 1
+            return True
+        try:
+            self.live_start += total_hours
+            self.load_generation += 1
+            self.current_hour = (hour - total_hours) % len(timeline)
+            self._set_timeline(timeline)
+            if self.control_tables is not None:
+                self.control_tables.seek(self.current_hour)
+            result = {"city": timeline.city, "hours": len(timeline), "generation": self.load_generation,
+                      "complete": True}
+        finally:
+            self.lock.release()
+        self._emit({"event": "timeline", **result})
+        return True
+
+
+def _remove_stale_socket(path):
+    # 이전 엔진이 비정상 종료해서 남은 소켓 파일은 지움 (살아 있는 엔진이면 그대로 둠)
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise EngineError(f"an engine is already listening on {path}")
+
+
+class EngineServer:
+    """JSON-lines control socket for a SonificationEngine.
+
+    Each request is one line {"id": n, "cmd": "<name>", <arguments>} and gets
+    one reply {"id": n, "ok": true, "result": ...} or {"id": n, "ok": false,
+    "error": "...", "type": "<exception class>"}. After {"cmd": "subscribe"}
+    the connection also receives the engine's {"event": ...} lines; hour
+    events are skipped for a subscriber that is not keeping up.
+    {"cmd": "shutdown"} stops the server.
+    """
+
+    def __init__(self, engine, address=DEFAULT_ADDRESS):
+        self.engine = engine
+        self.address = parse_address(address)
+        self.loop = None
+        self.subscribers = set()
+        self._server = None
+        self._stopped = None
+        self._handlers = set()
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        if isinstance(self.address, tuple):
+            self._server = await asyncio.start_server(self.handle, *self.address)
+        else:
+            _remove_stale_socket(self.address)
+            self._server = await asyncio.start_unix_server(self.handle, self.address)
+        self.engine.subscribe(self._on_event)
+
+    async def serve(self):
+        await self.start()
+        try:
+            # kiosk에서 서비스로 돌릴 때 SIGTERM으로도 깨끗하게 종료
+            self.loop.add_signal_handler(signal.SIGTERM, self._stopped.set)
+        except (NotImplementedError, RuntimeError):  # Windows, 메인 스레드가 아닐 때
+            pass
+        print(f"engine {os.getpid()} listening on {self.address}")
+        await self._stopped.wait()
+        await self.stop()
+
+    async def handle(self, reader, writer):
+        self._handlers.add(asyncio.current_task())
+        try:
+            while not self._stopped.is_set():
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(await self._reply(line, writer))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # stop()이 열린 연결을 정리하는 중
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+            self._handlers.discard(asyncio.current_task())
+
+    async def _reply(self, line, writer):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.pop("id", None)
+            cmd = request.pop("cmd", None)
+            if cmd == "subscribe":
+                self.subscribers.add(writer)
+                result = None
+            elif cmd == "shutdown":
+                self._stopped.set()
+                result = None
+            elif cmd in COMMANDS:
+                # 엔진 명령은 블로킹(파일 읽기, 예보 요청, pyo 호출)이라 작업 스레드에서
+                method = getattr(self.engine, cmd)
+                result = await self.loop.run_in_executor(None, lambda: method(**request))
+            else:
+                raise EngineError(f"unknown command {cmd!r} (expected one of {COMMANDS + ('subscribe', 'shutdown')})")
+            reply = {"id": request_id, "ok": True, "result": result}
+        except Exception as e:
+            reply = {"id": request_id, "ok": False, "error": str(e), "type": type(e).__name__}
+        return (json.dumps(reply) + "\n").encode("utf-8")
+
+    def _on_event(self, event):
+        # 엔진 스레드에서 불림: 인코딩만 하고 쓰기는 이벤트 루프에서
+        if not self.subscribers:
+            return
+        line = (json.dumps(event) + "\n").encode("utf-8")
+        self.loop.call_soon_threadsafe(self._broadcast, line, event["event"] == "hour")
+
+    def _broadcast(self, line, droppable):
+        for writer in list(self.subscribers):
+            if writer.is_closing():
+                self.subscribers.discard(writer)
+            elif not droppable or writer.transport.get_write_buffer_size() < MAX_PENDING_EVENT_BYTES:
+                writer.write(line)
+
+    async def stop(self):
+        self.engine.unsubscribe(self._on_event)
+        self._server.close()
+        tasks = list(self._handlers)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+        if not isinstance(self.address, tuple):
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the sonification engine without a GUI, controlled over a "
+                                                 "local socket (see engine_client.py).")
+    parser.add_argument("--socket", default=DEFAULT_ADDRESS,
+                        help="unix socket path, or host:port for TCP (one per engine when running several)")
+    parser.add_argument("--region", help="load this dataset from --data at startup, e.g. seoul")
+    parser.add_argument("--music", help="play this track at startup")
+    parser.add_argument("--data", default="data", help="directory with the <region>.json files")
+    parser.add_argument("--audio", default="portaudio", help="pyo audio backend (portaudio, jack, ...)")
+    parser.add_argument("--seconds-per-hour", type=float, default=1.0, help="playback speed")
+    parser.add_argument("--metrics", action="store_true", help="time each hour tick (reported by status/metrics)")
+    parser.add_argument("--metrics-json", help="write the tick metrics here on exit (implies --metrics)")
+    parser.add_argument("--tick-policy", choices=POLICIES, default=SKIP,
+                        help="what to do when an hour tick misses its deadline")
+    parser.add_argument("--pyo-clock", action="store_true", help="schedule hour ticks on the audio clock")
+    parser.add_argument("--live", metavar="URL",
+                        help="fetch forecasts from this endpoint, e.g. http://127.0.0.1:8765/forecast")
+    parser.add_argument("--smooth", choices=MODES,
+                        help="interpolate the effect parameters between hours instead of ramping at each tick")
+    parser.add_argument("--samples-per-hour", type=int, default=DEFAULT_SAMPLES_PER_HOUR,
+                        help="control values per hour with --smooth")
+    parser.add_argument("--mapping", default="final_sonification",
+                        help="mapping spec name in mappings/ or a path to a JSON spec")
+    parser.add_argument("--osc", metavar="HOST:PORT", help="also send the mapped parameters as OSC bundles here")
+    parser.add_argument("--osc-rate", type=float, default=DEFAULT_OSC_RATE,
+                        help="OSC frames per second (only changed values are sent)")
+    parser.add_argument("--osc-prefix", default=DEFAULT_OSC_PREFIX, help="OSC address prefix")
+    parser.add_argument("--window", type=int, metavar="HOURS",
+                        help="keep only this many hours around the playhead in memory (for multi-year datasets)")
+    parser.add_argument("--window-mb", type=float, default=DEFAULT_WINDOW_BYTES / (1 << 20),
+                        help="memory cap for the resident hours with --window")
+    args = parser.parse_args()
+    if args.window and args.smooth:
+        parser.error("--window and --smooth cannot be combined")
+
+    metrics = TickMetrics() if args.metrics or args.metrics_json else None
+    engine = SonificationEngine(mapping=args.mapping, live_url=args.live, smooth=args.smooth,
+                                samples_per_hour=args.samples_per_hour, tick_policy=args.tick_policy,
+                                pyo_clock=args.pyo_clock, metrics=metrics, metrics_json=args.metrics_json,
+                                data_dir=args.data, audio=args.audio, seconds_per_hour=args.seconds_per_hour,
+                                osc=args.osc, osc_rate=args.osc_rate, osc_prefix=args.osc_prefix,
+                                window=args.window, window_bytes=int(args.window_mb * (1 << 20)))
+    try:
+        engine.boot()
+        if args.region:
+            engine.load(args.region)
+        if args.music:
+            engine.play(args.music)
+        asyncio.run(EngineServer(engine, args.socket).serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
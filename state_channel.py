@@ -0,0 +1,41 @@
+import threading
+from collections import namedtuple
+
+# GUI가 그래프/요약을 다시 그리는 최대 빈도 (재생 속도가 빨라도 이 이상 그리지 않음)
+DEFAULT_FRAME_RATE = 30
+
+# 작업 스레드가 매 시간 틱마다 올리는 상태 (generation은 어느 데이터셋의 상태인지)
+HourState = namedtuple("HourState", ["generation", "hour"])
+
+
+class LatestValue:
+    """Single-slot handoff from one producer thread to one consumer.
+
+    `publish` overwrites whatever has not been taken yet and `take` returns
+    only the newest value, once; anything published in between is counted
+    in `dropped` and never rendered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = 0
+        self._taken = 0
+        self.dropped = 0
+
+    def publish(self, value):
+        with self._lock:
+            self._value = value
+            self._version += 1
+
+    def take(self):
+        with self._lock:
+            if self._version == self._taken:
+                return None
+            self.dropped += self._version - self._taken - 1
+            self._taken = self._version
+            return self._value
+
+    def peek(self):
+        with self._lock:
+            return self._value
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 모듈들이 저장소 최상위에 있으므로 어디서 pytest를 실행해도 import되게
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from osc_output import OscOutput, OscReceiver
+
+PARAMS = ("cutoff_freq", "reverb_mix", "trem_rate")
+
+
+@pytest.fixture
+def loopback():
+    receiver = OscReceiver()
+    out = OscOutput(PARAMS, receiver.address, prefix="/test", refresh=1.0)
+    yield out, receiver
+    out.close()
+    receiver.close()
+
+
+def received(receiver):
+    messages = receiver.receive(timeout=2.0)
+    assert messages is not None, "no bundle arrived"
+    return {address: args for address, args in messages}
+
+
+def test_first_frame_sends_every_parameter(loopback):
+    out, receiver = loopback
+    out.send([1000.0, 0.25, 4.0], now=0.0)
+    assert received(receiver) == {"/test/cutoff_freq": [1000.0], "/test/reverb_mix": [0.25],
+                                  "/test/trem_rate": [4.0]}
+    assert out.stats()["messages"] == 3
+
+
+def test_only_changed_values_are_sent(loopback):
+    out, receiver = loopback
+    out.send([1000.0, 0.25, 4.0], now=0.0)
+    received(receiver)
+    out.send(np.array([1000.0, 0.5, 4.0]), now=0.1)
+    assert received(receiver) == {"/test/reverb_mix": [0.5]}
+    assert out.stats()["messages"] == 4
+
+
+def test_unchanged_frame_is_skipped(loopback):
+    out, receiver = loopback
+    out.send([1000.0, 0.25, 4.0], now=0.0)
+    received(receiver)
+    assert out.send([1000.0, 0.25, 4.0], now=0.1) == 0
+    assert receiver.receive(timeout=0.2) is None
+    assert out.stats()["skipped"] == 1
+
+
+def test_nan_is_not_resent_until_it_changes(loopback):
+    out, receiver = loopback
+    out.send([np.nan, 0.25, 4.0], now=0.0)
+    received(receiver)
+    assert out.send([np.nan, 0.25, 4.0], now=0.1) == 0
+    out.send([200.0, 0.25, 4.0], now=0.2)
+    assert received(receiver) == {"/test/cutoff_freq": [200.0]}
+
+
+def test_full_refresh_resends_everything(loopback):
+    out, receiver = loopback
+    out.send([1000.0, 0.25, 4.0], now=0.0)
+    received(receiver)
+    out.send([1000.0, 0.25, 4.0], now=1.5)
+    assert received(receiver) == {"/test/cutoff_freq": [1000.0], "/test/reverb_mix": [0.25],
+                                  "/test/trem_rate": [4.0]}
+    assert receiver.values["/test/trem_rate"] == 4.0
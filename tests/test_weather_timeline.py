@@ -0,0 +1,95 @@
+import json
+
+import numpy as np
+import pytest
+
+from weather_timeline import (DEFAULTS, FIELDS, NO_DESCRIPTION, WeatherTimeline, iter_json_records,
+                              iter_ndjson_records, stream_timeline)
+
+HOURLY = [
+    {"hour": 0, "temp": 12.5, "humidity": 80, "rain": 0.0, "weather": [{"description": "light rain"}]},
+    {"hour": 1, "temp": -3.25e1, "humidity": 100, "snow": 1.75, "wind_speed": 12.0, "wind_deg": 359.5,
+     "weather": [{"description": "눈 \"heavy\" \\ snow"}]},
+    {"hour": 2, "temp": 1234567.875, "uvi": 7, "weather": []},
+    {"hour": 3, "temp": None, "uv_index": 3.5, "extra": {"nested": [1, 2, {"a": "}]"}]}},
+]
+
+DOCUMENTS = {
+    "compact": json.dumps({"city": "Seoul", "hourly": HOURLY}, separators=(",", ":"), ensure_ascii=False),
+    "pretty": json.dumps({"city": "Seoul", "hourly": HOURLY}, indent=4, ensure_ascii=False),
+    "meta_after": json.dumps({"hourly": HOURLY, "timezone": "Asia/Seoul", "city": "Seoul"}),
+    "empty": '{"city": "Nowhere", "hourly": []}',
+    "spaced": '\n {\t"hourly" : [ {"temp": 1}\r\n, {"temp" : 2.5e-3} ] ,\n "city":"X" }\n',
+}
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("read_size", range(1, 65))
+@pytest.mark.parametrize("doc", sorted(DOCUMENTS))
+def test_json_records_match_json_load(tmp_path, doc, read_size):
+    path = write(tmp_path, f"{doc}.json", DOCUMENTS[doc])
+    expected = json.loads(DOCUMENTS[doc])
+    meta = {}
+    records = list(iter_json_records(path, meta, read_size=read_size))
+    assert records == expected["hourly"]
+    assert meta == {k: v for k, v in expected.items() if k != "hourly"}
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 7, 64])
+@pytest.mark.parametrize("text", ['{"city": "X", "hourly": [{"temp": 1}', '{"hourly": [{"temp": 1.}]}', ""])
+def test_truncated_or_invalid_json_raises_value_error(tmp_path, text, read_size):
+    path = write(tmp_path, "bad.json", text)
+    with pytest.raises(ValueError):
+        list(iter_json_records(path, {}, read_size=read_size))
+
+
+def test_ndjson_records_and_meta(tmp_path):
+    lines = [json.dumps({"city": "Seoul"})] + [json.dumps(h, ensure_ascii=False) for h in HOURLY] + [""]
+    path = write(tmp_path, "seoul.ndjson", "\n".join(lines))
+    meta = {}
+    assert list(iter_ndjson_records(path, meta)) == HOURLY
+    assert meta == {"city": "Seoul"}
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+def test_stream_timeline_ends_with_the_whole_file(tmp_path, suffix):
+    hourly = [{"hour": i, "temp": i * 0.5, "rain": i % 3, "weather": [{"description": f"d{i % 4}"}]}
+              for i in range(100)]
+    if suffix == ".json":
+        text = json.dumps({"city": "Busan", "hourly": hourly})
+    else:
+        text = "\n".join([json.dumps({"city": "Busan"})] + [json.dumps(h) for h in hourly])
+    path = write(tmp_path, "busan" + suffix, text)
+    snapshots = list(stream_timeline(path, first_chunk=8, max_chunk=32))
+    assert [len(s) for s in snapshots] == [8, 24, 56, 88, 100]
+    expected = WeatherTimeline.from_dict({"city": "Busan", "hourly": hourly})
+    last = snapshots[-1]
+    assert last.city == "Busan"
+    for name in FIELDS:
+        np.testing.assert_array_equal(last.fields[name], expected.fields[name])
+    assert [last.description(i) for i in range(100)] == [f"d{i % 4}" for i in range(100)]
+
+
+def test_missing_city_uses_default(tmp_path):
+    path = write(tmp_path, "x.json", '{"hourly": [{"temp": 1}]}')
+    assert WeatherTimeline.load(path, default_city="fallback").city == "fallback"
+
+
+def test_uv_index_alias_and_defaults():
+    timeline = WeatherTimeline.from_dict({"city": "Gwangju", "hourly": HOURLY})
+    # uvi가 있으면 uvi, 없으면 예전 이름 uv_index, 둘 다 없으면 기본값
+    assert timeline.uvi.tolist() == [DEFAULTS["uvi"], DEFAULTS["uvi"], 7.0, 3.5]
+    assert timeline.temp[3] == DEFAULTS["temp"]
+    assert timeline.snow[0] == DEFAULTS["snow"]
+    assert timeline.description(1) == '눈 "heavy" \\ snow'
+    assert timeline.description(2) == NO_DESCRIPTION
+
+
+def test_uvi_wins_over_uv_index():
+    timeline = WeatherTimeline.from_dict({"hourly": [{"uvi": 2.0, "uv_index": 9.0}, {"uvi": None, "uv_index": 9.0}]})
+    assert timeline.uvi.tolist() == [2.0, 9.0]
@@ -0,0 +1,160 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+# run_sonification_loop 한 틱의 구간 (순서대로 mark됨)
+STAGES = ("params", "publish", "sleep")
+
+# GUI 스레드에서 프레임마다 그리는 구간
+FRAME_STAGES = ("graph", "summary")
+
+# 구간 외에 틱마다 기록하는 값: 틱 전체 시간, 목표 주기 대비 오차, 프로세스 CPU 사용률
+EXTRA_COLUMNS = ("tick", "jitter", "cpu")
+
+DEFAULT_CAPACITY = 2048
+
+
+class TickMetrics:
+    """Per-tick timings kept in a fixed-size (capacity x columns) ring buffer.
+
+    Stage times, the tick length and the jitter are in milliseconds; `cpu`
+    is the process CPU time over wall time in percent, which includes the
+    pyo audio thread. Call `begin` at the top of a tick, `mark(stage)` after
+    each stage and `end(period)` once the tick (including its sleep) is over.
+    """
+
+    def __init__(self, stages=STAGES, capacity=DEFAULT_CAPACITY):
+        self.stages = tuple(stages)
+        self.columns = self.stages + EXTRA_COLUMNS
+        self.index = {name: i for i, name in enumerate(self.columns)}
+        self.data = np.full((capacity, len(self.columns)), np.nan)
+        self.count = 0
+        self._row = self.data[0]
+        self._tick_start = None
+        self._stage_start = 0.0
+        self._cpu_start = 0.0
+        self._expected = None
+
+    def __len__(self):
+        return min(self.count, len(self.data))
+
+    def begin(self):
+        now = time.perf_counter()
+        self._row = row = self.data[self.count % len(self.data)]
+        row.fill(np.nan)
+        if self._expected is not None:
+            # 이전 틱이 의도한 주기와 실제 시작 간격의 차이
+            row[self.index["jitter"]] = (now - self._expected) * 1000.0
+        self._tick_start = self._stage_start = now
+        self._cpu_start = time.process_time()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self._row[self.index[stage]] = (now - self._stage_start) * 1000.0
+        self._stage_start = now
+
+    def end(self, period):
+        now = time.perf_counter()
+        wall = now - self._tick_start
+        row = self._row
+        row[self.index["tick"]] = wall * 1000.0
+        if wall > 0:
+            row[self.index["cpu"]] = (time.process_time() - self._cpu_start) / wall * 100.0
+        self._expected = self._tick_start + period
+        self.count += 1
+
+    def resync(self):
+        # 루프가 쉬었다가 다시 돌 때는 지터를 계산하지 않음
+        self._expected = None
+
+    def reset(self):
+        self.data.fill(np.nan)
+        self.count = 0
+        self._expected = None
+
+    def samples(self):
+        # 오래된 틱부터 순서대로
+        n = len(self)
+        if self.count <= len(self.data):
+            return self.data[:n]
+        start = self.count % len(self.data)
+        return np.concatenate([self.data[start:], self.data[:start]])
+
+    def summary(self):
+        samples = self.samples()
+        result = {"ticks": self.count, "window": len(samples)}
+        for name in self.columns:
+            col = samples[:, self.index[name]]
+            col = col[~np.isnan(col)]
+            if not len(col):
+                continue
+            # jitter는 부호가 있으니 크기로 분포를 봄
+            values = np.abs(col) if name == "jitter" else col
+            result[name] = {
+                "mean": float(np.mean(col)),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+                "max": float(np.max(values)),
+            }
+        return result
+
+    def format(self):
+        return format_summary(self.summary())
+
+    def to_dict(self):
+        samples = self.samples()
+        return {
+            "columns": list(self.columns),
+            "summary": self.summary(),
+            "samples": [[None if np.isnan(v) else round(float(v), 4) for v in row] for row in samples],
+        }
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    @classmethod
+    def from_dict(cls, dump):
+        metrics = cls(stages=[c for c in dump["columns"] if c not in EXTRA_COLUMNS],
+                      capacity=max(len(dump["samples"]), 1))
+        for row in dump["samples"]:
+            metrics.data[metrics.count] = [np.nan if v is None else v for v in row]
+            metrics.count += 1
+        return metrics
+
+
+def format_summary(stats):
+    # summary()의 결과 (엔진 소켓으로 받은 것도 같은 형식)
+    lines = [f"ticks: {stats['ticks']} (last {stats['window']})"]
+    for name, s in stats.items():
+        if not isinstance(s, dict):
+            continue
+        unit = "%" if name == "cpu" else "ms"
+        lines.append(f"{name:<8} mean {s['mean']:8.2f}  p95 {s['p95']:8.2f}  max {s['max']:8.2f} {unit}")
+    return "\n".join(lines)
+
+
+def dump_all(path, **named):
+    # 여러 계측(예: tick, frame)을 이름별로 한 파일에
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({name: m.to_dict() for name, m in named.items()}, f, indent=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a tick metrics dump written with --metrics-json.")
+    parser.add_argument("dump", help="metrics JSON file")
+    args = parser.parse_args()
+
+    with open(args.dump, "r", encoding="utf-8") as f:
+        dump = json.load(f)
+    named = {"": dump} if "columns" in dump else dump
+    for name, section in named.items():
+        if name:
+            print(f"[{name}]")
+        print(TickMetrics.from_dict(section).format())
+
+
+if __name__ == "__main__":
+    main()
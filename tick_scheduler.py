@@ -0,0 +1,107 @@
+import time
+
+# 마감을 놓쳤을 때의 처리
+SKIP = "skip"            # 놓친 틱은 건너뛰고 시간축을 벽시계에 맞춤 (시간이 여러 칸 넘어감)
+CATCH_UP = "catch-up"    # 놓친 틱을 쉬지 않고 연달아 실행 (최대 max_catch_up개)
+SLOW_DOWN = "slow-down"  # 지금부터 다시 주기를 셈 (시간축이 늘어짐)
+
+POLICIES = (SKIP, CATCH_UP, SLOW_DOWN)
+
+
+class DeadlineScheduler:
+    """Fixed-period ticks against absolute deadlines on a monotonic clock.
+
+    Deadlines advance by `period` from the start, not from the end of the
+    work, so the time spent in a tick does not accumulate as drift. `wait`
+    blocks until the next deadline and returns how many hours to advance
+    (0 if `sleep` reported a stop). `lateness` is how far past the deadline
+    the wait woke up, in seconds.
+    """
+
+    def __init__(self, period, policy=SKIP, clock=time.monotonic, sleep=time.sleep, max_catch_up=8):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy {policy!r} (expected one of {POLICIES})")
+        self.period = period
+        self.policy = policy
+        self.clock = clock
+        self.sleep = sleep
+        self.max_catch_up = max_catch_up
+        self.deadline = None
+        self.lateness = 0.0
+        self.missed = 0
+        self._pending = 0  # 이미 missed에 센, 따라잡기로 아직 실행하지 않은 마감 수
+
+    def start(self):
+        # 지금이 첫 틱의 마감
+        self.deadline = self.clock()
+        self.lateness = 0.0
+        self.missed = 0
+        self._pending = 0
+
+    def set_period(self, period):
+        # 다음 마감은 마지막 마감 + 새 주기 (이미 지난 부분은 그대로)
+        self.period = period
+
+    def wait(self):
+        if self.deadline is None:
+            self.start()
+            return 1
+        period = self.period
+        deadline = self.deadline + period
+        now = self.clock()
+        while now < deadline:
+            # sleep이 True를 돌려주면 (threading.Event.wait) 중지 요청
+            if self.sleep(deadline - now):
+                return 0
+            now = self.clock()
+
+        late = now - deadline
+        self.lateness = late
+        # 이번 마감은 지난번에 세어 둔 밀린 마감 중 하나일 수 있음 (따라잡기 중)
+        already = max(0, self._pending - 1)
+        self._pending = 0
+        if late < period:
+            self.deadline = deadline
+            return 1
+
+        missed = int(late // period)
+        # 새로 지나간 마감만 셈 (따라잡기로 한 칸씩 진행할 때 같은 마감을 다시 세지 않게)
+        self.missed += max(0, missed - already)
+        if self.policy == SKIP:
+            self.deadline = deadline + missed * period
+            return missed + 1
+        if self.policy == CATCH_UP:
+            # 남은 마감이 이미 지났으니 다음 wait들은 바로 돌아옴; 너무 밀리면 앞부분은 버림
+            dropped = max(0, missed - self.max_catch_up)
+            self.deadline = deadline + dropped * period
+            self._pending = missed - dropped
+            return 1 + dropped
+        self.deadline = now
+        return 1
+
+
+class PyoClock:
+    """Seconds of audio rendered by a running pyo Server, usable as a scheduler clock.
+
+    The server's sample counter only moves once per buffer, so between
+    buffers the time is extrapolated with time.monotonic; the result never
+    goes backwards.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self.sr = float(server.getSamplingRate())
+        self._samples = None
+        self._base = 0.0
+        self._at = 0.0
+        self._last = 0.0
+
+    def __call__(self):
+        samples = self.server.getCurrentTimeInSamples()
+        now = time.monotonic()
+        if samples != self._samples:
+            self._samples = samples
+            self._base = samples / self.sr
+            self._at = now
+        self._last = max(self._last, self._base + (now - self._at))
+        return self._last
@@ -0,0 +1,228 @@
+import sys
+import time
+from collections import deque
+
+from timeline_lod import MinMaxPyramid
+
+# (필드, 범례, 색상) - 그래프에 그리는 시계열
+SERIES = (
+    ("temp", "Temperature (°C)", "red"),
+    #("humidity", "Humidity (%)", "blue"),
+    ("rain", "Rain (mm)", "green"),
+    ("snow", "Snow (mm)", "cyan"),
+    ("wind_speed", "Wind Speed (m/s)", "orange"),
+    #("wind_deg", "Wind Direction (°)", "purple"),
+    ("uvi", "UV Index", "magenta"),
+)
+
+
+# 화면 폭보다 짧게는 확대하지 않음 (시간)
+MIN_VIEW_HOURS = 24
+
+# 따라가기: 재생 위치가 창 밖으로 나가면 창 폭의 이 비율만큼 앞에 두고 창을 넘김
+FOLLOW_LEAD = 0.1
+
+# 휠 한 칸의 확대/축소 비율
+ZOOM_STEP = 1.25
+
+
+class TimelineGraph:
+    """Weather timeline plot that only redraws the playback cursor per tick.
+
+    Each series is drawn from a MinMaxPyramid (see timeline_lod.py), built
+    once per dataset, at about two points per pixel of the axes, so the
+    drawn point count does not grow with the dataset. The visible window
+    (`view_hours` wide, the whole dataset if None) is zoomed with the mouse
+    wheel and panned by dragging; while `follow` is on it pages along with
+    the playhead, and a double click turns following back on. The lines
+    and title prefix are only redrawn when the window moves; each tick
+    restores the cached background and blits the cursor and hour number.
+    """
+
+    def __init__(self, figure, canvas, series=SERIES, history=240, view_hours=None, follow=True):
+        self.figure = figure
+        self.canvas = canvas
+        self.series = series
+        self.ax = None
+        self.cursor = None
+        self.hour_text = None
+        self.background = None
+        self.frame_ms = deque(maxlen=history)
+        self.pyramids = {}
+        self.lines = {}
+        self.length = 0
+        self.hour = 0
+        self.view_start = 0
+        self.view_hours = view_hours
+        self.follow = follow
+        self.points = 0  # 지금 그려진 점 수 (모든 시계열 합)
+        self._pixels = None
+        self._drag = None
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.mpl_connect("scroll_event", self.on_scroll)
+        self.canvas.mpl_connect("button_press_event", self.on_press)
+        self.canvas.mpl_connect("motion_notify_event", self.on_motion)
+        self.canvas.mpl_connect("button_release_event", self.on_release)
+
+    def set_timeline(self, timeline, pyramids=None):
+        # TimelineWindow와 TimelineRange는 자기 단계(lod)를 가지고 있음
+        if pyramids is None and hasattr(timeline, "lod"):
+            pyramids = timeline.lod()
+        pyramids = pyramids or {}
+        self.pyramids = {field: pyramids[field] if field in pyramids else MinMaxPyramid(timeline.fields[field])
+                         for field, _, _ in self.series}
+        self.length = len(timeline)
+        self.hour = 0
+        self.view_start = 0
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+        self.lines = {}
+        for field, label, color in self.series:
+            self.lines[field], = ax.plot([], [], label=label, color=color)
+        # 세로 범위는 데이터셋 전체 기준으로 고정 (창을 넘길 때 축이 흔들리지 않게)
+        lo = min(p.min for p in self.pyramids.values())
+        hi = max(p.max for p in self.pyramids.values())
+        pad = (hi - lo) * 0.05 or 1.0
+        ax.set_ylim(lo - pad, hi + pad)
+        ax.legend(loc='upper right')
+        ax.set_xlabel("Hour")
+        self.cursor = ax.axvline(x=0, color='gray', linestyle='--', animated=True)
+        # 제목 글자 렌더링이 가장 비싸므로 시간 숫자만 매 틱 다시 그림
+        title = ax.set_title("Weather Data for Hour")
+        self.hour_text = ax.annotate("0", xy=(1, 0), xycoords=title, xytext=(4, 0),
+                                     textcoords="offset points", va="bottom",
+                                     fontsize=title.get_fontsize(), animated=True)
+        self.ax = ax
+        self.apply_view()
+        self.frame_ms.clear()
+        # 전체 그리기 -> draw_event에서 배경 캐시
+        self.canvas.draw()
+
+    def visible_hours(self):
+        return self.length if self.view_hours is None else max(1, min(self.view_hours, self.length))
+
+    def apply_view(self):
+        # 보이는 범위만 지금 축 폭에 맞춰 다시 솎아 냄; 다음 update에서 전체를 다시 그림
+        width = self.visible_hours()
+        self.view_start = int(min(max(self.view_start, 0), max(self.length - width, 0)))
+        stop = self.view_start + width
+        self._pixels = max(1, int(self.ax.bbox.width))
+        points = 0
+        for field, line in self.lines.items():
+            x, y = self.pyramids[field].view(self.view_start, stop, 2 * self._pixels)
+            line.set_data(x, y)
+            points += len(x)
+        self.points = points
+        self.ax.set_xlim(self.view_start, max(stop - 1, self.view_start + 1))
+        self.background = None
+
+    def set_view(self, start=None, hours=None):
+        if self.ax is None:
+            return
+        if hours is not None:
+            self.view_hours = None if hours >= self.length else max(int(hours), MIN_VIEW_HOURS)
+        if start is not None:
+            self.view_start = start
+        self.apply_view()
+        self.canvas.draw_idle()
+
+    def zoom(self, factor, center=None):
+        # center(시간)의 화면 위치는 그대로 두고 창 폭만 바꿈
+        width = self.visible_hours()
+        center = self.hour if center is None else center
+        hours = min(max(width * factor, MIN_VIEW_HOURS), self.length)
+        self.set_view(center - (center - self.view_start) * hours / width, hours)
+
+    def on_scroll(self, event):
+        if self.ax is None or event.inaxes is not self.ax:
+            return
+        self.zoom(1.0 / ZOOM_STEP if event.button == "up" else ZOOM_STEP, event.xdata)
+
+    def on_press(self, event):
+        if self.ax is None or event.inaxes is not self.ax or event.button != 1:
+            return
+        if event.dblclick:
+            self.follow = True
+            self.set_view(self.hour - self.visible_hours() * FOLLOW_LEAD)
+            return
+        self._drag = (event.x, self.view_start)
+
+    def on_motion(self, event):
+        if self._drag is None or event.x is None:
+            return
+        x0, start = self._drag
+        # 손으로 옮기면 더블클릭할 때까지 따라가지 않음
+        self.follow = False
+        self.set_view(start - (event.x - x0) * self.visible_hours() / self._pixels)
+
+    def on_release(self, event):
+        self._drag = None
+
+    def on_draw(self, event):
+        if self.ax is None:
+            return
+        if int(self.ax.bbox.width) != self._pixels:
+            # 창 크기가 바뀌면 새 폭으로 다시 솎아 내고 다시 그림
+            self.apply_view()
+            self.canvas.draw_idle()
+            return
+        # 창 크기 변경 등으로 다시 그려지면 배경을 새로 저장
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_animated()
+
+    def draw_animated(self):
+        self.ax.draw_artist(self.cursor)
+        self.ax.draw_artist(self.hour_text)
+
+    def update(self, hour):
+        if self.ax is None:
+            return
+        start = time.perf_counter()
+        self.hour = hour
+        width = self.visible_hours()
+        if self.follow and width < self.length and not self.view_start <= hour < self.view_start + width:
+            # 재생 위치가 창을 벗어날 때만 창을 넘김 (그 사이의 틱은 커서만 그림)
+            self.view_start = hour - width * FOLLOW_LEAD
+            self.apply_view()
+        self.cursor.set_xdata([hour, hour])
+        self.hour_text.set_text(str(hour))
+        if self.background is None:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self.draw_animated()
+            self.canvas.blit(self.figure.bbox)
+        self.frame_ms.append((time.perf_counter() - start) * 1000)
+
+    def frame_stats(self):
+        if not self.frame_ms:
+            return None
+        ordered = sorted(self.frame_ms)
+        return {
+            "frames": len(ordered),
+            "mean_ms": sum(ordered) / len(ordered),
+            "p95_ms": ordered[int(0.95 * (len(ordered) - 1))],
+            "max_ms": ordered[-1],
+        }
+
+
+if __name__ == "__main__":
+    # 사용법: python timeline_graph.py data/KoreaSeasonalCycle.json [보이는 시간 수]
+    # Agg 백엔드로 프레임당 그리기 시간을 측정
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    from weather_timeline import WeatherTimeline
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "data/KoreaSeasonalCycle.json"
+    timeline = WeatherTimeline.load(path)
+    figure = Figure(figsize=(6.8, 3.5))
+    view_hours = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    graph = TimelineGraph(figure, FigureCanvasAgg(figure), view_hours=view_hours)
+    graph.set_timeline(timeline)
+    for hour in range(len(timeline)):
+        graph.update(hour)
+    stats = graph.frame_stats()
+    print(f"{timeline.city}: {len(timeline)} hours, {stats['frames']} frames, "
+          f"mean {stats['mean_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, max {stats['max_ms']:.2f} ms, "
+          f"{graph.points} points drawn")
@@ -0,0 +1,121 @@
+import numpy as np
+
+# 가장 거친 단계의 버킷 수가 이보다 작아질 때까지 반씩 줄임
+MIN_BUCKETS = 64
+
+# 단계를 만들 때 한 번에 읽는 시간 수 (2의 거듭제곱: 청크 경계가 버킷 경계와 맞음)
+BUILD_CHUNK = 1 << 16
+
+# to_dict로 보내는 가장 고운 단계의 버킷 수 상한
+SEND_BUCKETS = 2048
+
+
+def _halve(mins, maxs):
+    # 이웃한 두 버킷을 하나로 (홀수면 마지막 버킷은 그대로 남음)
+    if len(mins) % 2:
+        mins = np.append(mins, mins[-1])
+        maxs = np.append(maxs, maxs[-1])
+    return mins.reshape(-1, 2).min(axis=1), maxs.reshape(-1, 2).max(axis=1)
+
+
+def _reduce(values, size):
+    # size 시간씩 묶은 (최소, 최대) (모자라는 마지막 버킷은 마지막 값으로 채움)
+    values = np.asarray(values, dtype=np.float32)
+    pad = -len(values) % size
+    if pad:
+        values = np.append(values, np.repeat(values[-1], pad))
+    values = values.reshape(-1, size)
+    return values.min(axis=1), values.max(axis=1)
+
+
+class MinMaxPyramid:
+    """Min/max decimation levels of one series, for drawing any range of it with a bounded number of points.
+
+    Level k holds the min and max of every 2**k consecutive hours, from
+    `first` (1 unless given) up. Finer levels are only computed from the
+    column for the visible range, so the column may also be a TimelineWindow
+    column backed by the store. `view` picks the finest level that fits
+    `max_points` and returns one min-max stroke per bucket, so a one-hour
+    rain spike keeps its full height when a year is squeezed into a few
+    hundred pixels. A column with `bounds` (see timeline_window.TimelineRange)
+    only holds those hours; beyond them `view` falls back to level `first`.
+    `to_dict`/`from_dict` send the coarse levels to another process.
+    """
+
+    def __init__(self, column, first=1):
+        self.column = column
+        self.length = len(column)
+        self.first = first
+        self.levels = [None] * first
+        if not self.length:
+            self.min = self.max = 0.0
+            return
+        mins, maxs = [], []
+        size = 1 << first
+        for start in range(0, self.length, max(BUILD_CHUNK, size)):
+            lo, hi = _reduce(column[start:start + max(BUILD_CHUNK, size)], size)
+            mins.append(lo)
+            maxs.append(hi)
+        level = (np.concatenate(mins), np.concatenate(maxs))
+        self.levels.append(level)
+        while len(level[0]) > MIN_BUCKETS:
+            level = _halve(*level)
+            self.levels.append(level)
+        self.min = float(level[0].min())
+        self.max = float(level[1].max())
+
+    @property
+    def nbytes(self):
+        return sum(mins.nbytes + maxs.nbytes for mins, maxs in self.levels[self.first:])
+
+    def to_dict(self, max_buckets=SEND_BUCKETS):
+        # 버킷이 max_buckets 이하인 단계만 (가장 거친 단계는 항상)
+        first = next((k for k in range(self.first, len(self.levels)) if len(self.levels[k][0]) <= max_buckets),
+                     len(self.levels) - 1)
+        return {"length": self.length, "min": self.min, "max": self.max, "first": first,
+                "levels": [[mins.tolist(), maxs.tolist()] for mins, maxs in self.levels[first:]]}
+
+    @classmethod
+    def from_dict(cls, data, column):
+        pyramid = cls.__new__(cls)
+        pyramid.column = column
+        pyramid.length = data["length"]
+        pyramid.min = data["min"]
+        pyramid.max = data["max"]
+        pyramid.first = data["first"]
+        pyramid.levels = [None] * pyramid.first + [
+            (np.asarray(mins, dtype=np.float32), np.asarray(maxs, dtype=np.float32)) for mins, maxs in data["levels"]]
+        return pyramid
+
+    def view(self, start, stop, max_points):
+        """(x, y) for hours [start, stop) with at most about `max_points` points."""
+        start = max(0, int(start))
+        stop = min(self.length, int(np.ceil(stop)))
+        if stop <= start:
+            return np.empty(0), np.empty(0, dtype=np.float32)
+        span = stop - start
+        if span <= max_points:
+            return np.arange(start, stop), np.asarray(self.column[start:stop], dtype=np.float32)
+        # 버킷 하나가 점 두 개(최소, 최대)
+        k = min(len(self.levels) - 1, max(1, int(np.ceil(np.log2(2.0 * span / max_points)))))
+        size = 1 << k
+        first, last = start // size, -(-stop // size)
+        if k < self.first:
+            # 저장하지 않은 단계는 열에서 바로 줄임; 열이 그 범위를 다 갖고 있지 않으면 더 거친 단계로
+            lo, hi = getattr(self.column, "bounds", (0, self.length))
+            if lo <= first * size and min(last * size, self.length) <= hi:
+                mins, maxs = _reduce(self.column[first * size:min(last * size, self.length)], size)
+                return self._strokes(first, last, size, mins, maxs)
+            k = self.first
+            size = 1 << k
+            first, last = start // size, -(-stop // size)
+        mins, maxs = self.levels[k]
+        return self._strokes(first, last, size, mins[first:last], maxs[first:last])
+
+    @staticmethod
+    def _strokes(first, last, size, mins, maxs):
+        x = np.repeat(np.arange(first, last) * size + (size - 1) / 2.0, 2)
+        y = np.empty(2 * (last - first), dtype=np.float32)
+        y[0::2] = mins
+        y[1::2] = maxs
+        return x, y
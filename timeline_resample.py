@@ -0,0 +1,93 @@
+import sys
+
+import numpy as np
+
+from weather_timeline import FIELDS, WeatherTimeline
+
+LINEAR = "linear"
+CUBIC = "cubic"
+MODES = (LINEAR, CUBIC)
+
+# 한 시간을 몇 개의 제어값으로 나눌지 (오디오 쪽에서는 이 사이를 다시 선형 보간)
+DEFAULT_SAMPLES_PER_HOUR = 16
+
+# 각도 필드: 350° -> 10°는 340° 돌아가지 않고 20°만 이동
+CIRCULAR_FIELDS = ("wind_deg",)
+
+# 음수가 될 수 없는 필드 (cubic 보간이 0 아래로 넘치는 것을 막음)
+NON_NEGATIVE_FIELDS = ("humidity", "rain", "snow", "wind_speed", "uvi")
+
+
+def _weights(samples_per_hour, mode):
+    # 한 시간 안의 위치 t = 0, 1/k, ... 에 대한 이웃 4개(h-1, h, h+1, h+2)의 가중치 (k x 4)
+    t = np.arange(samples_per_hour, dtype=np.float64) / samples_per_hour
+    if mode == LINEAR:
+        zero = np.zeros_like(t)
+        w = np.stack([zero, 1 - t, t, zero], axis=1)
+    elif mode == CUBIC:
+        # Catmull-Rom: 매 시간 값을 정확히 지나감
+        t2, t3 = t * t, t * t * t
+        w = np.stack([
+            -0.5 * t3 + t2 - 0.5 * t,
+            1.5 * t3 - 2.5 * t2 + 1,
+            -1.5 * t3 + 2 * t2 + 0.5 * t,
+            0.5 * t3 - 0.5 * t2,
+        ], axis=1)
+    else:
+        raise ValueError(f"unknown interpolation mode {mode!r} (expected one of {MODES})")
+    return w.astype(np.float32)
+
+
+def shortest_arc(delta):
+    return (delta + 180.0) % 360.0 - 180.0
+
+
+def resample(values, samples_per_hour=DEFAULT_SAMPLES_PER_HOUR, mode=LINEAR, circular=False):
+    """Upsample an hourly series to `samples_per_hour` values per hour.
+
+    The series is treated as a loop (the apps wrap around at the end), so the
+    last hour interpolates back towards hour 0 and the result has exactly
+    len(values) * samples_per_hour samples. With `circular` the values are
+    angles in degrees and every step takes the shortest way round.
+    """
+    v = np.asarray(values, dtype=np.float32)
+    if samples_per_hour < 1:
+        raise ValueError("samples_per_hour must be at least 1")
+    w = _weights(samples_per_hour, mode)
+    if not len(v):
+        return np.empty(0, dtype=np.float32)
+
+    # 이웃 시간들을 열로 (hours x 4); np.roll로 끝에서 처음으로 이어짐
+    neighbours = np.stack([np.roll(v, 1), v, np.roll(v, -1), np.roll(v, -2)], axis=1)
+    if circular:
+        # 기준 시간(h)에서 이어지도록 각도를 펼친 다음 보간하고 다시 0~360으로
+        base = neighbours[:, 1:2]
+        prev = base + shortest_arc(neighbours[:, 0:1] - base)
+        nxt = base + shortest_arc(neighbours[:, 2:3] - base)
+        nxt2 = nxt + shortest_arc(neighbours[:, 3:4] - neighbours[:, 2:3])
+        neighbours = np.concatenate([prev, base, nxt, nxt2], axis=1)
+
+    out = neighbours @ w.T  # (hours x k)
+    if circular:
+        out %= 360.0
+    return out.reshape(-1)
+
+
+def resample_fields(fields, samples_per_hour=DEFAULT_SAMPLES_PER_HOUR, mode=LINEAR):
+    out = {}
+    for name in FIELDS:
+        values = resample(fields[name], samples_per_hour, mode, circular=name in CIRCULAR_FIELDS)
+        if mode == CUBIC and name in NON_NEGATIVE_FIELDS:
+            np.maximum(values, 0.0, out=values)
+        out[name] = values
+    return out
+
+
+if __name__ == "__main__":
+    # 사용법: python timeline_resample.py data/seoul.json [samples_per_hour] [linear|cubic] > seoul_smooth.csv
+    timeline = WeatherTimeline.load(sys.argv[1])
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SAMPLES_PER_HOUR
+    fields = resample_fields(timeline.fields, k, sys.argv[3] if len(sys.argv) > 3 else LINEAR)
+    print("hour," + ",".join(FIELDS))
+    for i in range(len(fields["temp"])):
+        print(f"{i / k:g}," + ",".join(f"{fields[name][i]:g}" for name in FIELDS))
@@ -0,0 +1,424 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+from weather_timeline import FIELDS, NO_DESCRIPTION
+from timeline_lod import MinMaxPyramid
+
+# 한 번에 읽고 버리는 단위 (시간 수)
+DEFAULT_BLOCK_HOURS = 512
+
+# 재생 위치 주변에 올려 두는 시간 수; 그중 이 비율만큼은 지나간 쪽에 남겨 둠 (되감기/고정용)
+DEFAULT_SPAN = 4096
+BEHIND_RATIO = 0.25
+
+# 올려 둔 블록 전체(필드 + 효과 파라미터)의 상한
+DEFAULT_MAX_BYTES = 16 << 20
+
+COLUMNS = ("hours",) + FIELDS + ("desc_codes",)
+
+# TimelineRange: 가진 범위의 끝까지 이 비율만큼 남으면 다음 범위를 받아 옴
+REFETCH_LEAD = 0.25
+
+
+class ColumnStore:
+    """Hour ranges of a columnar cache directory (see weather_cache.write_columnar), read with plain file reads.
+
+    Only the .npy headers are parsed up front; `read` opens the column and
+    reads the requested rows into a new array, so nothing stays mapped or
+    open between reads.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "header.json"), "r", encoding="utf-8") as f:
+            self.header = json.load(f)
+        self.layout = {}
+        for name in COLUMNS:
+            with open(self._path(name), "rb") as f:
+                version = npy_format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = npy_format.read_array_header_1_0(f)
+                else:
+                    shape, fortran_order, dtype = npy_format.read_array_header_2_0(f)
+                if len(shape) != 1:
+                    raise ValueError(f"{self._path(name)}: expected a 1-D column, got shape {shape}")
+                self.layout[name] = (f.tell(), dtype, shape[0])
+        self.length = self.layout["hours"][2]
+        if any(n != self.length for _, _, n in self.layout.values()):
+            raise ValueError(f"{directory}: columns have different lengths")
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.npy")
+
+    @property
+    def hour_bytes(self):
+        return sum(dtype.itemsize for _, dtype, _ in self.layout.values())
+
+    def read(self, name, start, stop):
+        offset, dtype, _ = self.layout[name]
+        out = np.empty(stop - start, dtype=dtype)
+        with open(self._path(name), "rb") as f:
+            f.seek(offset + start * dtype.itemsize)
+            if f.readinto(out) != out.nbytes:
+                raise ValueError(f"{self._path(name)}: file is shorter than its header says")
+        return out
+
+
+class _Block:
+    def __init__(self, index, start, columns):
+        self.index = index
+        self.start = start
+        self.columns = columns
+        self.table = None
+
+    @property
+    def nbytes(self):
+        total = sum(arr.nbytes for arr in self.columns.values())
+        return total + (self.table.nbytes if self.table is not None else 0)
+
+
+class WindowColumn:
+    """One column of a TimelineWindow: `col[hour]` reads the resident block, slices and np.asarray read the store."""
+
+    def __init__(self, window, name):
+        self.window = window
+        self.name = name
+
+    def __len__(self):
+        return len(self.window)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self.window))
+            return self.window.store.read(self.name, start, max(start, stop))[::step]
+        return self.window.block(key).columns[self.name][key % len(self.window) % self.window.block_hours]
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.window.store.read(self.name, 0, len(self.window))
+        return arr if dtype is None else arr.astype(dtype, copy=False)
+
+
+class _EffectRows:
+    # 엔진의 effect_table 자리: table[hour]와 len(table)만 씀
+    def __init__(self, window):
+        self.window = window
+
+    def __len__(self):
+        return len(self.window)
+
+    def __getitem__(self, hour):
+        return self.window.effect_row(hour)
+
+
+class TimelineWindow:
+    """A WeatherTimeline over a columnar store that keeps only the hours around the playhead in memory.
+
+    The store is split into blocks of `block_hours`. `set_playhead` (called
+    by the hour loop and on seeks) lets a background thread read the blocks
+    up to `span` hours around the playhead, most of them ahead and wrapping
+    past the end to the start, and evict every other block. Resident blocks
+    never exceed `max_bytes`; a block that is not resident when it is needed
+    (a seek far away) is read on the spot and counted as a miss.
+
+    Besides `len`, `city`, `description`, `row` and the per-field columns of
+    WeatherTimeline, `set_table(fn)` keeps `fn(fields)` (a mapping table)
+    per resident block, read through `effect_rows[hour]`. `lod()` builds
+    the per-field MinMaxPyramids once, without levels finer than a block.
+    """
+
+    def __init__(self, directory, span=DEFAULT_SPAN, block_hours=DEFAULT_BLOCK_HOURS, max_bytes=DEFAULT_MAX_BYTES,
+                 default_city=""):
+        self.store = ColumnStore(directory)
+        self.city = self.store.header.get("city") or default_city
+        self.descriptions = self.store.header["descriptions"]
+        self.length = self.store.length
+        if not self.length:
+            raise ValueError(f"{directory}: no hours in the store")
+        self.block_hours = block_hours
+        self.nblocks = -(-self.length // block_hours)
+        self.span = span
+        self.max_bytes = max_bytes
+        self._block_estimate = block_hours * self.store.hour_bytes
+        if max_bytes < 2 * self._block_estimate:
+            raise ValueError(f"max_bytes must hold at least two blocks of {block_hours} hours "
+                             f"({2 * self._block_estimate} bytes)")
+
+        self.fields = {name: WindowColumn(self, name) for name in FIELDS}
+        for name in FIELDS:
+            setattr(self, name, self.fields[name])
+        self.hours = WindowColumn(self, "hours")
+        self.desc_codes = WindowColumn(self, "desc_codes")
+        self.effect_rows = _EffectRows(self)
+        self._lod = None
+
+        self.blocks = {}
+        self.table_fn = None
+        self.playhead = 0
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.evicted = 0
+        self.error = None
+        self._wanted = self._wanted_blocks(0)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._prefetch, daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def resident_bytes(self):
+        return sum(block.nbytes for block in list(self.blocks.values()))
+
+    def _max_blocks(self):
+        # 효과 테이블을 붙였으면 실제 블록 크기로 다시 잼
+        sizes = [block.nbytes for block in list(self.blocks.values())]
+        size = max(sizes + [self._block_estimate])
+        return max(1, self.max_bytes // size)
+
+    def _wanted_blocks(self, hour):
+        # 지금 블록, 앞쪽 블록들, 지나간 블록들 순서 (끝에서 처음으로 넘어감)
+        current = hour // self.block_hours
+        ahead = -(-int(self.span * (1.0 - BEHIND_RATIO)) // self.block_hours)
+        behind = int(self.span * BEHIND_RATIO) // self.block_hours
+        order = [current]
+        order += [(current + i) % self.nblocks for i in range(1, ahead + 1)]
+        order += [(current - i) % self.nblocks for i in range(1, behind + 1)]
+        return list(dict.fromkeys(order))[:self._max_blocks()]
+
+    def set_playhead(self, hour):
+        hour %= self.length
+        self.playhead = hour
+        if self._wanted and self._wanted[0] == hour // self.block_hours:
+            return
+        with self._cond:
+            self._wanted = self._wanted_blocks(hour)
+            self._cond.notify()
+
+    def set_table(self, fn):
+        # 매핑이 바뀌면 올려 둔 블록의 효과 테이블만 다시 계산
+        with self._cond:
+            self.table_fn = fn
+            for block in self.blocks.values():
+                block.table = fn(block.columns) if fn is not None else None
+            self._trim()
+
+    def block(self, hour):
+        index = (hour % self.length) // self.block_hours
+        block = self.blocks.get(index)
+        if block is not None:
+            self.hits += 1
+            return block
+        block = self._read_block(index)
+        with self._cond:
+            self.misses += 1
+            return self._insert(block)
+
+    def _read_block(self, index):
+        start = index * self.block_hours
+        stop = min(start + self.block_hours, self.length)
+        return _Block(index, start, {name: self.store.read(name, start, stop) for name in COLUMNS})
+
+    def _insert(self, block):
+        # 잠금 안에서: 원하는 범위 밖의 블록을 버리고, 그래도 상한을 넘으면 먼 블록부터 버림
+        existing = self.blocks.get(block.index)
+        if existing is not None:
+            return existing
+        if self.table_fn is not None:
+            block.table = self.table_fn(block.columns)
+        self.blocks[block.index] = block
+        for index in [i for i in self.blocks if i != block.index and i not in self._wanted]:
+            del self.blocks[index]
+            self.evicted += 1
+        self._trim(keep=block.index)
+        return block
+
+    def _trim(self, keep=None):
+        max_blocks = self._max_blocks()
+        for index in reversed(self._wanted):
+            if len(self.blocks) <= max_blocks:
+                break
+            if index != keep and index in self.blocks:
+                del self.blocks[index]
+                self.evicted += 1
+        self._wanted = self._wanted[:max_blocks]
+
+    def _prefetch(self):
+        while True:
+            with self._cond:
+                while not self._closed and all(i in self.blocks for i in self._wanted):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                index = next(i for i in self._wanted if i not in self.blocks)
+            # 파일 읽기는 잠금 밖에서 (재생 스레드가 기다리지 않게)
+            try:
+                block = self._read_block(index)
+            except (OSError, ValueError) as e:
+                # 저장소가 사라졌으면 미리 읽기만 멈춤 (필요한 블록은 읽을 때 오류가 남)
+                self.error = str(e)
+                return
+            with self._cond:
+                if index in self._wanted and index not in self.blocks:
+                    self._insert(block)
+                    self.prefetched += 1
+
+    def effect_row(self, hour):
+        block = self.block(hour)
+        if block.table is None:
+            raise ValueError("set_table() has not been called on this window")
+        return block.table[hour % self.length - block.start]
+
+    def description(self, hour):
+        return self.descriptions[self.desc_codes[hour]]
+
+    def row(self, hour):
+        block = self.block(hour)
+        i = hour % self.length - block.start
+        return {name: float(block.columns[name][i]) for name in FIELDS}
+
+    def lod(self):
+        # 처음 부를 때 저장소를 한 번 훑음 (블록보다 고운 단계는 그릴 때 열에서 읽음)
+        if self._lod is None:
+            first = max(1, self.block_hours.bit_length() - 1)
+            self._lod = {name: MinMaxPyramid(self.fields[name], first=first) for name in FIELDS}
+        return self._lod
+
+    def stats(self):
+        return {"hours": self.length, "span": self.span, "block_hours": self.block_hours,
+                "resident_blocks": len(self.blocks), "resident_bytes": self.resident_bytes,
+                "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses,
+                "prefetched": self.prefetched, "evicted": self.evicted, "error": self.error}
+
+    def close(self):
+        # 미리 읽기를 멈추고 블록을 놓음 (그 뒤의 읽기는 그때그때 파일에서)
+        with self._cond:
+            self._closed = True
+            self.blocks = {}
+            self._cond.notify()
+        self._thread.join()
+
+
+class RangeColumn:
+    """One column of a TimelineRange: hours outside the held range read as NaN."""
+
+    def __init__(self, timeline, name):
+        self.timeline = timeline
+        self.name = name
+
+    @property
+    def bounds(self):
+        return self.timeline.offset, self.timeline.offset + self.timeline.held
+
+    def __len__(self):
+        return self.timeline.length
+
+    def __getitem__(self, key):
+        tl = self.timeline
+        values = tl.columns[self.name]
+        if isinstance(key, slice):
+            start, stop, step = key.indices(tl.length)
+            out = np.full(max(0, stop - start), np.nan, dtype=np.float32)
+            lo, hi = max(start, tl.offset), min(stop, tl.offset + tl.held)
+            if lo < hi:
+                out[lo - start:hi - start] = values[lo - tl.offset:hi - tl.offset]
+            return out[::step]
+        i = key % tl.length - tl.offset
+        return values[i] if 0 <= i < tl.held else np.float32(np.nan)
+
+
+class TimelineRange:
+    """The part of a TimelineWindow an engine client holds (see sonification_engine.window_to_dict).
+
+    Holds hours [offset, offset + held) of a `length`-hour dataset behind
+    the per-field columns, `description` and `row` of WeatherTimeline; the
+    other hours read as NaN and "No data". `lod()` returns the coarse
+    MinMaxPyramids of the whole dataset sent along with the range.
+    `needs(hour)` tells when to ask the engine for the range around `hour`
+    and `update` swaps it in.
+    """
+
+    def __init__(self, data):
+        self.city = data["city"]
+        self.length = data["length"]
+        self.descriptions = data["descriptions"]
+        self.fields = {name: RangeColumn(self, name) for name in FIELDS}
+        for name in FIELDS:
+            setattr(self, name, self.fields[name])
+        self.update(data)
+        self._lod = {name: MinMaxPyramid.from_dict(lod, self.fields[name]) for name, lod in data["lod"].items()}
+
+    def __len__(self):
+        return self.length
+
+    def update(self, data):
+        self.offset = data["offset"]
+        self.columns = {name: np.asarray(data["fields"][name], dtype=np.float32) for name in FIELDS}
+        self.desc_codes = np.asarray(data["desc_codes"], dtype=np.uint16)
+        self.held = len(self.desc_codes)
+
+    def needs(self, hour):
+        # 가진 범위 밖이거나 끝에 가까움 (데이터셋 끝까지 가졌으면 끝에서는 받지 않음)
+        end = self.offset + self.held
+        lead = int(self.held * REFETCH_LEAD) if end < self.length else 0
+        return not self.offset <= hour < end - lead
+
+    def lod(self):
+        return self._lod
+
+    def description(self, hour):
+        i = hour % self.length - self.offset
+        return self.descriptions[self.desc_codes[i]] if 0 <= i < self.held else NO_DESCRIPTION
+
+    def row(self, hour):
+        return {name: float(self.fields[name][hour]) for name in FIELDS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play through a cached weather file with a TimelineWindow and "
+                                                 "report how often the playhead found its hours resident.")
+    parser.add_argument("path", help="weather file (its cache is built first if needed)")
+    parser.add_argument("--span", type=int, default=DEFAULT_SPAN)
+    parser.add_argument("--block-hours", type=int, default=DEFAULT_BLOCK_HOURS)
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / (1 << 20))
+    parser.add_argument("--ticks", type=int, help="hours to play (default: twice the file, to wrap around)")
+    parser.add_argument("--rate", type=float, default=0.0, help="ticks per second (0: as fast as possible)")
+    parser.add_argument("--seek-every", type=int, default=0, help="jump to a random hour every N ticks")
+    args = parser.parse_args()
+
+    from weather_cache import cache_dir, load_timeline
+    load_timeline(args.path)
+    window = TimelineWindow(cache_dir(args.path), span=args.span, block_hours=args.block_hours,
+                            max_bytes=int(args.max_mb * (1 << 20)))
+    rng = np.random.default_rng(0)
+    ticks = args.ticks or 2 * len(window)
+    hour = 0
+    peak = 0
+    start = time.perf_counter()
+    for tick in range(ticks):
+        if args.seek_every and tick and tick % args.seek_every == 0:
+            hour = int(rng.integers(len(window)))
+        window.set_playhead(hour)
+        window.row(hour)
+        peak = max(peak, window.resident_bytes)
+        hour = (hour + 1) % len(window)
+        if args.rate:
+            time.sleep(1.0 / args.rate)
+    elapsed = time.perf_counter() - start
+    window.close()
+    s = window.stats()
+    print(f"{window.city}: {s['hours']} hours, {ticks} ticks in {elapsed:.2f} s; hits {s['hits']}, "
+          f"misses {s['misses']}, prefetched {s['prefetched']}, evicted {s['evicted']}, "
+          f"peak resident {peak / 1024:.0f} KiB of {s['max_bytes'] / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
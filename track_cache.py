@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from pyo import SndTable, DataTable, TableRead, sndinfo
+
+from weather_cache import file_digest
+
+# 디코딩 결과 형식이 바뀌면 올려서 기존 PCM 캐시를 무효화
+TRACK_CACHE_VERSION = 1
+
+# 메모리에 올려 두는 디코딩된 곡들의 총 크기 한도
+DEFAULT_BUDGET_BYTES = 512 * 1024 * 1024
+
+TRACKS_DIRNAME = os.path.join(".cache", "tracks")
+
+
+def pcm_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), TRACKS_DIRNAME)
+
+
+def pcm_paths(path):
+    # 내용 해시로 키를 잡아서 이름만 다른 같은 파일은 한 번만 디코딩
+    base = os.path.join(pcm_dir(path), f"{file_digest(path)}-v{TRACK_CACHE_VERSION}")
+    return base + ".npy", base + ".json"
+
+
+def decode_to_pcm(path):
+    """Decode `path` once into `<dir>/.cache/tracks/<sha256>.npy` (channels x frames float32)."""
+    pcm_path, header_path = pcm_paths(path)
+    try:
+        with open(header_path, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        return np.load(pcm_path, mmap_mode="r"), header
+    except (OSError, ValueError):
+        pass
+
+    info = sndinfo(path, raise_on_failure=True)
+    table = SndTable(path)
+    pcm = np.stack([np.asarray(table.getBuffer(ch), dtype=np.float32) for ch in range(len(table))])
+    header = {"source": os.path.abspath(path), "sr": float(info[2]), "channels": pcm.shape[0],
+              "frames": pcm.shape[1]}
+
+    os.makedirs(os.path.dirname(pcm_path), exist_ok=True)
+    tmp = f"{pcm_path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        np.save(f, pcm)
+    os.replace(tmp, pcm_path)
+    # 헤더는 PCM 파일이 완성된 뒤에 써서 헤더가 있으면 항상 온전한 캐시
+    tmp = f"{header_path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(header, f)
+    os.replace(tmp, header_path)
+    return np.load(pcm_path, mmap_mode="r"), header
+
+
+class Track:
+    """A decoded track held in a pyo DataTable, ready to be played without disk I/O."""
+
+    def __init__(self, path, table, sr, frames):
+        self.path = path
+        self.table = table
+        self.sr = sr
+        self.frames = frames
+        self.nbytes = sum(np.asarray(table.getBuffer(ch)).nbytes for ch in range(len(table)))
+
+    @property
+    def rate(self):
+        # 원래 속도로 테이블을 한 바퀴 읽는 주파수 (Hz)
+        return self.sr / self.frames
+
+    @property
+    def duration(self):
+        return self.frames / self.sr
+
+    def player(self):
+        return TableRead(self.table, freq=self.rate, loop=1)
+
+
+class TrackCache:
+    """LRU of decoded tracks, bounded by the bytes their tables occupy.
+
+    An evicted track keeps playing if a TableRead still holds its table; it
+    is only freed once that player goes away. Entries are keyed by path,
+    mtime and size, so a file replaced in place is decoded again. `get` may
+    be called from several threads; decoding happens outside the lock.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._tracks = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def __contains__(self, path):
+        return _track_key(path) in self._tracks
+
+    def get(self, path):
+        key = _track_key(path)
+        with self._lock:
+            track = self._tracks.get(key)
+            if track is not None:
+                self._tracks.move_to_end(key)
+                return track
+
+        pcm, header = decode_to_pcm(path)
+        channels, frames = pcm.shape
+        table = DataTable(size=frames, chnls=channels)
+        for ch in range(channels):
+            np.asarray(table.getBuffer(ch))[:] = pcm[ch]
+        track = Track(key[0], table, header["sr"], frames)
+
+        with self._lock:
+            # 다른 스레드가 같은 곡을 먼저 넣었으면 그것을 씀
+            existing = self._tracks.get(key)
+            if existing is not None:
+                self._tracks.move_to_end(key)
+                return existing
+            # 같은 경로의 이전 내용(파일이 바뀌기 전)은 버림
+            for old in [k for k in self._tracks if k[0] == key[0]]:
+                self.nbytes -= self._tracks.pop(old).nbytes
+            self._tracks[key] = track
+            self.nbytes += track.nbytes
+            self._evict(keep=key)
+        return track
+
+    def player(self, path):
+        return self.get(path).player()
+
+    def preload(self, paths):
+        for path in paths:
+            self.get(path)
+
+    def _evict(self, keep):
+        while self.nbytes > self.budget_bytes and len(self._tracks) > 1:
+            key, track = next(iter(self._tracks.items()))
+            if key == keep:
+                break
+            del self._tracks[key]
+            self.nbytes -= track.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._tracks.clear()
+            self.nbytes = 0
+
+
+def _track_key(path):
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    return path, st.st_mtime_ns, st.st_size
+
+
+def clear_pcm_cache(directory):
+    shutil.rmtree(os.path.join(directory, TRACKS_DIRNAME), ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode music tracks into the PCM cache ahead of time.")
+    parser.add_argument("tracks", nargs="*", help="music files, e.g. 7rings.mp3")
+    parser.add_argument("--clear", action="store_true", help="remove the PCM cache next to the given tracks")
+    args = parser.parse_args()
+
+    if args.clear:
+        for directory in sorted({os.path.dirname(os.path.abspath(p)) for p in args.tracks} or {"."}):
+            clear_pcm_cache(directory)
+        return
+
+    from pyo import Server
+    server = Server(nchnls=2, duplex=0, audio="offline").boot()
+    for path in args.tracks:
+        pcm, header = decode_to_pcm(path)
+        print(f"{path}: {header['channels']} ch, {header['frames'] / header['sr']:.1f} s "
+              f"({pcm.nbytes / 1024 / 1024:.1f} MiB)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from weather_timeline import FIELDS, WeatherTimeline, stream_timeline
+
+# 캐시 형식이 바뀌면 올려서 기존 캐시를 무효화
+CACHE_VERSION = 1
+
+CACHE_DIRNAME = ".cache"
+
+_digests = {}
+
+
+def cache_root(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME)
+
+
+def cache_dir(path):
+    # 원본 경로별로 하나의 디렉터리: <stem>-<경로 해시>/
+    source = os.path.abspath(path)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_root(source), f"{stem}-{digest}")
+
+
+def file_digest(path):
+    # 내용 해시 (파일이 그대로면 프로세스 안에서 다시 읽지 않음); 렌더링 결과와 음원 PCM 캐시의 키
+    key = (path, os.path.getmtime(path), os.path.getsize(path))
+    digest = _digests.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = _digests[key] = h.hexdigest()
+    return digest
+
+
+def source_key(path):
+    st = os.stat(path)
+    return {"source": os.path.abspath(path), "mtime_ns": st.st_mtime_ns, "size": st.st_size,
+            "version": CACHE_VERSION}
+
+
+def read_header(path):
+    try:
+        with open(os.path.join(cache_dir(path), "header.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(path, header=None):
+    header = header if header is not None else read_header(path)
+    if header is None:
+        return False
+    key = source_key(path)
+    return all(header.get(k) == v for k, v in key.items())
+
+
+def load_cached(path, default_city=""):
+    header = read_header(path)
+    if not is_fresh(path, header):
+        return None
+    try:
+        return _load_arrays(cache_dir(path), header, default_city)
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache(path, timeline, key=None):
+    # key는 파싱을 시작하기 전에 잡아 둔 원본 상태 (도중에 파일이 바뀌면 다음 로드에서 무효)
+    directory = cache_dir(path)
+    tmp = directory + f".tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    write_columnar(tmp, timeline, key or source_key(path))
+    shutil.rmtree(directory, ignore_errors=True)
+    try:
+        os.replace(tmp, directory)
+    except OSError:
+        # 다른 프로세스가 먼저 같은 캐시를 써 넣은 경우
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def write_columnar(directory, timeline, header=None):
+    """Write `timeline` as one .npy per column plus header.json (the cache layout)."""
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "hours.npy"), np.ascontiguousarray(timeline.hours))
+    for name in FIELDS:
+        np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(timeline.fields[name]))
+    np.save(os.path.join(directory, "desc_codes.npy"), np.ascontiguousarray(timeline.desc_codes))
+    header = dict(header or {})
+    header.update({"city": timeline.city, "hours": len(timeline),
+                   "descriptions": list(timeline.descriptions)})
+    with open(os.path.join(directory, "header.json"), "w", encoding="utf-8") as f:
+        json.dump(header, f, ensure_ascii=False)
+
+
+def load_columnar(directory, default_city=""):
+    # 원본 JSON 없이 write_columnar로 만든 디렉터리를 바로 메모리 맵으로 읽음
+    with open(os.path.join(directory, "header.json"), "r", encoding="utf-8") as f:
+        header = json.load(f)
+    return _load_arrays(directory, header, default_city)
+
+
+def _load_arrays(directory, header, default_city):
+    # 파싱 없이 필드별 .npy를 메모리 맵으로 연결
+    hours = np.load(os.path.join(directory, "hours.npy"), mmap_mode="r")
+    fields = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in FIELDS}
+    desc_codes = np.load(os.path.join(directory, "desc_codes.npy"), mmap_mode="r")
+    return WeatherTimeline(header.get("city") or default_city, hours, fields, desc_codes,
+                           header["descriptions"])
+
+
+def invalidate(path):
+    shutil.rmtree(cache_dir(path), ignore_errors=True)
+
+
+def clear_cache(data_dir):
+    shutil.rmtree(os.path.join(data_dir, CACHE_DIRNAME), ignore_errors=True)
+
+
+def load_timeline(path, default_city=""):
+    timeline = load_cached(path, default_city)
+    if timeline is not None:
+        return timeline
+    key = source_key(path)
+    for timeline in stream_timeline(path, default_city):
+        pass
+    write_cache(path, timeline, key)
+    return timeline
+
+
+def warm(paths):
+    for path in paths:
+        if is_fresh(path):
+            print(f"{path}: up to date")
+            continue
+        timeline = load_timeline(path)
+        print(f"{path}: cached {len(timeline)} hours ({timeline.nbytes / 1024:.1f} KiB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the memory-mapped cache of weather files.")
+    parser.add_argument("command", choices=["warm", "clear", "status"])
+    parser.add_argument("paths", nargs="*", help="weather files (default: data/*.json)")
+    parser.add_argument("--data", default="data")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(os.path.join(args.data, "*.json")))
+    if args.command == "warm":
+        warm(paths)
+    elif args.command == "clear":
+        if args.paths:
+            for path in paths:
+                invalidate(path)
+        else:
+            clear_cache(args.data)
+    else:
+        for path in paths:
+            print(f"{path}: {'fresh' if is_fresh(path) else 'stale'}")
+
+
+if __name__ == "__main__":
+    main()
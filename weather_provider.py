@@ -0,0 +1,246 @@
+import abc
+import asyncio
+import json
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from weather_timeline import WeatherTimeline
+
+DEFAULT_TTL = 600.0        # 같은 예보 구간을 다시 받지 않는 시간 (초)
+DEFAULT_WINDOW = 48        # 한 번에 받는 예보 시간 수
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_POOL_SIZE = 4
+
+
+class ProviderError(Exception):
+    pass
+
+
+def normalize_hourly(record, hour):
+    # OpenWeatherMap 형식({"rain": {"1h": x}}, "dt")을 앱들이 쓰는 시간별 형식으로
+    out = dict(record)
+    for name in ("rain", "snow"):
+        value = out.get(name)
+        if isinstance(value, dict):
+            out[name] = value.get("1h", 0.0)
+    out.setdefault("hour", hour)
+    return out
+
+
+def forecast_dict(city, hourly, start=0):
+    return {"city": city, "hourly": [normalize_hourly(h, start + i) for i, h in enumerate(hourly)]}
+
+
+class WeatherProvider(abc.ABC):
+    """Async source of hourly forecasts in the {"city", "hourly": [...]} schema."""
+
+    @abc.abstractmethod
+    async def fetch(self, city, start=0, hours=DEFAULT_WINDOW):
+        """Forecast dict for hours [start, start + hours) of `city`."""
+
+    async def close(self):
+        pass
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host, shared by concurrent requests.
+
+    An idle connection the server has already closed is dropped before it
+    is reused. A request that fails after it was sent is never retried, so
+    a connection dropped mid-request (like the mock server's injected
+    drops) reaches the caller as an error.
+    """
+
+    def __init__(self, host, port, ssl=False, size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.ssl = ssl
+        self.timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def request(self, path, headers=None):
+        async with self._slots:
+            conn = self._take_idle() or await self._open()
+            try:
+                status, resp_headers, body = await asyncio.wait_for(
+                    self._roundtrip(conn, path, headers or {}), self.timeout)
+            except BaseException:
+                self._close(conn)
+                raise
+            if resp_headers.get("connection", "").lower() == "close":
+                self._close(conn)
+            else:
+                self._idle.append(conn)
+            return status, resp_headers, body
+
+    def _take_idle(self):
+        # 서버가 이미 닫은 연결은 보내기 전에 버림 (보낸 뒤의 실패는 다시 시도하지 않음)
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn[0].at_eof() and not conn[1].is_closing():
+                return conn
+            self._close(conn)
+        return None
+
+    async def _open(self):
+        self.opened += 1
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port, ssl=self.ssl or None),
+                                      self.timeout)
+
+    async def _roundtrip(self, conn, path, headers):
+        reader, writer = conn
+        lines = [f"GET {path} HTTP/1.1", f"Host: {self.host}", "Connection: keep-alive",
+                 "Accept: application/json"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise EOFError("connection closed by server")
+        status = int(status_line.split()[1])
+        resp_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            resp_headers[key.strip().lower()] = value.strip()
+
+        if resp_headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+            body = bytes(body)
+        elif "content-length" in resp_headers:
+            body = await reader.readexactly(int(resp_headers["content-length"]))
+        else:
+            body = await reader.read()
+            resp_headers["connection"] = "close"
+        return status, resp_headers, body
+
+    def _close(self, conn):
+        conn[1].close()
+
+    async def close(self):
+        for conn in self._idle:
+            self._close(conn)
+        self._idle.clear()
+
+
+class HttpProvider(WeatherProvider):
+    """Fetches forecast windows over pooled HTTP with a TTL cache.
+
+    `base_url` points at an endpoint answering GET ?city=&start=&hours=
+    (mock_weather_server.py, or a proxy in front of a real API). After each
+    fetch the following window is prefetched in the background, and when a
+    request fails the last response for that window is returned even if it
+    has expired (`stale` is set on the result).
+    """
+
+    def __init__(self, base_url, ttl=DEFAULT_TTL, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 prefetch=True, params=None):
+        url = urlsplit(base_url)
+        self.path = url.path or "/"
+        self.params = dict(params or {})
+        self.ttl = ttl
+        self.prefetch = prefetch
+        self.pool = ConnectionPool(url.hostname, url.port or (443 if url.scheme == "https" else 80),
+                                   ssl=url.scheme == "https", size=pool_size, timeout=timeout)
+        self._cache = {}      # key -> (expires_at, data)
+        self._inflight = {}   # key -> Task (같은 구간 요청은 하나로 합침)
+        self._prefetches = set()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "errors": 0, "prefetched": 0}
+
+    async def fetch(self, city, start=0, hours=DEFAULT_WINDOW):
+        key = (city.lower(), start, hours)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.stats["hits"] += 1
+            data = cached[1]
+        else:
+            self.stats["misses"] += 1
+            try:
+                data = await self._get(key)
+            except (OSError, asyncio.TimeoutError, EOFError, ValueError, ProviderError) as e:
+                self.stats["errors"] += 1
+                if cached is None:
+                    raise ProviderError(f"could not fetch {city} hours {start}-{start + hours}: {e}") from e
+                self.stats["stale"] += 1
+                data = dict(cached[1], stale=True)
+        if self.prefetch:
+            self._schedule_prefetch((key[0], start + hours, hours))
+        return data
+
+    def _get(self, key):
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._download(key))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return asyncio.shield(task)
+
+    async def _download(self, key):
+        city, start, hours = key
+        query = urlencode({**self.params, "city": city, "start": start, "hours": hours})
+        status, _, body = await self.pool.request(f"{self.path}?{query}")
+        if status != 200:
+            raise ProviderError(f"HTTP {status}")
+        raw = json.loads(body)
+        data = forecast_dict(raw.get("city", city), raw.get("hourly", []), start)
+        self._cache[key] = (time.monotonic() + self.ttl, data)
+        return data
+
+    def _schedule_prefetch(self, key):
+        cached = self._cache.get(key)
+        if key in self._inflight or (cached is not None and cached[0] > time.monotonic()):
+            return
+
+        async def prefetch():
+            try:
+                await self._get(key)
+                self.stats["prefetched"] += 1
+            except (OSError, asyncio.TimeoutError, EOFError, ValueError, ProviderError):
+                pass
+
+        task = asyncio.ensure_future(prefetch())
+        self._prefetches.add(task)
+        task.add_done_callback(self._prefetches.discard)
+
+    async def close(self):
+        for task in list(self._prefetches):
+            task.cancel()
+        await self.pool.close()
+
+
+class LiveWeather:
+    """Runs a provider on a background asyncio loop for the (synchronous) wx apps."""
+
+    def __init__(self, provider, window=DEFAULT_WINDOW):
+        self.provider = provider
+        self.window = window
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def submit(self, city, start=0, hours=None):
+        # 기다리지 않고 concurrent.futures.Future를 돌려줌 (재생 루프가 다음 구간을 미리 받을 때)
+        return asyncio.run_coroutine_threadsafe(self.provider.fetch(city, start, hours or self.window), self.loop)
+
+    def fetch(self, city, start=0, hours=None, timeout=DEFAULT_TIMEOUT):
+        return self.submit(city, start, hours).result(timeout)
+
+    def timeline(self, city, start=0, hours=None, timeout=DEFAULT_TIMEOUT):
+        return WeatherTimeline.from_dict(self.fetch(city, start, hours, timeout), default_city=city)
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.provider.close(), self.loop).result(DEFAULT_TIMEOUT)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
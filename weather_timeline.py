@@ -0,0 +1,279 @@
+import json
+import re
+
+import numpy as np
+
+# 앱들이 사용하는 시간별 날씨 필드 (순서 고정)
+FIELDS = ("temp", "humidity", "rain", "snow", "wind_speed", "wind_deg", "uvi")
+
+# 값이 없을 때 채워 넣는 기본값
+DEFAULTS = {
+    "temp": 10.0,
+    "humidity": 50.0,
+    "rain": 0.0,
+    "snow": 0.0,
+    "wind_speed": 0.0,
+    "wind_deg": 0.0,
+    "uvi": 0.0,
+}
+
+# 예전 데이터(gwangju, losangeles, vancouver)는 uvi 대신 uv_index를 씀
+ALIASES = {
+    "uvi": ("uv_index",),
+}
+
+NO_DESCRIPTION = "No data"
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+
+class WeatherTimeline:
+    """Columnar view of an hourly weather feed.
+
+    Every field in FIELDS is a contiguous float32 array indexed by hour, and
+    weather descriptions are dictionary-encoded into `desc_codes`.
+    """
+
+    def __init__(self, city, hours, fields, desc_codes, descriptions):
+        self.city = city
+        self.hours = hours
+        self.fields = fields
+        self.desc_codes = desc_codes
+        self.descriptions = descriptions
+        for name in FIELDS:
+            setattr(self, name, fields[name])
+
+    def __len__(self):
+        return len(self.hours)
+
+    @property
+    def nbytes(self):
+        total = self.hours.nbytes + self.desc_codes.nbytes
+        for arr in self.fields.values():
+            total += arr.nbytes
+        return total
+
+    def description(self, hour):
+        return self.descriptions[self.desc_codes[hour]]
+
+    def row(self, hour):
+        return {name: float(self.fields[name][hour]) for name in FIELDS}
+
+    @classmethod
+    def from_dict(cls, data, default_city=""):
+        hourly = data.get("hourly", [])
+        builder = TimelineBuilder(len(hourly))
+        builder.append(hourly)
+        return builder.timeline(data.get("city", default_city))
+
+    @classmethod
+    def load(cls, path, default_city=""):
+        timeline = None
+        for timeline in stream_timeline(path, default_city):
+            pass
+        return timeline
+
+
+class TimelineBuilder:
+    """Growable columnar buffers that hourly records are appended to in chunks."""
+
+    def __init__(self, capacity=0):
+        self.size = 0
+        self.hours = np.empty(capacity, dtype=np.int32)
+        self.fields = {name: np.empty(capacity, dtype=np.float32) for name in FIELDS}
+        self.desc_codes = np.empty(capacity, dtype=np.uint16)
+        self.descriptions = [NO_DESCRIPTION]
+        self._lookup = {NO_DESCRIPTION: 0}
+
+    def __len__(self):
+        return self.size
+
+    def _resize(self, capacity):
+        self.hours = _resized(self.hours, capacity, self.size)
+        self.fields = {name: _resized(arr, capacity, self.size) for name, arr in self.fields.items()}
+        self.desc_codes = _resized(self.desc_codes, capacity, self.size)
+
+    def append(self, records):
+        start = self.size
+        end = start + len(records)
+        if end > len(self.hours):
+            self._resize(max(end, 2 * len(self.hours)))
+
+        self.hours[start:end] = np.fromiter(
+            (h.get("hour", start + i) for i, h in enumerate(records)), dtype=np.int32, count=len(records)
+        )
+        for name in FIELDS:
+            self.fields[name][start:end] = _column(records, name)
+
+        # description 문자열은 한 번만 저장하고 시간별로는 코드만 보관
+        lookup = self._lookup
+        codes = self.desc_codes
+        for i, h in enumerate(records, start):
+            desc = _description(h)
+            code = lookup.get(desc)
+            if code is None:
+                code = lookup[desc] = len(self.descriptions)
+                self.descriptions.append(desc)
+            codes[i] = code
+        self.size = end
+
+    def trim(self):
+        if self.size != len(self.hours):
+            self._resize(self.size)
+
+    def timeline(self, city):
+        # 복사 없이 지금까지 채워진 부분만 보여주는 뷰
+        n = self.size
+        fields = {name: arr[:n] for name, arr in self.fields.items()}
+        return WeatherTimeline(city, self.hours[:n], fields, self.desc_codes[:n], self.descriptions)
+
+
+def stream_timeline(path, default_city="", first_chunk=256, max_chunk=65536):
+    """Yield growing WeatherTimeline snapshots while `path` is being parsed.
+
+    The first snapshot holds `first_chunk` hours so playback can start right
+    away; later chunks double up to `max_chunk`. The last snapshot is the
+    complete timeline.
+    """
+    meta = {}
+    if path.endswith(NDJSON_SUFFIXES):
+        records = iter_ndjson_records(path, meta)
+    else:
+        records = iter_json_records(path, meta)
+
+    builder = TimelineBuilder()
+    chunk = []
+    chunk_size = first_chunk
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            builder.append(chunk)
+            chunk = []
+            chunk_size = min(chunk_size * 2, max_chunk)
+            yield builder.timeline(meta.get("city", default_city))
+
+    builder.append(chunk)
+    builder.trim()
+    yield builder.timeline(meta.get("city", default_city))
+
+
+def iter_json_records(path, meta, read_size=1 << 16):
+    # {"city": ..., "hourly": [{...}, ...]} 형태를 통째로 읽지 않고 레코드 단위로 파싱
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _JsonReader(f, read_size)
+        reader.expect("{")
+        while True:
+            c = reader.peek()
+            if c == "}":
+                return
+            if c == ",":
+                reader.skip()
+                continue
+            key = reader.decode()
+            reader.expect(":")
+            if key != "hourly":
+                meta[key] = reader.decode()
+                continue
+            reader.expect("[")
+            while True:
+                c = reader.peek()
+                if c == "]":
+                    reader.skip()
+                    break
+                if c == ",":
+                    reader.skip()
+                    continue
+                yield reader.decode()
+
+
+def iter_ndjson_records(path, meta):
+    # 한 줄에 한 시간씩; 날씨 필드가 없는 줄({"city": ...})은 메타데이터로 취급
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "hour" in record or "temp" in record:
+                yield record
+            else:
+                meta.update(record)
+
+
+class _JsonReader:
+    def __init__(self, f, read_size):
+        self.f = f
+        self.read_size = read_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.scan = json.JSONDecoder().scan_once
+
+    def _fill(self):
+        chunk = self.f.read(self.read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            buf = self.buf
+            pos = self.pos = _WHITESPACE.match(buf, self.pos).end()
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                raise ValueError("unexpected end of weather JSON")
+
+    def skip(self):
+        self.pos += 1
+
+    def expect(self, char):
+        c = self.peek()
+        if c != char:
+            raise ValueError(f"expected {char!r} in weather JSON, got {c!r}")
+        self.pos += 1
+
+    def decode(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.scan(self.buf, self.pos)
+            except (json.JSONDecodeError, StopIteration):
+                if not self._fill():
+                    raise ValueError("truncated or invalid weather JSON") from None
+                continue
+            # 버퍼 끝에서 잘린 숫자일 수 있으니 더 읽어서 다시 확인
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _resized(arr, capacity, size):
+    out = np.empty(capacity, dtype=arr.dtype)
+    out[:size] = arr[:size]
+    return out
+
+
+def _value(h, name):
+    value = h.get(name)
+    if value is None:
+        for alias in ALIASES.get(name, ()):
+            value = h.get(alias)
+            if value is not None:
+                break
+    return DEFAULTS[name] if value is None else value
+
+
+def _column(hourly, name):
+    return np.fromiter((_value(h, name) for h in hourly), dtype=np.float32, count=len(hourly))
+
+
+def _description(h):
+    weather = h.get("weather") or [{}]
+    return weather[0].get("description") or NO_DESCRIPTION
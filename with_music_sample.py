@@ -1,9 +1,10 @@
 import wx
-import json
 import threading
 import time
 import os
-from pyo import *
+from pyo import Server, SfPlayer, Freeverb, Delay, ButHP, Pan
+from weather_cache import load_timeline
+from mapping_spec import MappingProfile
 import matplotlib
 matplotlib.use('WXAgg')
 from matplotlib.figure import Figure
@@ -74,8 +75,11 @@ class WeatherSonificationApp(wx.Frame):
         self.high_shelf = None
         self.pan = None
         
-        self.weather_data = None
+        self.timeline = None
         self.current_hour = 0
+        # 날씨 -> 효과 매핑 (mappings/with_music_sample.json, 실행 중에 고치면 다시 읽음)
+        self.mapping = MappingProfile("with_music_sample", ("vol", "rev_bal", "eq_gain", "pan_pos"))
+        self.params = None  # 시간별 파라미터 테이블 (hours x params)
         self.running = False
         
         # 기본 재생 속도 (초)
@@ -99,14 +103,14 @@ class WeatherSonificationApp(wx.Frame):
         
         filename = f"{city.lower()}.json"
         try:
-            with open(os.path.join('data',filename), "r", encoding="utf-8") as f:
-                self.weather_data = json.load(f)
-            wx.MessageBox(f"Loaded weather data for {self.weather_data.get('city', city)}", "Info", wx.OK | wx.ICON_INFORMATION)
+            self.timeline = load_timeline(os.path.join('data',filename), default_city=city)
+            wx.MessageBox(f"Loaded weather data for {self.timeline.city}", "Info", wx.OK | wx.ICON_INFORMATION)
         except FileNotFoundError:
             wx.MessageBox(f"Weather data file '{filename}' not found.", "Error", wx.OK | wx.ICON_ERROR)
             return
         
         self.current_hour = 0
+        self.params = self.mapping.table(self.timeline.fields)
         self.init_effects_chain()
         self.update_graph()
         
@@ -153,15 +157,16 @@ class WeatherSonificationApp(wx.Frame):
             self.pan.stop()
         
         # 날씨 데이터 초기값 또는 기본값
-        hour_data = self.weather_data["hourly"][0] if self.weather_data else {
-            "temp":25, "humidity":50, "rain":0, "wind_speed":1, "wind_deg":0, "uv_index":0
-        }
+        row = self.params[0] if self.params is not None else self.mapping.row({
+            "temp":25, "humidity":50, "rain":0, "wind_speed":1, "wind_deg":0, "uvi":0
+        })
         
-        # 효과 파라미터 계산
-        rev_bal = self.wind_to_reverb(hour_data["wind_speed"])
+        # 효과 파라미터
+        idx = self.mapping.mapping.index
+        rev_bal = float(row[idx["rev_bal"]])
         delay_time = self.delay_slider.GetValue() / 1000.0  # ms to sec
-        eq_gain = self.uv_to_eq(hour_data.get("uv_index",0))
-        pan_pos = self.wind_deg_to_pan(hour_data["wind_deg"])
+        eq_gain = float(row[idx["eq_gain"]])
+        pan_pos = float(row[idx["pan_pos"]])
         
         # 이펙트 체인 구성
         self.rev = Freeverb(self.music_player, size=0.8, bal=rev_bal)
@@ -173,17 +178,27 @@ class WeatherSonificationApp(wx.Frame):
     
     def run_sonification_loop(self):
         while self.running:
-            if not self.weather_data or not self.music_player:
+            if not self.timeline or not self.music_player:
                 time.sleep(0.5)
                 continue
             
-            hour_data = self.weather_data["hourly"][self.current_hour]
+            tl = self.timeline
+            hour = self.current_hour
             
-            rev_bal = self.wind_to_reverb(hour_data["wind_speed"])
+            # 매핑 파일이 바뀌었으면 테이블만 다시 계산 (이펙트 체인은 그대로)
+            try:
+                if self.mapping.reload_if_changed():
+                    self.params = self.mapping.table(tl.fields)
+            except (OSError, ValueError) as e:
+                print(f"Could not reload mapping {self.mapping.name}: {e}")
+            
+            row = self.params[hour]
+            idx = self.mapping.mapping.index
+            rev_bal = float(row[idx["rev_bal"]])
             delay_time = self.delay_slider.GetValue() / 1000.0
-            eq_gain = self.uv_to_eq(hour_data.get("uv_index",0))
-            pan_pos = self.wind_deg_to_pan(hour_data["wind_deg"])
-            base_vol = self.humidity_to_volume(hour_data["humidity"])
+            eq_gain = float(row[idx["eq_gain"]])
+            pan_pos = float(row[idx["pan_pos"]])
+            base_vol = float(row[idx["vol"]])
             
             # 효과 파라미터 실시간 업데이트
             self.rev.bal = rev_bal
@@ -194,27 +209,13 @@ class WeatherSonificationApp(wx.Frame):
             
             self.update_graph(self.current_hour)
             
-            self.current_hour = (self.current_hour + 1) % 24
+            self.current_hour = (self.current_hour + 1) % len(tl)
             time.sleep(self.playback_speed)
     
-    # 맵핑 함수들
-    def humidity_to_volume(self, humidity):
-        return 0.05 + (humidity - 30) * (0.5 - 0.05) / (100 - 30)
-    
-    def wind_to_reverb(self, wind_speed):
-        return min(wind_speed / 10, 1) * 0.8
-    
-    def uv_to_eq(self, uv_index):
-        return min(uv_index / 10, 1.0)
-    
-    def wind_deg_to_pan(self, wind_deg):
-        return (wind_deg % 360) / 360
-    
     # 슬라이더 이벤트 핸들러
     def on_volume_change(self, event):
-        if self.music_player:
-            hour_data = self.weather_data["hourly"][self.current_hour]
-            base_vol = self.humidity_to_volume(hour_data["humidity"])
+        if self.music_player and self.params is not None:
+            base_vol = float(self.params[self.current_hour][self.mapping.mapping.index["vol"]])
             self.music_player.mul = base_vol * (self.vol_slider.GetValue() / 100)
     
     def on_eq_change(self, event):
@@ -232,10 +233,11 @@ class WeatherSonificationApp(wx.Frame):
     def update_graph(self, current_hour=0):
         self.figure.clear()
         ax = self.figure.add_subplot(111)
-        hours = [h["hour"] for h in self.weather_data["hourly"]]
-        temps = [h["temp"] for h in self.weather_data["hourly"]]
-        humid = [h["humidity"] for h in self.weather_data["hourly"]]
-        rains = [h["rain"] for h in self.weather_data["hourly"]]
+        tl = self.timeline
+        hours = tl.hours
+        temps = tl.temp
+        humid = tl.humidity
+        rains = tl.rain
         
         ax.plot(hours, temps, label="Temperature (°C)", color="red")
         ax.plot(hours, humid, label="Humidity (%)", color="blue")